@@ -0,0 +1,27 @@
+"""add_order_created_at_index
+
+Revision ID: 3f9d2c6a8b14
+Revises: 52bc7a3e9486
+Create Date: 2026-10-17 09:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9d2c6a8b14'
+down_revision: Union[str, None] = '52bc7a3e9486'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_order_created_at_id', 'order',
+                    ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_created_at_id', table_name='order')
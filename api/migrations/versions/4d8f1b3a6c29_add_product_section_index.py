@@ -0,0 +1,26 @@
+"""add_product_section_index
+
+Revision ID: 4d8f1b3a6c29
+Revises: e2a7c9b4d1f8
+Create Date: 2026-10-17 15:03:18.942071
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8f1b3a6c29'
+down_revision: Union[str, None] = 'e2a7c9b4d1f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_product_section'), 'product', ['section'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_section'), table_name='product')
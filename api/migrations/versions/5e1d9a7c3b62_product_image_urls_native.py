@@ -0,0 +1,60 @@
+"""product_image_urls_native
+
+Revision ID: 5e1d9a7c3b62
+Revises: 8c4a7f2e5d10
+Create Date: 2026-10-17 20:08:36.904512
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1d9a7c3b62'
+down_revision: Union[str, None] = '8c4a7f2e5d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_column(new_type, server_default, copy_sql: str) -> None:
+    """Troca `product.image_urls` por uma coluna do novo tipo, convertendo os valores."""
+    op.add_column('product', sa.Column('image_urls_new', new_type,
+                                       server_default=server_default, nullable=server_default is None))
+    op.execute(copy_sql)
+    with op.batch_alter_table('product') as batch:
+        batch.drop_column('image_urls')
+        batch.alter_column('image_urls_new', new_column_name='image_urls')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Texto com uma lista JSON (ou nulo) -> ARRAY no PostgreSQL, JSON nos
+    # demais bancos; nulos viram lista vazia
+    if op.get_bind().dialect.name == "postgresql":
+        _replace_column(postgresql.ARRAY(sa.String()), '{}', """
+            UPDATE product SET image_urls_new = ARRAY(SELECT json_array_elements_text(image_urls::json))
+            WHERE image_urls IS NOT NULL AND image_urls <> ''
+        """)
+        return
+
+    _replace_column(sa.JSON(), '[]', """
+        UPDATE product SET image_urls_new = image_urls
+        WHERE image_urls IS NOT NULL AND image_urls <> ''
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        _replace_column(sa.Text(), None, """
+            UPDATE product SET image_urls_new = array_to_json(image_urls)::text
+            WHERE cardinality(image_urls) > 0
+        """)
+        return
+
+    _replace_column(sa.Text(), None, """
+        UPDATE product SET image_urls_new = image_urls
+        WHERE image_urls <> '[]'
+    """)
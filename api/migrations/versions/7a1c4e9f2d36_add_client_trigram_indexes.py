@@ -0,0 +1,37 @@
+"""add_client_trigram_indexes
+
+Revision ID: 7a1c4e9f2d36
+Revises: 3f9d2c6a8b14
+Create Date: 2026-10-17 10:04:52.731902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c4e9f2d36'
+down_revision: Union[str, None] = '3f9d2c6a8b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index('ix_client_name_trgm', 'client', ['name'],
+                        postgresql_using='gin',
+                        postgresql_ops={'name': 'gin_trgm_ops'})
+        op.create_index('ix_client_email_trgm', 'client', ['email'],
+                        postgresql_using='gin',
+                        postgresql_ops={'email': 'gin_trgm_ops'})
+    else:
+        op.create_index('ix_client_name_trgm', 'client', ['name'])
+        op.create_index('ix_client_email_trgm', 'client', ['email'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_client_email_trgm', table_name='client')
+    op.drop_index('ix_client_name_trgm', table_name='client')
@@ -0,0 +1,116 @@
+"""partition_order_by_month
+
+Revision ID: 8c4a7f2e5d10
+Revises: d3b9e6a1c8f4
+Create Date: 2026-10-17 19:21:53.142087
+
+"""
+import re
+from datetime import date, datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4a7f2e5d10'
+down_revision: Union[str, None] = 'd3b9e6a1c8f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# DDL fixada nesta revisão (não importa o código da aplicação, que pode
+# mudar depois): partições `order_yAAAAmMM` por mês de created_at, mais
+# `order_default`, criadas até três meses à frente
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _index_definitions(conn) -> list:
+    """CREATE INDEX dos índices de `order`, exceto os de constraints (PK)."""
+    return list(conn.execute(sa.text(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = 'order' "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = to_regclass('\"order\"'))"
+    )).scalars())
+
+
+def _recreate_indexes(conn, definitions: list) -> None:
+    for definition in definitions:
+        conn.execute(sa.text(re.sub(r" ON \S+ ", ' ON "order" ', definition, count=1)))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Apenas PostgreSQL. Copia todos os pedidos para a tabela particionada
+    # com `order` bloqueada: execute em uma janela de manutenção. Depois,
+    # `python -m src.commands.order_partitions create` mantém as partições
+    # dos próximos meses.
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    index_definitions = _index_definitions(conn)
+    sequence = conn.execute(sa.text("SELECT pg_get_serial_sequence('\"order\"', 'id')")).scalar()
+    first = conn.execute(sa.text('SELECT min(created_at) FROM "order"')).scalar()
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute('ALTER TABLE "order" RENAME TO order_unpartitioned')
+    op.execute(
+        'CREATE TABLE "order" (LIKE order_unpartitioned INCLUDING DEFAULTS) '
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute('CREATE TABLE order_default PARTITION OF "order" DEFAULT')
+    now = datetime.utcnow()
+    month = date((first or now).year, (first or now).month, 1)
+    last = _add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        # Literais gerados a partir de datas: DDL não aceita parâmetros
+        op.execute(
+            f'CREATE TABLE "order_y{month.year}m{month.month:02d}" PARTITION OF "order" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute('INSERT INTO "order" SELECT * FROM order_unpartitioned')
+    # Remove também a chave estrangeira order_item.order_id: com a tabela
+    # particionada, `id` sozinho não pode ser único
+    op.execute("DROP TABLE order_unpartitioned CASCADE")
+
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "order".id')
+    op.execute('ALTER TABLE "order" ADD CONSTRAINT order_pkey PRIMARY KEY (id, created_at)')
+    op.execute(
+        'ALTER TABLE "order" ADD CONSTRAINT order_client_id_fkey '
+        "FOREIGN KEY (client_id) REFERENCES client (id)"
+    )
+    _recreate_indexes(conn, index_definitions)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Partições já arquivadas não voltam: restaure-as antes, se necessário
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    index_definitions = _index_definitions(conn)
+    sequence = conn.execute(sa.text("SELECT pg_get_serial_sequence('\"order\"', 'id')")).scalar()
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute('ALTER TABLE "order" RENAME TO order_partitioned')
+    op.execute('CREATE TABLE "order" (LIKE order_partitioned INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO "order" SELECT * FROM order_partitioned')
+    op.execute("DROP TABLE order_partitioned CASCADE")
+
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "order".id')
+    op.execute('ALTER TABLE "order" ADD CONSTRAINT order_pkey PRIMARY KEY (id)')
+    op.execute(
+        'ALTER TABLE "order" ADD CONSTRAINT order_client_id_fkey '
+        "FOREIGN KEY (client_id) REFERENCES client (id)"
+    )
+    op.execute(
+        "ALTER TABLE order_item ADD CONSTRAINT order_item_order_id_fkey "
+        'FOREIGN KEY (order_id) REFERENCES "order" (id)'
+    )
+    _recreate_indexes(conn, index_definitions)
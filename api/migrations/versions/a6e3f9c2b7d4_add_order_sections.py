@@ -0,0 +1,57 @@
+"""add_order_sections
+
+Revision ID: a6e3f9c2b7d4
+Revises: 4d8f1b3a6c29
+Create Date: 2026-10-17 15:48:33.105627
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e3f9c2b7d4'
+down_revision: Union[str, None] = '4d8f1b3a6c29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.add_column('order', sa.Column('sections', postgresql.ARRAY(sa.String()),
+                                         server_default='{}', nullable=False))
+        op.execute("""
+            UPDATE "order" o SET sections = s.sections
+            FROM (
+                SELECT oi.order_id, array_agg(DISTINCT p.section ORDER BY p.section) AS sections
+                FROM order_item oi JOIN product p ON p.id = oi.product_id
+                GROUP BY oi.order_id
+            ) s
+            WHERE s.order_id = o.id
+        """)
+        op.create_index('ix_order_sections', 'order', ['sections'],
+                        postgresql_using='gin')
+        return
+
+    # Demais bancos: lista JSON, sem índice
+    op.add_column('order', sa.Column('sections', sa.JSON(), server_default='[]', nullable=False))
+    op.execute("""
+        UPDATE "order" SET sections = (
+            SELECT json_group_array(section) FROM (
+                SELECT DISTINCT p.section
+                FROM order_item oi JOIN product p ON p.id = oi.product_id
+                WHERE oi.order_id = "order".id
+                ORDER BY p.section
+            )
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_order_sections', table_name='order')
+    op.drop_column('order', 'sections')
@@ -0,0 +1,51 @@
+"""add_sales_rollups
+
+Revision ID: b7f2a4d9c1e6
+Revises: f1c8d5a2e9b3
+Create Date: 2026-10-17 17:12:09.664213
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f2a4d9c1e6'
+down_revision: Union[str, None] = 'f1c8d5a2e9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Os agregados começam vazios: preencha com
+    # `python -m src.commands.backfill_sales_rollups`
+    op.create_table('sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('sales_daily_section',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('section', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'section')
+    )
+    op.create_table('sales_daily_client',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['client.id'], ),
+    sa.PrimaryKeyConstraint('day', 'client_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_daily_client')
+    op.drop_table('sales_daily_section')
+    op.drop_table('sales_daily')
@@ -0,0 +1,40 @@
+"""add_product_search_vector
+
+Revision ID: c5e8a1d4f7b2
+Revises: 7a1c4e9f2d36
+Create Date: 2026-10-17 11:20:07.215648
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1d4f7b2'
+down_revision: Union[str, None] = '7a1c4e9f2d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Apenas PostgreSQL: nos demais bancos a busca usa o fallback por ILIKE
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("""
+        ALTER TABLE product ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('portuguese', coalesce(description, '')), 'A') ||
+            setweight(to_tsvector('portuguese', coalesce(section, '')), 'B')
+        ) STORED
+    """)
+    op.create_index('ix_product_search_vector', 'product', ['search_vector'],
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index('ix_product_search_vector', table_name='product')
+    op.drop_column('product', 'search_vector')
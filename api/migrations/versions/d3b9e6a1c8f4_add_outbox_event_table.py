@@ -0,0 +1,48 @@
+"""add_outbox_event_table
+
+Revision ID: d3b9e6a1c8f4
+Revises: b7f2a4d9c1e6
+Create Date: 2026-10-17 18:04:27.318460
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b9e6a1c8f4'
+down_revision: Union[str, None] = 'b7f2a4d9c1e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_event',
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('aggregate_id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_event_id'), 'outbox_event', ['id'], unique=False)
+    op.create_index(op.f('ix_outbox_event_aggregate_id'), 'outbox_event', ['aggregate_id'], unique=False)
+    # Índice parcial: cobre apenas os eventos ainda não processados
+    op.create_index('ix_outbox_event_pending', 'outbox_event', ['available_at', 'id'], unique=False,
+                    postgresql_where=sa.text('processed_at IS NULL'),
+                    sqlite_where=sa.text('processed_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_event_pending', table_name='outbox_event')
+    op.drop_index(op.f('ix_outbox_event_aggregate_id'), table_name='outbox_event')
+    op.drop_index(op.f('ix_outbox_event_id'), table_name='outbox_event')
+    op.drop_table('outbox_event')
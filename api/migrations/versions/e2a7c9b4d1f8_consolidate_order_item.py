@@ -0,0 +1,61 @@
+"""consolidate_order_item
+
+Revision ID: e2a7c9b4d1f8
+Revises: 9b4d2e7f1a05
+Create Date: 2026-10-17 14:11:52.730194
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c9b4d1f8'
+down_revision: Union[str, None] = '9b4d2e7f1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Copia as linhas que ainda só existem em order_products. Em bases
+    # grandes, rode antes `python -m src.commands.backfill_order_items`
+    # (em lotes); aqui resta apenas o que faltar.
+    op.execute("""
+        INSERT INTO order_item (order_id, product_id, quantity, unit_price)
+        SELECT op.order_id, op.product_id, op.quantity, op.unit_price
+        FROM order_products op
+        WHERE NOT EXISTS (
+            SELECT 1 FROM order_item oi
+            WHERE oi.order_id = op.order_id AND oi.product_id = op.product_id
+        )
+    """)
+    op.drop_table('order_products')
+
+    op.create_index('ix_order_item_order_id', 'order_item', ['order_id'], unique=False)
+    op.create_index('ix_order_item_product_id_order_id', 'order_item',
+                    ['product_id', 'order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_item_product_id_order_id', table_name='order_item')
+    op.drop_index('ix_order_item_order_id', table_name='order_item')
+
+    op.create_table('order_products',
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('order_id', 'product_id')
+    )
+    # order_products tem uma linha por (pedido, produto)
+    op.execute("""
+        INSERT INTO order_products (order_id, product_id, quantity, unit_price)
+        SELECT order_id, product_id, SUM(quantity), MAX(unit_price)
+        FROM order_item
+        GROUP BY order_id, product_id
+    """)
@@ -0,0 +1,36 @@
+"""add_order_filter_indexes
+
+Revision ID: f1c8d5a2e9b3
+Revises: a6e3f9c2b7d4
+Create Date: 2026-10-17 16:27:45.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8d5a2e9b3'
+down_revision: Union[str, None] = 'a6e3f9c2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_order_client_id_created_at_id', 'order',
+                    ['client_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_order_status_created_at_id', 'order',
+                    ['status', 'created_at', 'id'], unique=False)
+    # BRIN: poucas páginas de índice para a coluna que cresce com a inserção
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index('ix_order_created_at_brin', 'order', ['created_at'],
+                        postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_order_created_at_brin', table_name='order')
+    op.drop_index('ix_order_status_created_at_id', table_name='order')
+    op.drop_index('ix_order_client_id_created_at_id', table_name='order')
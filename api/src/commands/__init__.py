@@ -0,0 +1 @@
+# Comandos de manutenção executados com `python -m src.commands.<comando>`
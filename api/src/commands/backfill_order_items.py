@@ -0,0 +1,78 @@
+"""
+Copia para `order_item` as linhas que só existem na tabela legada
+`order_products`.
+
+Uso: python -m src.commands.backfill_order_items [--batch-size N]
+
+Processa os pedidos em lotes (uma transação por lote) e pode ser executado
+mais de uma vez: linhas já copiadas são ignoradas. Deve rodar antes da
+migração que remove `order_products`, para que ela fique curta.
+"""
+import argparse
+
+from sqlalchemy import MetaData, Table, func, inspect, select
+from sqlalchemy.engine import Engine
+
+from src.config.database import engine as default_engine
+from src.models.order import OrderItem
+
+
+def backfill_order_items(engine: Engine, batch_size: int = 1000) -> int:
+    """Copia as linhas pendentes e retorna quantas foram inseridas."""
+    if not inspect(engine).has_table("order_products"):
+        return 0
+
+    legacy = Table("order_products", MetaData(), autoload_with=engine)
+    items = OrderItem.__table__
+    copied = 0
+    last_order_id = 0
+
+    while True:
+        with engine.begin() as conn:
+            # Próximo lote de pedidos, percorrido pela chave primária
+            upper = conn.execute(
+                select(func.max(legacy.c.order_id)).where(
+                    legacy.c.order_id.in_(
+                        select(legacy.c.order_id)
+                        .where(legacy.c.order_id > last_order_id)
+                        .group_by(legacy.c.order_id)
+                        .order_by(legacy.c.order_id)
+                        .limit(batch_size)
+                    )
+                )
+            ).scalar()
+            if upper is None:
+                break
+
+            pending = select(
+                legacy.c.order_id, legacy.c.product_id,
+                legacy.c.quantity, legacy.c.unit_price
+            ).where(
+                legacy.c.order_id > last_order_id,
+                legacy.c.order_id <= upper,
+                ~select(items.c.id).where(
+                    items.c.order_id == legacy.c.order_id,
+                    items.c.product_id == legacy.c.product_id
+                ).exists()
+            )
+            result = conn.execute(items.insert().from_select(
+                ["order_id", "product_id", "quantity", "unit_price"], pending
+            ))
+            copied += max(result.rowcount, 0)
+            last_order_id = upper
+
+    return copied
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Pedidos por transação (padrão: 1000)")
+    args = parser.parse_args()
+
+    copied = backfill_order_items(default_engine, args.batch_size)
+    print(f"{copied} itens copiados de order_products para order_item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Recalcula os agregados diários de vendas a partir dos pedidos.
+
+Uso: python -m src.commands.backfill_sales_rollups [--batch-size N]
+
+Apaga e recalcula `sales_daily`, `sales_daily_section` e
+`sales_daily_client` em uma única transação, lendo os pedidos em lotes.
+Use após a migração que cria as tabelas ou para corrigir divergências;
+de preferência fora do horário de pico, já que as linhas dos agregados
+ficam bloqueadas até o fim.
+"""
+import argparse
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.config.database import engine as default_engine
+from src.services import report_service
+
+
+def backfill_sales_rollups(engine: Engine, batch_size: int = 1000) -> int:
+    """Retorna quantos pedidos foram agregados."""
+    with Session(engine) as db:
+        counted = report_service.rebuild_sales(db, batch_size)
+        db.commit()
+    return counted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Pedidos lidos por consulta (padrão: 1000)")
+    args = parser.parse_args()
+
+    counted = backfill_sales_rollups(default_engine, args.batch_size)
+    print(f"{counted} pedidos agregados")
+
+
+if __name__ == "__main__":
+    main()
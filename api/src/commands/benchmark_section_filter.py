@@ -0,0 +1,127 @@
+"""
+Compara o filtro de pedidos por seção feito com JOIN e com EXISTS.
+
+Uso: python -m src.commands.benchmark_section_filter [--orders N]
+     [--items-per-order N] [--repeat N] [--database-url URL]
+
+Popula um banco descartável (por padrão um SQLite temporário) e mede, para
+cada estratégia, o COUNT(*) e a primeira página de 100 pedidos. O JOIN
+repete o pedido para cada item da seção, inflando o total; o EXISTS conta
+cada pedido uma vez.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.config.database import Base
+from src.models.client import Client
+from src.models.order import Order, OrderItem, OrderStatus
+from src.models.product import Product
+from src.services.order_service import ORDER_CURSOR_KEYS, section_criterion
+
+SECTIONS = ["Roupas", "Calçados", "Acessórios", "Cosméticos", "Bolsas", "Joias"]
+PRODUCTS_PER_SECTION = 50
+PAGE_SIZE = 100
+
+
+def seed(engine: Engine, orders: int, items_per_order: int, rng: random.Random) -> None:
+    """Cria as tabelas e insere clientes, produtos, pedidos e itens."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Client), [
+            {"name": f"Cliente {i}", "email": f"cliente{i}@exemplo.com", "cpf": f"{i:011d}"}
+            for i in range(1, 101)
+        ])
+        conn.execute(insert(Product), [
+            {"description": f"{section} {i}", "price": 10.0 + i, "section": section, "stock": 1000}
+            for section in SECTIONS for i in range(PRODUCTS_PER_SECTION)
+        ])
+        conn.execute(insert(Order), [
+            {"client_id": rng.randint(1, 100), "status": OrderStatus.PENDING, "total_amount": 0.0}
+            for _ in range(orders)
+        ])
+        product_count = len(SECTIONS) * PRODUCTS_PER_SECTION
+        conn.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": rng.randint(1, product_count),
+             "quantity": 1, "unit_price": 10.0}
+            for order_id in range(1, orders + 1) for _ in range(items_per_order)
+        ])
+
+
+def _join_query(db: Session, section: str):
+    # Estratégia anterior: junta os itens e produtos ao pedido
+    return db.query(Order).join(OrderItem, OrderItem.order_id == Order.id).join(
+        Product, Product.id == OrderItem.product_id).filter(Product.section == section)
+
+
+def _exists_query(db: Session, section: str):
+    return db.query(Order).filter(section_criterion(section))
+
+
+def _measure(fn, repeat: int) -> tuple[object, float]:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return result, statistics.median(timings)
+
+
+def run_benchmark(engine: Engine, section: str = SECTIONS[0], repeat: int = 5) -> dict:
+    """Mede as duas estratégias sobre um banco já populado."""
+    results = {}
+    with Session(engine) as db:
+        for name, build in (("join", _join_query), ("exists", _exists_query)):
+            query = build(db, section)
+            total, count_ms = _measure(query.count, repeat)
+            page, page_ms = _measure(
+                lambda: query.order_by(*ORDER_CURSOR_KEYS).limit(PAGE_SIZE).all(), repeat)
+            results[name] = {
+                "total": total,
+                "count_ms": round(count_ms, 2),
+                "page_rows": len(page),
+                "page_ms": round(page_ms, 2),
+            }
+        results["distinct_orders"] = db.query(Order.id).filter(section_criterion(section)).count()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20000, help="Pedidos gerados (padrão: 20000)")
+    parser.add_argument("--items-per-order", type=int, default=3, help="Itens por pedido (padrão: 3)")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por medida (padrão: 5)")
+    parser.add_argument("--database-url", help="Banco descartável (padrão: SQLite temporário)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'benchmark.db')}"
+
+    engine = create_engine(url)
+    try:
+        seed(engine, args.orders, args.items_per_order, random.Random(42))
+        results = run_benchmark(engine, repeat=args.repeat)
+    finally:
+        engine.dispose()
+        if tmpdir:
+            tmpdir.cleanup()
+
+    print(f"Pedidos distintos com itens da seção: {results['distinct_orders']}")
+    for name in ("join", "exists"):
+        r = results[name]
+        print(f"{name:>6}: total={r['total']:>7} ({r['count_ms']} ms)  "
+              f"página={r['page_rows']} linhas ({r['page_ms']} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Constrói ou inspeciona o snapshot do catálogo compartilhado pelos workers.
+
+Uso: python -m src.commands.catalog_snapshot build [--path ARQUIVO]
+     python -m src.commands.catalog_snapshot show [--path ARQUIVO] [--id N | --barcode CODIGO]
+
+`build` reconstrói o arquivo imediatamente, por exemplo antes de subir a
+API ou após uma carga em massa de produtos; os workers passam a usá-lo em
+até um segundo. Com a API em execução (CATALOG_SNAPSHOT_ENABLED=true) a
+reconstrução é automática. `show` exibe o cabeçalho do snapshot e,
+opcionalmente, um produto.
+"""
+import argparse
+
+from src.config.database import SessionLocal
+from src.utils import catalog_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Reconstrói o snapshot a partir do banco")
+    show = commands.add_parser("show", help="Exibe o cabeçalho do snapshot e, opcionalmente, um produto")
+    for command in (build, show):
+        command.add_argument("--path", default=catalog_snapshot.CATALOG_SNAPSHOT_PATH,
+                             help=f"Arquivo do snapshot (padrão: {catalog_snapshot.CATALOG_SNAPSHOT_PATH})")
+    lookup = show.add_mutually_exclusive_group()
+    lookup.add_argument("--id", type=int, help="ID do produto")
+    lookup.add_argument("--barcode", help="Código de barras do produto")
+    args = parser.parse_args()
+
+    reader = catalog_snapshot.SnapshotReader(args.path)
+    if args.command == "build":
+        catalog_snapshot.refresh_snapshot(SessionLocal, reader, max_age_seconds=0)
+
+    snapshot = reader.current()
+    if snapshot is None:
+        parser.error(f"snapshot não encontrado em {args.path}")
+    print(f"{args.path}: {snapshot.count} produtos, última atualização {snapshot.max_updated_at}, "
+          f"construído em {snapshot.built_at}")
+    if args.command == "show" and (args.id is not None or args.barcode):
+        item = snapshot.get(args.id) if args.id is not None else snapshot.get_by_barcode(args.barcode)
+        print(item._asdict() if item else "produto não encontrado no snapshot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Mantém as partições mensais de `order` e arquiva as antigas.
+
+Uso: python -m src.commands.order_partitions list
+     python -m src.commands.order_partitions create [--months-ahead N]
+     python -m src.commands.order_partitions archive --before AAAA-MM [--dir DIR]
+     python -m src.commands.order_partitions restore ARQUIVO
+
+`create` cria as partições do mês atual e dos próximos meses (agende-o,
+por exemplo, mensalmente). `archive` grava cada partição anterior ao mês
+informado, com os itens dos pedidos, em `DIR/order_yAAAAmMM.ndjson.gz` e
+só então a desanexa e remove. `restore` recria a partição de um arquivo
+e recarrega seus pedidos e itens. Requer PostgreSQL com a migração de
+particionamento aplicada.
+"""
+import argparse
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session
+
+from src.config.database import engine
+from src.services import partition_service
+
+
+def _month(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("use o formato AAAA-MM")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Lista as partições e o número estimado de pedidos")
+    create = commands.add_parser("create", help="Cria as partições dos próximos meses")
+    create.add_argument("--months-ahead", type=int, default=partition_service.ORDER_PARTITION_MONTHS_AHEAD,
+                        help=f"Meses além do atual (padrão: {partition_service.ORDER_PARTITION_MONTHS_AHEAD})")
+    archive = commands.add_parser("archive", help="Arquiva e remove as partições anteriores a um mês")
+    archive.add_argument("--before", type=_month, required=True, help="Primeiro mês mantido (AAAA-MM)")
+    archive.add_argument("--dir", default=partition_service.ORDER_ARCHIVE_DIR,
+                         help=f"Diretório dos arquivos (padrão: {partition_service.ORDER_ARCHIVE_DIR})")
+    restore = commands.add_parser("restore", help="Restaura uma partição arquivada")
+    restore.add_argument("path", help="Arquivo order_yAAAAmMM.ndjson.gz")
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        if not partition_service.is_partitioned(db):
+            parser.error("a tabela order não está particionada (PostgreSQL com a migração aplicada)")
+
+        if args.command == "list":
+            for partition in partition_service.list_partitions(db):
+                print(f"{partition['name']:<20} ~{partition['rows']} pedidos")
+        elif args.command == "create":
+            created = partition_service.ensure_partitions(db, args.months_ahead)
+            print(f"{len(created)} partições criadas: {', '.join(created) or '-'}")
+        elif args.command == "archive":
+            for result in partition_service.archive_partitions(db, args.before, args.dir):
+                print(f"{result['partition']}: {result['orders']} pedidos e "
+                      f"{result['items']} itens em {result['path']}")
+        else:
+            result = partition_service.restore_partition(db, args.path)
+            print(f"{result['partition']}: {result['orders']} pedidos e {result['items']} itens restaurados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Processa os eventos do outbox em um processo separado da API.
+
+Uso: python -m src.commands.outbox_worker [--once] [--batch-size N]
+     [--poll-seconds S] [--purge-days N]
+
+Consome a tabela `outbox_event` até receber SIGINT/SIGTERM (ou, com
+--once, até não haver eventos pendentes). Vários workers podem rodar ao
+mesmo tempo no PostgreSQL. Os eventos concluídos há mais de
+OUTBOX_RETENTION_DAYS dias são removidos periodicamente; com --purge-days,
+remove antes os concluídos há mais de N dias. Deixe
+OUTBOX_WORKER_ENABLED=false na API quando usar este comando.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from src.config.database import SessionLocal
+from src.utils import outbox
+
+
+def drain(session_factory: Callable[[], Session], batch_size: int) -> int:
+    """Processa lotes até não haver eventos pendentes; retorna o total reservado."""
+    total = 0
+    while True:
+        claimed = outbox.process_batch(session_factory, batch_size)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+def purge(session_factory: Callable[[], Session], days: int) -> int:
+    return outbox.purge_processed(session_factory, days)
+
+
+async def serve(session_factory: Callable[[], Session], batch_size: int, poll_seconds: float) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await outbox.run_worker(session_factory, stop, batch_size, poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--once", action="store_true",
+                        help="Processa os eventos pendentes e encerra")
+    parser.add_argument("--batch-size", type=int, default=outbox.OUTBOX_BATCH_SIZE,
+                        help=f"Eventos reservados por lote (padrão: {outbox.OUTBOX_BATCH_SIZE})")
+    parser.add_argument("--poll-seconds", type=float, default=outbox.OUTBOX_POLL_SECONDS,
+                        help=f"Espera sem eventos pendentes (padrão: {outbox.OUTBOX_POLL_SECONDS})")
+    parser.add_argument("--purge-days", type=int,
+                        help="Remove eventos concluídos há mais de N dias")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.purge_days is not None:
+        print(f"{purge(SessionLocal, args.purge_days)} eventos concluídos removidos")
+    if args.once:
+        print(f"{drain(SessionLocal, args.batch_size)} eventos processados")
+        return
+    asyncio.run(serve(SessionLocal, args.batch_size, args.poll_seconds))
+
+
+if __name__ == "__main__":
+    main()
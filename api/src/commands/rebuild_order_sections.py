@@ -0,0 +1,56 @@
+"""
+Confere e recalcula a lista desnormalizada `order.sections`.
+
+Uso: python -m src.commands.rebuild_order_sections [--batch-size N] [--check]
+
+Percorre os pedidos em lotes pela chave primária (uma transação por lote)
+e regrava apenas os pedidos cujas seções divergem dos itens. Com --check,
+apenas informa as divergências.
+"""
+import argparse
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.config.database import engine as default_engine
+from src.models.order import Order
+from src.services import order_service
+
+
+def rebuild_order_sections(engine: Engine, batch_size: int = 1000, check_only: bool = False) -> tuple[int, int]:
+    """Retorna (pedidos verificados, pedidos divergentes)."""
+    checked = mismatched = 0
+    last_id = 0
+    while True:
+        with Session(engine) as db:
+            order_ids = [
+                order_id for (order_id,) in
+                db.query(Order.id).filter(Order.id > last_id).order_by(Order.id).limit(batch_size)
+            ]
+            if not order_ids:
+                break
+            mismatched += order_service.refresh_sections(db, order_ids)
+            if check_only:
+                db.rollback()
+            else:
+                db.commit()
+        checked += len(order_ids)
+        last_id = order_ids[-1]
+    return checked, mismatched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Pedidos por transação (padrão: 1000)")
+    parser.add_argument("--check", action="store_true",
+                        help="Apenas informa as divergências, sem gravar")
+    args = parser.parse_args()
+
+    checked, mismatched = rebuild_order_sections(default_engine, args.batch_size, args.check)
+    action = "divergentes" if args.check else "corrigidos"
+    print(f"{checked} pedidos verificados, {mismatched} {action}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+
+class DBExecutor:
+    """
+    Pool de threads dedicado às chamadas síncronas ao banco.
+
+    O número de workers acompanha o tamanho do pool de conexões do engine,
+    de modo que nenhuma thread fique parada esperando por uma conexão. Quando
+    a fila de espera atinge `queue_depth`, novas chamadas são recusadas com
+    503 e `Retry-After` em vez de se acumularem.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db-executor")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._queued >= self.queue_depth:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor sobrecarregado, tente novamente em instantes",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+
+        def task():
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        submitted = self._pool.submit(task)
+        future = asyncio.wrap_future(submitted)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # A thread pode estar usando a sessão do request: só propaga o
+            # cancelamento depois que ela terminar, para que get_db não feche
+            # a sessão em uso. Se ainda estava na fila, nem chega a executar.
+            if submitted.cancel():
+                with self._lock:
+                    self._queued -= 1
+            else:
+                while not future.done():
+                    try:
+                        await asyncio.wait({future})
+                    except asyncio.CancelledError:
+                        continue
+                if not future.cancelled():
+                    future.exception()
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queue_depth,
+                "active_workers": self._active,
+                "queued": self._queued,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_avg_ms": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "queue_wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
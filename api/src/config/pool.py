@@ -0,0 +1,83 @@
+import os
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.utils.metrics import Histogram
+
+# Configurações do pool de conexões
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_USE_LIFO = os.environ.get("DB_POOL_USE_LIFO", "false").lower() in ("1", "true", "yes")
+
+
+class _InstrumentedPoolMixin:
+    """Mede o tempo de espera por uma conexão em cada checkout do pool."""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkout_wait.observe((time.perf_counter() - started_at) * 1000)
+
+    def recreate(self):
+        # Mantém as métricas quando o engine recria o pool (ex.: dispose)
+        pool = super().recreate()
+        pool.checkout_wait = self.checkout_wait
+        pool.timeouts = self.timeouts
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram()
+        self.timeouts = 0
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram()
+        self.timeouts = 0
+
+
+def pool_options(url: str, is_async: bool = False) -> dict:
+    """Argumentos de pool para `create_engine`/`create_async_engine`."""
+    # SQLite (testes) usa o pool padrão do dialeto
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+    }
+
+
+def pool_stats(pool) -> dict:
+    """Conexões em uso, ociosas e em overflow, além da espera no checkout."""
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, _InstrumentedPoolMixin):
+        stats["checkout_timeouts"] = pool.timeouts
+        stats["checkout_wait_ms"] = pool.checkout_wait.snapshot()
+    return stats
@@ -0,0 +1,62 @@
+import hashlib
+import itertools
+import threading
+import time
+from typing import Optional, Sequence
+
+from fastapi import Request
+
+# Métodos que alteram dados e ativam a leitura no primário por alguns segundos
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def stickiness_key(request: Request) -> Optional[str]:
+    """Identifica o autor da requisição pelo token de acesso enviado."""
+    authorization = request.headers.get("Authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+class ReplicaRouter:
+    """
+    Escolhe a fábrica de sessões usada pelas rotas somente leitura.
+
+    As leituras são distribuídas entre as réplicas em round-robin. Depois
+    que um usuário escreve, suas leituras voltam ao primário durante
+    `sticky_seconds`, para que ele enxergue as próprias alterações mesmo
+    com atraso de replicação.
+    """
+
+    def __init__(self, primary, replicas: Sequence = (), sticky_seconds: float = 5.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+        self._recent_writes: dict[str, float] = {}
+
+    def mark_write(self, key: Optional[str]) -> None:
+        if not key or not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[key] = now + self.sticky_seconds
+            # Remove marcações expiradas para manter o dicionário pequeno
+            if len(self._recent_writes) > 1024:
+                self._recent_writes = {
+                    k: until for k, until in self._recent_writes.items() if until > now
+                }
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            until = self._recent_writes.get(key)
+        return until is not None and until > time.monotonic()
+
+    def for_read(self, key: Optional[str] = None):
+        if not self.replicas or self.is_sticky(key):
+            return self.primary
+        with self._lock:
+            return next(self._cycle)
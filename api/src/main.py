@@ -1,7 +1,26 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.routes import auth, client, order, product
+from src.config.database import SessionLocal, mark_primary_write
+from src.config.replicas import WRITE_METHODS
+from src.routes import admin, auth, client, order, product, report
+from src.utils import catalog_snapshot, outbox
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Efeitos colaterais dos pedidos (outbox) processados em segundo plano
+    if outbox.OUTBOX_WORKER_ENABLED:
+        outbox.start_worker(SessionLocal)
+    # Snapshot do catálogo: todos os workers leem, apenas um reconstrói
+    if catalog_snapshot.CATALOG_SNAPSHOT_ENABLED:
+        catalog_snapshot.start_refresher(SessionLocal)
+    yield
+    await catalog_snapshot.stop_refresher()
+    await outbox.stop_worker()
+
 
 app = FastAPI(
     title="Lu Estilo API",
@@ -14,6 +33,7 @@ app = FastAPI(
     * **Clientes** - CRUD completo de clientes
     * **Produtos** - Gerenciamento de estoque e catálogo
     * **Pedidos** - Criação e acompanhamento de vendas
+    * **Relatórios** - Vendas por dia, seção e cliente
 
     ### Autenticação
     
@@ -31,7 +51,8 @@ app = FastAPI(
     
     Muitos endpoints suportam filtros e paginação para facilitar a navegação dos dados.
     """,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuração de CORS para permitir acesso do frontend
@@ -43,10 +64,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def replica_stickiness(request: Request, call_next):
+    """Após uma escrita bem-sucedida, as leituras do usuário usam o primário."""
+    response = await call_next(request)
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        mark_primary_write(request)
+    return response
+
+
 app.include_router(auth.router)
 app.include_router(client.router)
 app.include_router(product.router)
 app.include_router(order.router)
+app.include_router(report.router)
+app.include_router(admin.router)
 
 
 @app.get("/", tags=["🏠 Informações"], summary="Informações da API", description="Retorna informações básicas sobre a API e links úteis.")
@@ -2,7 +2,11 @@ from src.config.database import Base
 from src.models.user import User, UserRole
 from src.models.client import Client
 from src.models.product import Product
-from src.models.order import Order, OrderStatus, order_products
+from src.models.order import Order, OrderItem, OrderStatus
+from src.models.idempotency import IdempotencyKey
+from src.models.outbox import OutboxEvent
+from src.models.report import SalesDaily, SalesDailyClient, SalesDailySection
 
 # Exportar todos os modelos
-__all__ = ['Base', 'User', 'UserRole', 'Client', 'Product', 'Order', 'OrderStatus']
+__all__ = ['Base', 'User', 'UserRole', 'Client', 'Product', 'Order', 'OrderItem', 'OrderStatus',
+           'IdempotencyKey', 'OutboxEvent', 'SalesDaily', 'SalesDailySection', 'SalesDailyClient']
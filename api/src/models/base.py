@@ -1,13 +1,18 @@
 from sqlalchemy import Column, Integer, DateTime, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declared_attr
 from src.config.database import Base
 
+# No SQLite (testes), CURRENT_TIMESTAMP grava sem microssegundos; os parâmetros
+# usam o mesmo formato para que comparações (ex.: cursores) sejam consistentes.
+Timestamp = DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
 class BaseModel(Base):
     __abstract__ = True
     
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(Timestamp, default=func.now(), nullable=False)
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now(), nullable=False)
     
     @declared_attr
     def __tablename__(cls):
@@ -1,9 +1,17 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from src.models.base import BaseModel
 from sqlalchemy.orm import relationship
 
 
 class Client(BaseModel):
+    __table_args__ = (
+        # Índices trigram (pg_trgm) para buscas por substring e similaridade
+        Index("ix_client_name_trgm", "name", postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_client_email_trgm", "email", postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}),
+    )
+
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     cpf = Column(String(11), unique=True, index=True, nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import (Column, ForeignKey, Integer, String, Text,
+                        UniqueConstraint)
+
+from src.models.base import BaseModel, Timestamp
+
+
+class IdempotencyKey(BaseModel):
+    """Resposta registrada para um `Idempotency-Key` enviado por um usuário."""
+
+    __tablename__ = "idempotency_key"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_key_user_key"),
+    )
+
+    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    # Nulos enquanto a requisição original ainda está em processamento
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    expires_at = Column(Timestamp, nullable=False, index=True)
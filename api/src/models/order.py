@@ -1,10 +1,11 @@
 import enum
 
-from sqlalchemy import Column, Enum, Float, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, Enum, Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from src.config.database import Base
 from src.models.base import BaseModel
+from src.models.types import StringArray
 
 
 class OrderStatus(str, enum.Enum):
@@ -15,21 +16,17 @@ class OrderStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
-# Tabela de associação para relacionamento muitos-para-muitos
-order_products = Table(
-    'order_products',
-    Base.metadata,
-    Column('order_id', Integer, ForeignKey('order.id'), primary_key=True),
-    Column('product_id', Integer, ForeignKey('product.id'), primary_key=True),
-    Column('quantity', Integer, nullable=False),
-    Column('unit_price', Float, nullable=False)
-)
-
-
 class OrderItem(Base):
     __tablename__ = "order_item"
+    __table_args__ = (
+        # Itens de um pedido e pedidos que contêm um produto
+        Index("ix_order_item_order_id", "order_id"),
+        Index("ix_order_item_product_id_order_id", "product_id", "order_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # Com `order` particionada (PostgreSQL, ver partition_service), a chave
+    # estrangeira não existe no banco: a integridade fica com o order_service
     order_id = Column(Integer, ForeignKey("order.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -41,12 +38,30 @@ class OrderItem(Base):
 
 
 class Order(BaseModel):
+    __table_args__ = (
+        # Paginação por cursor em (created_at, id)
+        Index("ix_order_created_at_id", "created_at", "id"),
+        # Filtros de /orders por cliente ou status, já na ordem da paginação
+        # (o intervalo de datas usa a segunda coluna)
+        Index("ix_order_client_id_created_at_id", "client_id", "created_at", "id"),
+        Index("ix_order_status_created_at_id", "status", "created_at", "id"),
+        # Varreduras longas por intervalo de datas (PostgreSQL)
+        Index("ix_order_created_at_brin", "created_at", postgresql_using="brin"),
+        # Filtro por seção: sections @> ARRAY[...]
+        Index("ix_order_sections", "sections", postgresql_using="gin"),
+    )
+
     client_id = Column(Integer, ForeignKey('client.id'), nullable=False)
     status = Column(Enum(OrderStatus),
                     default=OrderStatus.PENDING, nullable=False)
     total_amount = Column(Float, nullable=False)
+    # Seções distintas dos produtos do pedido (desnormalizado), mantidas pelo
+    # order_service; `python -m src.commands.rebuild_order_sections` as recalcula
+    sections = Column(StringArray, default=list, nullable=False)
 
     # Relacionamentos
     client = relationship("Client", back_populates="orders")
-    products = relationship("Product", secondary=order_products)
-    items = relationship("OrderItem", back_populates="order", lazy="joined")
+    products = relationship("Product", secondary="order_item", viewonly=True)
+    # Sem carregamento implícito: cada consulta escolhe a estratégia
+    # (ver ORDER_LIST_LOADERS/ORDER_DETAIL_LOADERS em order_service)
+    items = relationship("OrderItem", back_populates="order")
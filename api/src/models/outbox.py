@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Index, Integer, String, Text, text
+
+from src.models.base import BaseModel, Timestamp
+
+
+class OutboxEvent(BaseModel):
+    """
+    Evento de um pedido gravado na mesma transação da alteração.
+
+    Consumido pelo worker de `src.utils.outbox`, que executa os efeitos
+    colaterais (notificações, invalidação de cache...) fora da requisição.
+    """
+
+    __tablename__ = "outbox_event"
+    __table_args__ = (
+        # Apenas os eventos pendentes, na ordem em que o worker os busca
+        Index(
+            "ix_outbox_event_pending", "available_at", "id",
+            postgresql_where=text("processed_at IS NULL"),
+            sqlite_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    event_type = Column(String(64), nullable=False)
+    aggregate_id = Column(Integer, nullable=False, index=True)
+    payload = Column(Text, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    # Próxima tentativa; adiada ao reservar o evento e após cada falha
+    available_at = Column(Timestamp, nullable=False)
+    processed_at = Column(Timestamp, nullable=True)
+    last_error = Column(Text, nullable=True)
@@ -1,11 +1,14 @@
-from sqlalchemy import Column, String, Float, Integer, Date, Text
+from sqlalchemy import Column, String, Float, Integer, Date
 from src.models.base import BaseModel
+from src.models.types import StringArray
 
 class Product(BaseModel):
     description = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     barcode = Column(String, unique=True, index=True, nullable=True)
-    section = Column(String, nullable=False)
+    section = Column(String, index=True, nullable=False)
     stock = Column(Integer, default=0, nullable=False)
     expiry_date = Column(Date, nullable=True)
-    image_urls = Column(Text, nullable=True)
+    # Lista de URLs (vazia em vez de nula): ARRAY decodificado pelo driver no
+    # PostgreSQL e JSON no SQLite, sem conversão nos serviços
+    image_urls = Column(StringArray, default=list, nullable=False)
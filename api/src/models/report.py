@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+
+from src.config.database import Base
+
+
+# Agregados diários de vendas (pedidos não cancelados), mantidos de forma
+# incremental pelo order_service e reconstruídos por
+# `python -m src.commands.backfill_sales_rollups`
+
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)
+
+
+class SalesDailySection(Base):
+    __tablename__ = "sales_daily_section"
+
+    day = Column(Date, primary_key=True)
+    section = Column(String, primary_key=True)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)
+
+
+class SalesDailyClient(Base):
+    __tablename__ = "sales_daily_client"
+
+    day = Column(Date, primary_key=True)
+    client_id = Column(Integer, ForeignKey("client.id"), primary_key=True)
+    orders = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)
@@ -0,0 +1,6 @@
+from sqlalchemy import JSON, String
+from sqlalchemy.dialects import postgresql
+
+# Lista de strings: ARRAY nativo no PostgreSQL (indexável com GIN) e JSON nos
+# demais bancos (SQLite nos testes)
+StringArray = JSON().with_variant(postgresql.ARRAY(String), "postgresql")
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends
+
+from src.config.database import (async_engine, db_executor, engine,
+                                 replica_engines)
+from src.config.pool import pool_stats
+from src.models.user import User
+from src.utils.cache import response_cache
+from src.utils.security import get_current_admin
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["⚙️ Administração"],
+    responses={
+        403: {"description": "Acesso negado - apenas administradores"},
+    }
+)
+
+
+@router.get("/db/executor", summary="Estatísticas do executor do banco", description="Retorna workers ativos, fila e tempo de espera do pool de threads usado nas chamadas ao banco. Apenas administradores podem acessar.", response_description="Estatísticas do executor.")
+async def executor_stats(current_user: User = Depends(get_current_admin)):
+    """
+    Estatísticas do pool de threads dedicado ao banco de dados.
+    Útil para dimensionar `DB_EXECUTOR_WORKERS` frente ao pool de conexões.
+    """
+    return db_executor.stats()
+
+
+@router.get("/db/pool", summary="Estatísticas do pool de conexões", description="Retorna conexões em uso, ociosas e em overflow, além do histograma de espera no checkout. Apenas administradores podem acessar.", response_description="Estatísticas do pool de conexões.")
+async def pool_statistics(current_user: User = Depends(get_current_admin)):
+    """
+    Estatísticas ao vivo dos pools de conexão do banco de dados.
+    """
+    stats = {"primary": pool_stats(engine.pool)}
+    for index, replica in enumerate(replica_engines):
+        stats[f"replica_{index}"] = pool_stats(replica.pool)
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.pool)
+    return stats
+
+
+@router.get("/cache", summary="Estatísticas do cache de respostas", description="Retorna acertos, faltas, invalidações e erros do cache de respostas deste processo, além das estatísticas do backend (no backend em memória, expirações e remoções por capacidade). Apenas administradores podem acessar.", response_description="Estatísticas do cache.")
+async def cache_stats(current_user: User = Depends(get_current_admin)):
+    """
+    Estatísticas do cache de respostas.
+    Útil para ajustar `CACHE_MAX_ENTRIES` e `CACHE_TTL_SECONDS`.
+    """
+    return response_cache.stats()
@@ -4,9 +4,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import get_db, run_service
 from src.models.user import User
 from src.schemas.auth import Token, UserCreate, UserResponse
+from src.services import user_service
 from src.utils.security import (ACCESS_TOKEN_EXPIRE_MINUTES,
                                 create_access_token, get_current_user,
                                 get_password_hash, verify_password)
@@ -32,7 +33,8 @@ async def login(
     - **password**: Senha do usuário
     Retorna um token JWT se as credenciais estiverem corretas.
     """
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await run_service(
+        user_service.get_user_by_username, db, username=form_data.username)
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,28 +58,9 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     - **password**: Senha do usuário
     - **role**: Papel do usuário (admin ou user)
     """
-    # Verificar se o usuário já existe
-    db_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Usuário ou email já cadastrado"
-        )
-
-    # Criar novo usuário
     hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password,
-        role=user.role
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await run_service(
+        user_service.create_user, db, user=user, hashed_password=hashed_password)
 
 
 @router.post("/refresh-token", response_model=Token, summary="Renovar token de acesso", description="Gera um novo token JWT para o usuário autenticado.", response_description="Novo token de acesso JWT.")
@@ -3,12 +3,16 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import (get_db, get_read_db,
+                                 get_read_session_factory, run_service)
 from src.models.user import User, UserRole
 from src.schemas.client import (ClientCreate, ClientList, ClientResponse,
                                 ClientUpdate)
 from src.services import client_service
-from src.utils.security import get_current_user
+from src.utils.cache import cached_response, scope
+from src.utils.export import ExportFormat, stream_export
+from src.utils.pagination import TotalMode, next_cursor, total_kind
+from src.utils.security import get_current_read_user, get_current_user
 
 router = APIRouter(
     prefix="/clients",
@@ -20,39 +24,97 @@ router = APIRouter(
 )
 
 
-@router.get("", response_model=ClientList, summary="Listar clientes", description="Retorna uma lista paginada de clientes cadastrados, com filtros por nome e email.", response_description="Lista de clientes.")
+@router.get("", response_model=ClientList, summary="Listar clientes", description="Retorna uma lista paginada de clientes cadastrados, com filtros por nome e email, combináveis com a busca aproximada.", response_description="Lista de clientes.")
 async def list_clients(
     name: Optional[str] = None,
     email: Optional[str] = None,
+    search: Optional[str] = Query(None, min_length=2, description="Busca aproximada por nome ou email, ordenada por relevância"),
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor retornado em `next_cursor`; quando informado, `page` é ignorado"),
+    include_total: bool = Query(True, description="Calcula o total de registros"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="exact (COUNT separado), window (mesma consulta) ou estimate (aproximado)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """
     Lista clientes cadastrados.
     - **name**: Filtra clientes pelo nome
     - **email**: Filtra clientes pelo email
+    - **search**: Busca aproximada (melhores resultados primeiro; sem cursor), combinável com name e email
     - **page**: Página da paginação
     - **size**: Tamanho da página
+    - **cursor**: Cursor da próxima página (paginação por chave)
+    - **include_total**: Se falso, o total não é calculado
+    - **total_mode**: Forma de cálculo do total
     """
     skip = (page - 1) * size
-    clients, total = client_service.get_clients(
-        db=db,
+    mode = total_mode if include_total else None
+    if search:
+        clients, total = await run_service(
+            client_service.search_clients,
+            db,
+            search=search,
+            skip=skip,
+            limit=size,
+            name=name,
+            email=email,
+            total_mode=mode
+        )
+        return {
+            "items": clients,
+            "total": total,
+            "total_kind": total_kind(mode),
+            "page": page,
+            "size": size
+        }
+
+    clients, total = await run_service(
+        client_service.get_clients,
+        db,
         skip=skip,
         limit=size,
         name=name,
-        email=email
+        email=email,
+        cursor=cursor,
+        total_mode=mode
     )
 
     return {
         "items": clients,
         "total": total,
+        "total_kind": total_kind(mode),
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor(clients, size, client_service.CLIENT_CURSOR_KEYS)
     }
 
 
+@router.get("/export", summary="Exportar clientes", description="Exporta todos os clientes que atendem aos filtros em CSV ou NDJSON. A resposta é enviada em streaming, lida do banco em lotes.", response_description="Arquivo com os clientes.")
+async def export_clients(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv ou ndjson"),
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    session_factory=Depends(get_read_session_factory),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Exporta clientes.
+    - **format**: Formato do arquivo (csv ou ndjson)
+    - **name**: Filtra por nome
+    - **email**: Filtra por email
+    """
+    return stream_export(
+        session_factory,
+        client_service.export_clients,
+        format,
+        client_service.CLIENT_EXPORT_COLUMNS,
+        "clientes",
+        name=name,
+        email=email
+    )
+
+
 @router.post("", response_model=ClientResponse, status_code=status.HTTP_201_CREATED, summary="Criar cliente", description="Cria um novo cliente no sistema.", response_description="Dados do cliente criado.")
 async def create_client(
     client: ClientCreate,
@@ -63,20 +125,21 @@ async def create_client(
     Cria um novo cliente.
     - **client**: Dados do cliente a ser criado
     """
-    return client_service.create_client(db=db, client=client)
+    return await run_service(client_service.create_client, db, client=client)
 
 
 @router.get("/{client_id}", response_model=ClientResponse, summary="Obter cliente", description="Retorna os dados de um cliente pelo ID.", response_description="Dados do cliente.")
+@cached_response("client", ClientResponse, scopes=lambda client_id, **_: [scope("client", client_id)])
 async def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """
     Busca um cliente pelo ID.
     - **client_id**: ID do cliente
     """
-    return client_service.get_client(db=db, client_id=client_id)
+    return await run_service(client_service.get_client, db, client_id=client_id)
 
 
 @router.put("/{client_id}", response_model=ClientResponse, summary="Atualizar cliente", description="Atualiza os dados de um cliente existente.", response_description="Dados do cliente atualizado.")
@@ -91,7 +154,7 @@ async def update_client(
     - **client_id**: ID do cliente
     - **client**: Novos dados do cliente
     """
-    return client_service.update_client(db=db, client_id=client_id, client=client)
+    return await run_service(client_service.update_client, db, client_id=client_id, client=client)
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Excluir cliente", description="Remove um cliente do sistema pelo ID.")
@@ -111,5 +174,5 @@ async def delete_client(
             detail="Apenas administradores podem excluir clientes"
         )
 
-    client_service.delete_client(db=db, client_id=client_id)
+    await run_service(client_service.delete_client, db, client_id=client_id)
     return None
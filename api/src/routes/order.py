@@ -1,16 +1,24 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query,
+                     Response, status)
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import (get_db, get_read_db,
+                                 get_read_session_factory, run_service)
 from src.models.order import OrderStatus
 from src.models.user import User, UserRole
-from src.schemas.order import (OrderCreate, OrderList, OrderResponse,
-                               OrderUpdate)
+from src.schemas.order import (OrderBulkCancel, OrderBulkCreate,
+                               OrderBulkResult, OrderCancelResult, OrderCreate,
+                               OrderList, OrderResponse, OrderUpdate)
 from src.services import order_service
-from src.utils.security import get_current_user
+from src.utils.cache import cached_response, scope
+from src.utils.export import ExportFormat, stream_export
+from src.utils.idempotency import request_hash, run_idempotent
+from src.utils.pagination import TotalMode, next_cursor, total_kind
+from src.utils.security import get_current_read_user, get_current_user
 
 router = APIRouter(
     prefix="/orders",
@@ -32,8 +40,11 @@ async def list_orders(
     section: Optional[str] = None,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor retornado em `next_cursor`; quando informado, `page` é ignorado"),
+    include_total: bool = Query(True, description="Calcula o total de registros"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="exact (COUNT separado), window (mesma consulta) ou estimate (aproximado)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """
     Lista pedidos cadastrados.
@@ -44,60 +55,167 @@ async def list_orders(
     - **section**: Filtra por seção
     - **page**: Página da paginação
     - **size**: Tamanho da página
+    - **cursor**: Cursor da próxima página (paginação por chave)
+    - **include_total**: Se falso, o total não é calculado
+    - **total_mode**: Forma de cálculo do total
     """
     skip = (page - 1) * size
-    orders, total = order_service.get_orders(
-        db=db,
+    mode = total_mode if include_total else None
+    orders, total = await run_service(
+        order_service.get_orders,
+        db,
         skip=skip,
         limit=size,
         client_id=client_id,
         status=status,
         start_date=start_date,
         end_date=end_date,
-        section=section
+        section=section,
+        cursor=cursor,
+        total_mode=mode
     )
 
     return {
         "items": orders,
         "total": total,
+        "total_kind": total_kind(mode),
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor(orders, size, order_service.ORDER_CURSOR_KEYS)
     }
 
 
-@router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED, summary="Criar pedido", description="Cria um novo pedido no sistema.", response_description="Dados do pedido criado.")
+@router.get("/export", summary="Exportar pedidos", description="Exporta todos os pedidos que atendem aos filtros em CSV ou NDJSON. A resposta é enviada em streaming, lida do banco em lotes.", response_description="Arquivo com os pedidos.")
+async def export_orders(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv ou ndjson"),
+    client_id: Optional[int] = None,
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    section: Optional[str] = None,
+    session_factory=Depends(get_read_session_factory),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Exporta pedidos.
+    - **format**: Formato do arquivo (csv ou ndjson)
+    - **client_id**: Filtra por ID do cliente
+    - **status**: Filtra por status do pedido
+    - **start_date**: Data inicial
+    - **end_date**: Data final
+    - **section**: Filtra por seção
+    """
+    return stream_export(
+        session_factory,
+        order_service.export_orders,
+        format,
+        order_service.ORDER_EXPORT_COLUMNS,
+        "pedidos",
+        client_id=client_id,
+        status=status,
+        start_date=start_date,
+        end_date=end_date,
+        section=section
+    )
+
+
+@router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED, summary="Criar pedido", description="Cria um novo pedido no sistema. Com o cabeçalho Idempotency-Key, repetições da mesma requisição devolvem a resposta original sem criar outro pedido.", response_description="Dados do pedido criado.")
 async def create_order(
     order: OrderCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255, description="Chave única da tentativa; repetições com a mesma chave devolvem a resposta original")
 ):
     """
     Cria um novo pedido.
     - **order**: Dados do pedido a ser criado
+    - **Idempotency-Key**: Chave de idempotência (opcional)
+    """
+    async def handler(record=None):
+        before_commit = None
+        if record:
+            # A resposta é gravada na mesma transação do pedido
+            def before_commit(session, db_order):
+                record(session, status.HTTP_201_CREATED, OrderResponse.model_validate(db_order))
+        # O serviço já recarrega o pedido (com itens e cliente) após o commit
+        db_order = await run_service(
+            order_service.create_order, db, order=order, before_commit=before_commit
+        )
+        return status.HTTP_201_CREATED, OrderResponse.model_validate(db_order)
+
+    if not idempotency_key:
+        return (await handler())[1]
+
+    status_code, body, replayed = await run_idempotent(
+        db, current_user.id, idempotency_key, request_hash(order), handler
+    )
+    return JSONResponse(
+        status_code=status_code,
+        content=body,
+        headers={"Idempotency-Replayed": "true" if replayed else "false"}
+    )
+
+
+@router.post("/bulk", response_model=OrderBulkResult, status_code=status.HTTP_201_CREATED, summary="Criar pedidos em lote", description="Cria vários pedidos em uma única requisição. Em all_or_nothing qualquer pedido inválido cancela o lote; em best_effort apenas os válidos são criados. Retorna 201 se algum pedido foi criado e 400 caso contrário, sempre com o resultado de cada pedido.", response_description="Resultado de cada pedido do lote.")
+async def create_orders_bulk(
+    bulk: OrderBulkCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
-    db_order = order_service.create_order(db=db, order=order)
+    Cria pedidos em lote.
+    - **orders**: Lista de pedidos (mesmo formato de `POST /orders`)
+    - **mode**: all_or_nothing ou best_effort
+    """
+    results = await run_service(
+        order_service.create_orders_bulk, db, orders=bulk.orders, mode=bulk.mode
+    )
 
-    # Carregar explicitamente os itens antes de retornar
-    db.refresh(db_order)
+    created = sum(1 for result in results if result["success"])
+    if not created:
+        response.status_code = status.HTTP_400_BAD_REQUEST
 
-    # Converter para um formato que inclua os itens
     return {
-        **db_order.__dict__,
-        "items": [item.__dict__ for item in db_order.items]
+        "mode": bulk.mode,
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
     }
 
 
+@router.post("/cancel", response_model=OrderCancelResult, summary="Cancelar pedidos em lote", description="Cancela vários pedidos e devolve o estoque de todos eles em uma única operação. Apenas administradores podem acessar.", response_description="Pedidos cancelados e estoque resultante dos produtos afetados.")
+async def cancel_orders(
+    cancel: OrderBulkCancel,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cancela pedidos em lote.
+    - **order_ids**: IDs dos pedidos
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem cancelar pedidos em lote"
+        )
+
+    return await run_service(order_service.cancel_orders, db, order_ids=cancel.order_ids)
+
+
 @router.get("/{order_id}", response_model=OrderResponse, summary="Obter pedido", description="Retorna os dados de um pedido pelo ID.", response_description="Dados do pedido.")
+# A resposta inclui o cliente: qualquer escrita em clientes a invalida
+@cached_response("order", OrderResponse, scopes=lambda order_id, **_: [scope("order", order_id), scope("clients")])
 async def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """
     Busca um pedido pelo ID.
     - **order_id**: ID do pedido
     """
-    return order_service.get_order(db=db, order_id=order_id)
+    return await run_service(order_service.get_order, db, order_id=order_id)
 
 
 @router.put("/{order_id}", response_model=OrderResponse, summary="Atualizar pedido", description="Atualiza os dados de um pedido existente.", response_description="Dados do pedido atualizado.")
@@ -112,10 +230,10 @@ async def update_order(
     - **order_id**: ID do pedido
     - **order**: Novos dados do pedido
     """
-    return order_service.update_order(db=db, order_id=order_id, order=order)
+    return await run_service(order_service.update_order, db, order_id=order_id, order=order)
 
 
-@router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Excluir pedido", description="Remove um pedido do sistema pelo ID. Apenas administradores podem acessar.")
+@router.delete("/{order_id}", response_model=OrderCancelResult, summary="Excluir pedido", description="Remove um pedido do sistema pelo ID e devolve o estoque dos itens, se o pedido não estava cancelado. Apenas administradores podem acessar.", response_description="Pedido cancelado pela exclusão e estoque resultante dos produtos afetados.")
 async def delete_order(
     order_id: int,
     db: Session = Depends(get_db),
@@ -132,5 +250,4 @@ async def delete_order(
             detail="Apenas administradores podem excluir pedidos"
         )
 
-    order_service.delete_order(db=db, order_id=order_id)
-    return None
+    return await run_service(order_service.delete_order, db, order_id=order_id)
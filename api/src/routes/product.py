@@ -3,12 +3,18 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import (get_db, get_read_db,
+                                 get_read_session_factory, run_service)
 from src.models.user import User, UserRole
-from src.schemas.product import (ProductCreate, ProductList, ProductResponse,
+from src.schemas.product import (CatalogItem, ProductCreate, ProductList,
+                                 ProductResponse, ProductSearchList,
                                  ProductUpdate)
 from src.services import product_service
-from src.utils.security import get_current_user
+from src.utils import catalog_snapshot
+from src.utils.cache import CACHE_MAX_PAGE, cached_response, scope
+from src.utils.export import ExportFormat, stream_export
+from src.utils.pagination import TotalMode, next_cursor, total_kind
+from src.utils.security import get_current_read_user, get_current_user
 
 router = APIRouter(
     prefix="/products",
@@ -21,6 +27,12 @@ router = APIRouter(
 
 
 @router.get("", response_model=ProductList, summary="Listar produtos", description="Retorna uma lista paginada de produtos, com filtros por categoria, preço e estoque.", response_description="Lista de produtos.")
+@cached_response(
+    "products", ProductList,
+    # Com categoria, só escritas na mesma seção invalidam a página
+    scopes=lambda category, **_: [scope("products", category) if category else scope("products")],
+    when=lambda cursor, page, **_: cursor is None and page <= CACHE_MAX_PAGE,
+)
 async def list_products(
     category: Optional[str] = None,
     min_price: Optional[float] = Query(None, ge=0),
@@ -28,8 +40,11 @@ async def list_products(
     in_stock: Optional[bool] = None,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor retornado em `next_cursor`; quando informado, `page` é ignorado"),
+    include_total: bool = Query(True, description="Calcula o total de registros"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="exact (COUNT separado), window (mesma consulta) ou estimate (aproximado)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """
     Lista produtos cadastrados.
@@ -39,26 +54,123 @@ async def list_products(
     - **in_stock**: Apenas produtos em estoque
     - **page**: Página da paginação
     - **size**: Tamanho da página
+    - **cursor**: Cursor da próxima página (paginação por chave)
+    - **include_total**: Se falso, o total não é calculado
+    - **total_mode**: Forma de cálculo do total
     """
     skip = (page - 1) * size
-    products, total = product_service.get_products(
-        db=db,
+    mode = total_mode if include_total else None
+    products, total = await run_service(
+        product_service.get_products,
+        db,
         skip=skip,
         limit=size,
         category=category,
         min_price=min_price,
         max_price=max_price,
-        in_stock=in_stock
+        in_stock=in_stock,
+        cursor=cursor,
+        total_mode=mode
     )
 
     return {
         "items": products,
         "total": total,
+        "total_kind": total_kind(mode),
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor(products, size, product_service.PRODUCT_CURSOR_KEYS)
+    }
+
+
+@router.get("/export", summary="Exportar produtos", description="Exporta todos os produtos que atendem aos filtros em CSV ou NDJSON. A resposta é enviada em streaming, lida do banco em lotes.", response_description="Arquivo com os produtos.")
+async def export_products(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv ou ndjson"),
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = None,
+    session_factory=Depends(get_read_session_factory),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Exporta produtos.
+    - **format**: Formato do arquivo (csv ou ndjson)
+    - **category**: Filtra por categoria (seção)
+    - **min_price**: Preço mínimo
+    - **max_price**: Preço máximo
+    - **in_stock**: Apenas produtos com estoque
+    """
+    return stream_export(
+        session_factory,
+        product_service.export_products,
+        format,
+        product_service.PRODUCT_EXPORT_COLUMNS,
+        "produtos",
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock
+    )
+
+
+@router.get("/search", response_model=ProductSearchList, summary="Buscar produtos", description="Busca textual na descrição e seção dos produtos, com os resultados mais relevantes primeiro.", response_description="Produtos encontrados.")
+async def search_products(
+    q: str = Query(..., min_length=2, description="Termos da busca"),
+    size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em `next_cursor`"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Busca produtos por palavras.
+    - **q**: Termos da busca (aceita aspas e `-termo` para exclusão)
+    - **size**: Tamanho da página
+    - **cursor**: Cursor da próxima página
+    """
+    products, cursor_next = await run_service(
+        product_service.search_products, db, q=q, limit=size, cursor=cursor)
+
+    return {
+        "items": products,
+        "size": size,
+        "next_cursor": cursor_next
     }
 
 
+@router.get("/catalog/{product_id}", response_model=CatalogItem, summary="Consultar produto no catálogo", description="Retorna os dados essenciais de um produto pelo ID a partir do snapshot do catálogo compartilhado entre os workers, sem consultar o banco. O estoque pode estar alguns segundos defasado.", response_description="Item do catálogo.")
+async def get_catalog_item(
+    product_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Consulta rápida de um produto pelo ID.
+    - **product_id**: ID do produto
+    """
+    item = catalog_snapshot.find(product_id=product_id)
+    if item is None:
+        # Snapshot desativado ou produto criado depois da última reconstrução
+        item = await run_service(product_service.get_catalog_item, db, product_id=product_id)
+    return item._asdict()
+
+
+@router.get("/catalog/barcode/{barcode}", response_model=CatalogItem, summary="Consultar produto por código de barras", description="Retorna os dados essenciais de um produto pelo código de barras a partir do snapshot do catálogo compartilhado entre os workers, sem consultar o banco. O estoque pode estar alguns segundos defasado.", response_description="Item do catálogo.")
+async def get_catalog_item_by_barcode(
+    barcode: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Consulta rápida de um produto pelo código de barras.
+    - **barcode**: Código de barras do produto
+    """
+    item = catalog_snapshot.find(barcode=barcode)
+    if item is None:
+        item = await run_service(product_service.get_catalog_item, db, barcode=barcode)
+    return item._asdict()
+
+
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED, summary="Criar produto", description="Cria um novo produto. Apenas administradores podem acessar.", response_description="Dados do produto criado.")
 async def create_product(
     product: ProductCreate,
@@ -76,20 +188,21 @@ async def create_product(
             detail="Apenas administradores podem criar produtos"
         )
 
-    return product_service.create_product(db=db, product=product)
+    return await run_service(product_service.create_product, db, product=product)
 
 
 @router.get("/{product_id}", response_model=ProductResponse, summary="Obter produto", description="Retorna os dados de um produto pelo ID.", response_description="Dados do produto.")
+@cached_response("product", ProductResponse, scopes=lambda product_id, **_: [scope("product", product_id)])
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """
     Busca um produto pelo ID.
     - **product_id**: ID do produto
     """
-    return product_service.get_product(db=db, product_id=product_id)
+    return await run_service(product_service.get_product, db, product_id=product_id)
 
 
 @router.put("/{product_id}", response_model=ProductResponse, summary="Atualizar produto", description="Atualiza os dados de um produto existente. Apenas administradores podem acessar.", response_description="Dados do produto atualizado.")
@@ -111,7 +224,7 @@ async def update_product(
             detail="Apenas administradores podem atualizar produtos"
         )
 
-    return product_service.update_product(db=db, product_id=product_id, product=product)
+    return await run_service(product_service.update_product, db, product_id=product_id, product=product)
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Excluir produto", description="Remove um produto do sistema pelo ID. Apenas administradores podem acessar.")
@@ -131,5 +244,5 @@ async def delete_product(
             detail="Apenas administradores podem excluir produtos"
         )
 
-    product_service.delete_product(db=db, product_id=product_id)
+    await run_service(product_service.delete_product, db, product_id=product_id)
     return None
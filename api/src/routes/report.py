@@ -0,0 +1,83 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from src.config.database import get_read_db, run_service
+from src.models.user import User
+from src.schemas.report import (ClientSalesReport, DailySalesReport,
+                                SectionSalesReport)
+from src.services import report_service
+from src.utils.security import get_current_read_admin
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["📊 Relatórios"],
+    responses={
+        403: {"description": "Acesso negado - apenas administradores"},
+    }
+)
+
+
+@router.get("/sales/daily", response_model=DailySalesReport, summary="Vendas por dia", description="Retorna pedidos e faturamento por dia (pedidos cancelados não entram), a partir dos agregados diários. Apenas administradores podem acessar.", response_description="Vendas por dia no período.")
+async def daily_sales(
+    start_date: Optional[date] = Query(None, description="Data inicial (inclusive)"),
+    end_date: Optional[date] = Query(None, description="Data final (inclusive)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_admin)
+):
+    """
+    Vendas por dia.
+    - **start_date**: Data inicial
+    - **end_date**: Data final
+    """
+    items = await run_service(
+        report_service.get_daily_sales, db, start_date=start_date, end_date=end_date
+    )
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "items": items,
+        "total_orders": sum(item["orders"] for item in items),
+        "total_revenue": round(sum(item["revenue"] for item in items), 2)
+    }
+
+
+@router.get("/sales/sections", response_model=SectionSalesReport, summary="Vendas por seção", description="Retorna unidades vendidas e faturamento por seção no período, a partir dos agregados diários. Apenas administradores podem acessar.", response_description="Vendas por seção no período.")
+async def sales_by_section(
+    start_date: Optional[date] = Query(None, description="Data inicial (inclusive)"),
+    end_date: Optional[date] = Query(None, description="Data final (inclusive)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_admin)
+):
+    """
+    Vendas por seção.
+    - **start_date**: Data inicial
+    - **end_date**: Data final
+    """
+    items = await run_service(
+        report_service.get_sales_by_section, db, start_date=start_date, end_date=end_date
+    )
+    return {"start_date": start_date, "end_date": end_date, "items": items}
+
+
+@router.get("/sales/clients", response_model=ClientSalesReport, summary="Vendas por cliente", description="Retorna os clientes com maior faturamento no período, a partir dos agregados diários. Apenas administradores podem acessar.", response_description="Clientes com maior faturamento no período.")
+async def sales_by_client(
+    start_date: Optional[date] = Query(None, description="Data inicial (inclusive)"),
+    end_date: Optional[date] = Query(None, description="Data final (inclusive)"),
+    limit: int = Query(10, ge=1, le=100, description="Quantidade de clientes"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_admin)
+):
+    """
+    Clientes com maior faturamento.
+    - **start_date**: Data inicial
+    - **end_date**: Data final
+    - **limit**: Quantidade de clientes
+    """
+    items = await run_service(
+        report_service.get_sales_by_client, db,
+        start_date=start_date, end_date=end_date, limit=limit
+    )
+    return {"start_date": start_date, "end_date": end_date, "items": items}
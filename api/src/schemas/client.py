@@ -3,6 +3,8 @@ from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
+from src.utils.pagination import TotalKind
+
 
 class ClientBase(BaseModel):
     name: str = Field(..., description="Nome completo do cliente", example="Maria Silva Santos", max_length=100)
@@ -66,6 +68,8 @@ class ClientResponse(ClientBase):
 
 class ClientList(BaseModel):
     items: List[ClientResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Total de registros (ausente se include_total=false)")
+    total_kind: TotalKind = Field(TotalKind.EXACT, description="Tipo do total: exact, estimate ou none")
     page: int
     size: int
+    next_cursor: Optional[str] = Field(None, description="Cursor para a próxima página (paginação por chave)")
@@ -1,3 +1,4 @@
+import enum
 from datetime import datetime
 from typing import List, Optional
 
@@ -5,6 +6,7 @@ from pydantic import BaseModel, Field
 
 from src.models.order import OrderStatus
 from src.schemas.client import ClientResponse
+from src.utils.pagination import TotalKind
 
 
 class OrderItemBase(BaseModel):
@@ -81,6 +83,7 @@ class OrderResponse(OrderBase):
     created_at: datetime = Field(..., description="Data de criação", example="2024-01-15T10:30:00")
     updated_at: datetime = Field(..., description="Data da última atualização", example="2024-01-20T14:45:00")
     items: List[OrderItemResponse] = Field(..., description="Lista de itens do pedido")
+    sections: List[str] = Field(default_factory=list, description="Seções dos produtos do pedido", example=["Acessórios", "Roupas"])
     client: Optional[ClientResponse] = Field(None, description="Dados do cliente")
 
     class Config:
@@ -106,6 +109,7 @@ class OrderResponse(OrderBase):
                         "unit_price": 79.90
                     }
                 ],
+                "sections": ["Acessórios", "Roupas"],
                 "client": {
                     "id": 1,
                     "name": "Maria Silva Santos",
@@ -122,6 +126,65 @@ class OrderResponse(OrderBase):
 
 class OrderList(BaseModel):
     items: List[OrderResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Total de registros (ausente se include_total=false)")
+    total_kind: TotalKind = Field(TotalKind.EXACT, description="Tipo do total: exact, estimate ou none")
     page: int
     size: int
+    next_cursor: Optional[str] = Field(None, description="Cursor para a próxima página (paginação por chave)")
+
+
+class BulkMode(str, enum.Enum):
+    ALL_OR_NOTHING = "all_or_nothing"  # qualquer pedido inválido cancela o lote
+    BEST_EFFORT = "best_effort"        # grava os válidos e reporta os inválidos
+
+
+class OrderBulkCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=1000, description="Pedidos do lote")
+    mode: BulkMode = Field(BulkMode.ALL_OR_NOTHING, description="all_or_nothing ou best_effort")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "mode": "best_effort",
+                "orders": [
+                    {
+                        "client_id": 1,
+                        "items": [{"product_id": 1, "quantity": 2}]
+                    },
+                    {
+                        "client_id": 2,
+                        "status": "processing",
+                        "items": [{"product_id": 2, "quantity": 1}]
+                    }
+                ]
+            }
+        }
+
+
+class OrderBulkItemResult(BaseModel):
+    index: int = Field(..., description="Posição do pedido no lote", example=0)
+    success: bool = Field(..., description="Se o pedido foi criado", example=True)
+    order_id: Optional[int] = Field(None, description="ID do pedido criado", example=1)
+    total_amount: Optional[float] = Field(None, description="Valor total do pedido criado", example=179.80)
+    error: Optional[str] = Field(None, description="Motivo da falha", example=None)
+
+
+class OrderBulkResult(BaseModel):
+    mode: BulkMode
+    created: int = Field(..., description="Quantidade de pedidos criados")
+    failed: int = Field(..., description="Quantidade de pedidos não criados")
+    results: List[OrderBulkItemResult]
+
+
+class OrderBulkCancel(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000, description="IDs dos pedidos a cancelar", example=[1, 2, 3])
+
+
+class RestoredStock(BaseModel):
+    product_id: int = Field(..., description="ID do produto", example=1)
+    stock: int = Field(..., description="Estoque após a devolução", example=12)
+
+
+class OrderCancelResult(BaseModel):
+    cancelled: List[int] = Field(..., description="Pedidos cancelados (já cancelados são ignorados)")
+    products: List[RestoredStock] = Field(..., description="Produtos que tiveram o estoque devolvido")
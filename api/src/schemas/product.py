@@ -3,6 +3,8 @@ from typing import Any, List, Optional
 
 from pydantic import BaseModel, Field
 
+from src.utils.pagination import TotalKind
+
 
 class ProductBase(BaseModel):
     description: str = Field(..., description="Descrição do produto", example="Vestido Floral Verão", max_length=200)
@@ -74,6 +76,23 @@ class ProductResponse(ProductBase):
 
 class ProductList(BaseModel):
     items: List[ProductResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Total de registros (ausente se include_total=false)")
+    total_kind: TotalKind = Field(TotalKind.EXACT, description="Tipo do total: exact, estimate ou none")
     page: int
     size: int
+    next_cursor: Optional[str] = Field(None, description="Cursor para a próxima página (paginação por chave)")
+
+
+class ProductSearchList(BaseModel):
+    items: List[ProductResponse]
+    size: int
+    next_cursor: Optional[str] = Field(None, description="Cursor para a próxima página de resultados")
+
+
+class CatalogItem(BaseModel):
+    id: int = Field(..., description="ID único do produto", example=1)
+    description: str = Field(..., description="Descrição do produto", example="Vestido Floral Verão")
+    price: float = Field(..., description="Preço do produto", example=89.90)
+    section: str = Field(..., description="Seção/categoria do produto", example="Roupas Femininas")
+    stock: int = Field(..., description="Quantidade em estoque (pode estar alguns segundos defasada)", example=15)
+    barcode: Optional[str] = Field(None, description="Código de barras", example="7891234567890")
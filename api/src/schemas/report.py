@@ -0,0 +1,41 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DailySales(BaseModel):
+    day: date = Field(..., description="Dia", example="2024-01-15")
+    orders: int = Field(..., description="Pedidos do dia (exceto cancelados)", example=42)
+    revenue: float = Field(..., description="Faturamento do dia", example=8750.40)
+
+
+class SectionSales(BaseModel):
+    section: str = Field(..., description="Seção", example="Roupas")
+    quantity: int = Field(..., description="Unidades vendidas", example=130)
+    revenue: float = Field(..., description="Faturamento da seção", example=11690.00)
+
+
+class ClientSales(BaseModel):
+    client_id: int = Field(..., description="ID do cliente", example=1)
+    orders: int = Field(..., description="Pedidos do cliente", example=5)
+    revenue: float = Field(..., description="Faturamento com o cliente", example=1299.50)
+
+
+class SalesReport(BaseModel):
+    start_date: Optional[date] = Field(None, description="Data inicial do período")
+    end_date: Optional[date] = Field(None, description="Data final do período")
+
+
+class DailySalesReport(SalesReport):
+    items: List[DailySales]
+    total_orders: int = Field(..., description="Pedidos no período")
+    total_revenue: float = Field(..., description="Faturamento no período")
+
+
+class SectionSalesReport(SalesReport):
+    items: List[SectionSales]
+
+
+class ClientSalesReport(SalesReport):
+    items: List[ClientSales]
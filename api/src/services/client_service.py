@@ -1,18 +1,20 @@
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from src.models.client import Client
 from src.schemas.client import ClientCreate, ClientUpdate
+from src.services import report_service
+from src.utils.cache import invalidate_on_commit, scope
+from src.utils.pagination import TotalMode, fetch_page
 
 
-def get_clients(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
-    name: Optional[str] = None,
-    email: Optional[str] = None
-) -> tuple[List[Client], int]:
+# Ordenação estável usada na paginação (offset ou cursor)
+CLIENT_CURSOR_KEYS = (Client.id,)
+
+
+def _clients_query(db: Session, name: Optional[str] = None, email: Optional[str] = None):
     query = db.query(Client)
 
     # Aplicar filtros se fornecidos
@@ -20,13 +22,83 @@ def get_clients(
         query = query.filter(Client.name.ilike(f"%{name}%"))
     if email:
         query = query.filter(Client.email.ilike(f"%{email}%"))
+    return query
 
-    total = query.count()
-    clients = query.offset(skip).limit(limit).all()
+
+def get_clients(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: Optional[TotalMode] = TotalMode.EXACT
+) -> tuple[List[Client], Optional[int]]:
+    query = _clients_query(db, name, email)
+
+    clients, total = fetch_page(
+        query, CLIENT_CURSOR_KEYS, skip, limit, cursor, total_mode,
+        filtered=bool(name or email)
+    )
 
     return clients, total
 
 
+CLIENT_EXPORT_COLUMNS = ("id", "name", "email", "cpf", "phone", "address", "created_at", "updated_at")
+
+
+def export_clients(
+    db: Session,
+    batch_size: int = 1000,
+    name: Optional[str] = None,
+    email: Optional[str] = None
+) -> Iterator[dict]:
+    """Percorre os clientes filtrados em lotes de `batch_size` (yield_per)."""
+    query = _clients_query(db, name, email).order_by(*CLIENT_CURSOR_KEYS).yield_per(batch_size)
+    for client in query:
+        yield {column: getattr(client, column) for column in CLIENT_EXPORT_COLUMNS}
+
+
+def _search_criteria(dialect_name: str, search: str):
+    """Filtro e ordenação por relevância da busca aproximada de clientes."""
+    pattern = f"%{search}%"
+    substring = or_(Client.name.ilike(pattern), Client.email.ilike(pattern))
+    if dialect_name == "postgresql":
+        # Operadores do pg_trgm, atendidos pelos índices GIN de nome e email
+        condition = or_(
+            Client.name.op("%")(search),
+            Client.email.op("%")(search),
+            substring,
+        )
+        rank = func.greatest(
+            func.similarity(Client.name, search),
+            func.similarity(Client.email, search),
+        )
+        return condition, (rank.desc(), Client.id)
+
+    # Fallback (SQLite): busca por substring, priorizando nomes que começam
+    # com o termo e nomes mais curtos
+    rank = case((Client.name.ilike(f"{search}%"), 0), else_=1)
+    return substring, (rank, func.length(Client.name), Client.id)
+
+
+def search_clients(
+    db: Session,
+    search: str,
+    skip: int = 0,
+    limit: int = 100,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    total_mode: Optional[TotalMode] = TotalMode.EXACT
+) -> tuple[List[Client], Optional[int]]:
+    condition, ranking = _search_criteria(db.get_bind().dialect.name, search)
+    # Os filtros por nome e email restringem os resultados da busca
+    query = _clients_query(db, name, email).filter(condition)
+
+    # Resultados ordenados por relevância: paginação apenas por offset
+    return fetch_page(query, ranking, skip, limit, None, total_mode)
+
+
 def get_client(db: Session, client_id: int) -> Client:
     client = db.query(Client).filter(Client.id == client_id).first()
     if not client:
@@ -81,6 +153,8 @@ def update_client(db: Session, client_id: int, client: ClientUpdate) -> Client:
     for key, value in update_data.items():
         setattr(db_client, key, value)
 
+    # "clients" invalida os pedidos em cache, que incluem os dados do cliente
+    invalidate_on_commit(db, [scope("client", client_id), scope("clients")])
     db.commit()
     db.refresh(db_client)
     return db_client
@@ -88,5 +162,7 @@ def update_client(db: Session, client_id: int, client: ClientUpdate) -> Client:
 
 def delete_client(db: Session, client_id: int) -> None:
     db_client = get_client(db, client_id)
+    invalidate_on_commit(db, [scope("client", client_id), scope("clients")])
+    report_service.forget_client(db, client_id)
     db.delete(db_client)
     db.commit()
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models.idempotency import IdempotencyKey
+
+
+def claim_key(
+    db: Session,
+    user_id: int,
+    key: str,
+    request_hash: str,
+    lease_seconds: int
+) -> Optional[tuple[Optional[int], Optional[str]]]:
+    """
+    Reserva a chave para a requisição atual.
+
+    Retorna None quando a chave foi reservada (a requisição deve ser
+    processada) ou `(status_code, response_body)` da chave já existente;
+    ambos são nulos enquanto a requisição original está em andamento.
+
+    A reserva vale por `lease_seconds`: se a requisição original não
+    registrar a resposta nesse prazo (processo encerrado no meio do
+    caminho), a chave expira e pode ser reservada de novo. Como a resposta
+    é gravada na mesma transação do efeito da requisição, uma reserva sem
+    resposta significa que nada foi confirmado.
+    """
+    now = datetime.utcnow()
+    existing = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    ).first()
+
+    if existing and existing.expires_at > now:
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key já utilizada com outro conteúdo de requisição"
+            )
+        return existing.status_code, existing.response_body
+
+    if existing:
+        db.delete(existing)
+        db.flush()
+    # Aproveita a reserva para remover as demais chaves expiradas
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.expires_at <= now
+    ).delete(synchronize_session=False)
+
+    db.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        expires_at=now + timedelta(seconds=lease_seconds)
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Outra requisição reservou a mesma chave ao mesmo tempo
+        db.rollback()
+        return None, None
+    return None
+
+
+def store_response(
+    db: Session,
+    user_id: int,
+    key: str,
+    status_code: int,
+    response_body: str,
+    ttl_seconds: int
+) -> None:
+    """
+    Grava a resposta da requisição que reservou a chave, sem commit.
+
+    Deve ser chamada dentro da transação que confirma o efeito da
+    requisição, para que ambos sejam gravados (ou descartados) juntos.
+    """
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    ).update(
+        {
+            "status_code": status_code,
+            "response_body": response_body,
+            "expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds),
+        },
+        synchronize_session=False
+    )
+
+
+def complete_key(
+    db: Session,
+    user_id: int,
+    key: str,
+    status_code: int,
+    response_body: str,
+    ttl_seconds: int
+) -> None:
+    """Registra a resposta da requisição que reservou a chave."""
+    store_response(db, user_id, key, status_code, response_body, ttl_seconds)
+    db.commit()
+
+
+def release_key(db: Session, user_id: int, key: str) -> None:
+    """Libera a chave quando a requisição falha, permitindo uma nova tentativa."""
+    db.rollback()
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.status_code.is_(None)
+    ).delete(synchronize_session=False)
+    db.commit()
@@ -1,25 +1,110 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from src.models.client import Client
-from src.models.order import Order, OrderItem, OrderStatus, order_products
+from src.models.order import Order, OrderItem, OrderStatus
 from src.models.product import Product
-from src.schemas.order import OrderCreate, OrderUpdate
+from src.schemas.order import BulkMode, OrderCreate, OrderUpdate
+from src.services import outbox_service, report_service
+from src.utils.cache import invalidate_on_commit, product_scopes, scope
+from src.utils.pagination import TotalMode, fetch_page
 
 
-def get_orders(
+# Ordenação estável usada na paginação (offset ou cursor)
+ORDER_CURSOR_KEYS = (Order.created_at, Order.id)
+
+# Estratégias de carregamento por endpoint. Nas listas, itens e clientes vêm
+# em uma consulta `IN` cada, de modo que o LIMIT se aplica a pedidos (e não a
+# linhas pedido x item) e o número de consultas não cresce com a página. No
+# detalhe, o cliente (um para um) vem no mesmo SELECT do pedido.
+ORDER_LIST_LOADERS = (selectinload(Order.client), selectinload(Order.items))
+ORDER_DETAIL_LOADERS = (joinedload(Order.client), selectinload(Order.items))
+
+
+def section_criterion(section: str):
+    """
+    Pedidos com algum item da seção, como semi-join (EXISTS).
+
+    Cada pedido aparece uma única vez, mesmo com vários itens da seção, de
+    modo que COUNT(*) e LIMIT contam pedidos; a subconsulta usa os índices
+    `ix_product_section` e `ix_order_item_product_id_order_id`.
+    """
+    return (
+        select(OrderItem.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(OrderItem.order_id == Order.id, Product.section == section)
+        .exists()
+    )
+
+
+def sections_contain(dialect_name: str, section: str):
+    """
+    Pedidos com a seção em `Order.sections`.
+
+    No PostgreSQL é `sections @> ARRAY[seção]`, atendido pelo índice GIN
+    `ix_order_sections`; nos demais bancos percorre a lista JSON.
+    """
+    if dialect_name == "postgresql":
+        return Order.sections.contains([section])
+    values = func.json_each(Order.sections).table_valued("value")
+    return select(values.c.value).where(values.c.value == section).exists()
+
+
+def order_sections(db: Session, order_ids: List[int]) -> dict[int, List[str]]:
+    """Seções distintas (ordenadas) dos produtos de cada pedido."""
+    sections = {order_id: set() for order_id in order_ids}
+    rows = (
+        db.query(OrderItem.order_id, Product.section)
+        .join(Product, Product.id == OrderItem.product_id)
+        .filter(OrderItem.order_id.in_(order_ids))
+        .distinct()
+        .all()
+    )
+    for order_id, section in rows:
+        sections[order_id].add(section)
+    return {order_id: sorted(values) for order_id, values in sections.items()}
+
+
+def refresh_sections(db: Session, order_ids: List[int]) -> int:
+    """
+    Recalcula `Order.sections` dos pedidos informados, sem commit.
+
+    Grava (com executemany) apenas os pedidos divergentes e retorna quantos
+    foram corrigidos.
+    """
+    if not order_ids:
+        return 0
+    expected = order_sections(db, order_ids)
+    current = dict(db.query(Order.id, Order.sections).filter(Order.id.in_(order_ids)).all())
+    changed = [
+        {"order_id": order_id, "new_sections": sections}
+        for order_id, sections in expected.items()
+        if order_id in current and list(current[order_id] or []) != sections
+    ]
+    if changed:
+        order_table = Order.__table__
+        db.execute(
+            update(order_table)
+            .where(order_table.c.id == bindparam("order_id"))
+            .values(sections=bindparam("new_sections")),
+            changed
+        )
+        invalidate_on_commit(db, (scope("order", row["order_id"]) for row in changed))
+    return len(changed)
+
+
+def _orders_query(
     db: Session,
-    skip: int = 0,
-    limit: int = 100,
     client_id: Optional[int] = None,
     status: Optional[OrderStatus] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     section: Optional[str] = None
-) -> tuple[List[Order], int]:
+):
     query = db.query(Order)
 
     # Aplicar filtros se fornecidos
@@ -33,17 +118,80 @@ def get_orders(
         query = query.filter(Order.created_at <= end_date)
     if section:
         # Filtrar pedidos que contêm produtos da seção especificada
-        query = query.join(order_products).join(
-            Product).filter(Product.section == section)
+        query = query.filter(sections_contain(db.get_bind().dialect.name, section))
+    return query
+
+
+def get_orders(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    client_id: Optional[int] = None,
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    section: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: Optional[TotalMode] = TotalMode.EXACT
+) -> tuple[List[Order], Optional[int]]:
+    # Tudo o que a resposta usa é carregado aqui: sessões assíncronas não
+    # permitem lazy loading durante a serialização
+    query = _orders_query(
+        db, client_id, status, start_date, end_date, section
+    ).options(*ORDER_LIST_LOADERS)
 
-    total = query.count()
-    orders = query.offset(skip).limit(limit).all()
+    orders, total = fetch_page(
+        query, ORDER_CURSOR_KEYS, skip, limit, cursor, total_mode,
+        filtered=bool(client_id or status or start_date or end_date or section)
+    )
 
     return orders, total
 
 
+ORDER_EXPORT_COLUMNS = (
+    "id", "client_id", "status", "total_amount", "sections", "items",
+    "created_at", "updated_at",
+)
+
+
+def export_orders(
+    db: Session,
+    batch_size: int = 1000,
+    client_id: Optional[int] = None,
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    section: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Percorre os pedidos filtrados em lotes de `batch_size`.
+
+    Usa `yield_per` (cursor no servidor): apenas um lote de pedidos, com
+    seus itens carregados por selectinload, fica em memória por vez.
+    """
+    query = _orders_query(
+        db, client_id, status, start_date, end_date, section
+    ).options(selectinload(Order.items)).order_by(*ORDER_CURSOR_KEYS).yield_per(batch_size)
+
+    for order in query:
+        yield {
+            "id": order.id,
+            "client_id": order.client_id,
+            "status": order.status.value,
+            "total_amount": order.total_amount,
+            "sections": list(order.sections or []),
+            "items": [
+                {"product_id": item.product_id, "quantity": item.quantity, "unit_price": item.unit_price}
+                for item in order.items
+            ],
+            "created_at": order.created_at,
+            "updated_at": order.updated_at,
+        }
+
+
 def get_order(db: Session, order_id: int) -> Order:
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).options(*ORDER_DETAIL_LOADERS).filter(
+        Order.id == order_id).first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,7 +200,87 @@ def get_order(db: Session, order_id: int) -> Order:
     return order
 
 
-def create_order(db: Session, order: OrderCreate) -> Order:
+def _order_products(db: Session, product_ids, for_update: bool = False) -> dict[int, Product]:
+    """Produtos do pedido por ID; 404 (com rollback) se algum não existir."""
+    query = db.query(Product).filter(Product.id.in_(product_ids)).order_by(Product.id)
+    if for_update:
+        query = query.with_for_update()
+    products = {product.id: product for product in query.all()}
+
+    for product_id in product_ids:
+        if product_id not in products:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Produto com ID {product_id} não encontrado"
+            )
+    return products
+
+
+def reserve_stock(db: Session, quantities: dict[int, int]) -> dict[int, Product]:
+    """
+    Baixa o estoque de vários produtos na transação corrente.
+
+    Os produtos são lidos em uma única consulta `IN`, bloqueados (FOR UPDATE)
+    em ordem de ID para evitar deadlocks entre pedidos simultâneos, e cada
+    baixa é um UPDATE condicional (`stock >= quantidade`), de modo que o
+    estoque nunca fica negativo. Em caso de erro a transação é desfeita.
+    As respostas em cache dos produtos são invalidadas no commit.
+    """
+    products = _order_products(db, quantities, for_update=True)
+
+    for product_id, quantity in quantities.items():
+        product = products[product_id]
+        if product.stock < quantity:
+            detail = f"Estoque insuficiente para o produto {product.description}"
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
+
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        result = db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+        )
+        if result.rowcount != 1:
+            detail = f"Estoque insuficiente para o produto {products[product_id].description}"
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
+        invalidate_on_commit(db, product_scopes(product_id, products[product_id].section))
+
+    return products
+
+
+def _created_payload(order_id: int, client_id: int, order_status: OrderStatus,
+                     total_amount: float, sections: List[str]) -> dict:
+    return {
+        "order_id": order_id,
+        "client_id": client_id,
+        "status": OrderStatus(order_status).value,
+        "total_amount": total_amount,
+        "sections": list(sections),
+    }
+
+
+def create_order(
+    db: Session,
+    order: OrderCreate,
+    before_commit: Optional[Callable[[Session, Order], None]] = None
+) -> Order:
+    """
+    Cria o pedido reservando o estoque dos itens.
+
+    `before_commit` recebe o pedido completo antes do commit, para gravar
+    dados que devem ser confirmados na mesma transação (como a resposta de
+    uma requisição idempotente).
+    """
     # Verificar se o cliente existe
     client = db.query(Client).filter(Client.id == order.client_id).first()
     if not client:
@@ -68,27 +296,24 @@ def create_order(db: Session, order: OrderCreate) -> Order:
             detail="O pedido deve conter pelo menos um item"
         )
 
-    # Calcular o valor total e verificar estoque
+    # Reservar o estoque de todos os itens de uma vez. Pedidos cancelados
+    # nunca têm estoque reservado: um pedido criado já cancelado não baixa o
+    # estoque (e, ao ser reaberto, reserva como qualquer outro)
+    quantities = {}
+    for item in order.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    order_status = order.status or OrderStatus.PENDING
+    if order_status == OrderStatus.CANCELLED:
+        products = _order_products(db, quantities)
+    else:
+        products = reserve_stock(db, quantities)
+
+    # Calcular o valor total
     total_amount = 0
     order_items = []
 
     for item in order.items:
-        product = db.query(Product).filter(
-            Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Produto com ID {item.product_id} não encontrado"
-            )
-
-        if product.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Estoque insuficiente para o produto {product.description}"
-            )
-
-        # Atualizar estoque
-        product.stock -= item.quantity
+        product = products[item.product_id]
 
         # Adicionar ao valor total
         item_total = product.price * item.quantity
@@ -104,8 +329,9 @@ def create_order(db: Session, order: OrderCreate) -> Order:
     # Criar o pedido
     db_order = Order(
         client_id=order.client_id,
-        status=order.status,
-        total_amount=total_amount
+        status=order_status,
+        total_amount=total_amount,
+        sections=sorted({product.section for product in products.values()})
     )
     db.add(db_order)
     db.flush()  # Para obter o ID do pedido antes de commit
@@ -119,37 +345,279 @@ def create_order(db: Session, order: OrderCreate) -> Order:
         )
         db.add(order_item)
 
+    # Agregados de vendas na mesma transação
+    if db_order.status != OrderStatus.CANCELLED:
+        report_service.record_sales(db, [db_order.id])
+    # Demais efeitos colaterais ficam para o worker do outbox
+    outbox_service.add_event(db, outbox_service.ORDER_CREATED, db_order.id, _created_payload(
+        db_order.id, db_order.client_id, db_order.status, total_amount, db_order.sections))
+
+    if before_commit:
+        db.flush()
+        before_commit(db, get_order(db, db_order.id))
     db.commit()
-    db.refresh(db_order)  # Refresh para atualizar o objeto com os dados atuais
 
-    return db_order
+    # Recarrega o pedido com itens e cliente para a resposta
+    return get_order(db, db_order.id)
+
+
+def create_orders_bulk(db: Session, orders: List[OrderCreate], mode: BulkMode) -> List[dict]:
+    """
+    Cria vários pedidos com um número fixo de consultas.
+
+    Clientes e produtos referenciados são validados em duas consultas `IN`
+    (produtos bloqueados com FOR UPDATE); pedidos, itens e baixas de estoque
+    são gravados com executemany. Em `ALL_OR_NOTHING` qualquer pedido
+    inválido cancela o lote; em `BEST_EFFORT` apenas os válidos são gravados.
+    Retorna um resultado por pedido, na ordem recebida.
+    """
+    client_ids = {order.client_id for order in orders}
+    product_ids = {item.product_id for order in orders for item in order.items}
+
+    existing_clients = {
+        client_id for (client_id,) in
+        db.query(Client.id).filter(Client.id.in_(client_ids)).all()
+    }
+    products = {
+        product.id: product
+        for product in db.query(Product)
+        .filter(Product.id.in_(product_ids))
+        .order_by(Product.id)
+        .with_for_update()
+        .all()
+    } if product_ids else {}
+
+    # Valida os pedidos em sequência, descontando o estoque já reservado
+    # pelos pedidos anteriores do mesmo lote
+    remaining = {product_id: product.stock for product_id, product in products.items()}
+    results = []
+    accepted = []
+    for index, order in enumerate(orders):
+        # "status": null é aceito pelo schema e equivale ao padrão
+        order_status = order.status or OrderStatus.PENDING
+        quantities = {}
+        for item in order.items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+        error = None
+        if order.client_id not in existing_clients:
+            error = f"Cliente com ID {order.client_id} não encontrado"
+        elif not order.items:
+            error = "O pedido deve conter pelo menos um item"
+        else:
+            for product_id, quantity in quantities.items():
+                if product_id not in products:
+                    error = f"Produto com ID {product_id} não encontrado"
+                    break
+                # Pedidos criados já cancelados não reservam estoque
+                if order_status != OrderStatus.CANCELLED and remaining[product_id] < quantity:
+                    error = f"Estoque insuficiente para o produto {products[product_id].description}"
+                    break
+
+        if error:
+            results.append({"index": index, "success": False, "error": error})
+            continue
+
+        if order_status != OrderStatus.CANCELLED:
+            for product_id, quantity in quantities.items():
+                remaining[product_id] -= quantity
+        total_amount = sum(products[item.product_id].price * item.quantity for item in order.items)
+        result = {"index": index, "success": True, "total_amount": total_amount}
+        results.append(result)
+        accepted.append((order, order_status, result))
+
+    if mode == BulkMode.ALL_OR_NOTHING and len(accepted) < len(orders):
+        db.rollback()
+        for result in results:
+            if result["success"]:
+                result.update(success=False, total_amount=None,
+                              error="Lote não processado: há pedidos inválidos")
+        return results
+
+    if not accepted:
+        db.rollback()
+        return results
+
+    # Baixa de estoque condicional (nunca negativa), em ordem de ID
+    reserved = {
+        product_id: products[product_id].stock - stock
+        for product_id, stock in remaining.items()
+        if stock != products[product_id].stock
+    }
+    product_table = Product.__table__
+    if reserved:
+        update_result = db.execute(
+            update(product_table)
+            .where(product_table.c.id == bindparam("pid"),
+                   product_table.c.stock >= bindparam("qty"))
+            .values(stock=product_table.c.stock - bindparam("qty")),
+            [{"pid": product_id, "qty": qty} for product_id, qty in sorted(reserved.items())]
+        )
+        if (db.get_bind().dialect.supports_sane_multi_rowcount
+                and update_result.rowcount != len(reserved)):
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="O estoque foi alterado durante o processamento do lote; tente novamente"
+            )
+    for product_id in reserved:
+        invalidate_on_commit(db, product_scopes(product_id, products[product_id].section))
+
+    order_ids = db.scalars(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "client_id": order.client_id,
+                "status": order_status,
+                "total_amount": result["total_amount"],
+                "sections": sorted({products[item.product_id].section for item in order.items}),
+            }
+            for order, order_status, result in accepted
+        ]
+    ).all()
+
+    item_rows = []
+    for (order, _, result), order_id in zip(accepted, order_ids):
+        result["order_id"] = order_id
+        for item in order.items:
+            item_rows.append({
+                "order_id": order_id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price": products[item.product_id].price,
+            })
+    db.execute(insert(OrderItem), item_rows)
+
+    report_service.record_sales(db, [
+        result["order_id"] for _, order_status, result in accepted
+        if order_status != OrderStatus.CANCELLED
+    ])
+    outbox_service.add_events(db, outbox_service.ORDER_CREATED, [
+        (result["order_id"], _created_payload(
+            result["order_id"], order.client_id, order_status, result["total_amount"],
+            sorted({products[item.product_id].section for item in order.items})))
+        for order, order_status, result in accepted
+    ])
+
+    db.commit()
+    return results
+
+
+def restore_stock(db: Session, order_ids: List[int]) -> List[dict]:
+    """
+    Devolve ao estoque os itens dos pedidos informados, sem commit.
+
+    Um único `UPDATE product ... FROM (itens agrupados por produto)`,
+    qualquer que seja o número de pedidos e itens. Retorna os produtos
+    afetados com o estoque resultante.
+    """
+    if not order_ids:
+        return []
+    restored = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity).label("quantity"))
+        .where(OrderItem.order_id.in_(order_ids))
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    rows = db.execute(
+        update(Product)
+        .where(Product.id == restored.c.product_id)
+        .values(stock=Product.stock + restored.c.quantity)
+        .returning(Product.id, Product.stock, Product.section)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for product_id, _, section in rows:
+        invalidate_on_commit(db, product_scopes(product_id, section))
+    return sorted(({"product_id": row[0], "stock": row[1]} for row in rows),
+                  key=lambda product: product["product_id"])
+
+
+def _order_quantities(db: Session, order_id: int) -> dict[int, int]:
+    return dict(
+        db.query(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .filter(OrderItem.order_id == order_id)
+        .group_by(OrderItem.product_id)
+        .all()
+    )
 
 
 def update_order(db: Session, order_id: int, order: OrderUpdate) -> Order:
     db_order = get_order(db, order_id)
 
+    # Cancelar devolve o estoque; reabrir um pedido cancelado o reserva de novo
+    new_status = order.status
+    if new_status and new_status != db_order.status:
+        if new_status == OrderStatus.CANCELLED:
+            restore_stock(db, [order_id])
+            report_service.record_sales(db, [order_id], sign=-1)
+        elif db_order.status == OrderStatus.CANCELLED:
+            reserve_stock(db, _order_quantities(db, order_id))
+            report_service.record_sales(db, [order_id])
+        outbox_service.add_event(db, outbox_service.ORDER_STATUS_CHANGED, order_id, {
+            "order_id": order_id,
+            "client_id": db_order.client_id,
+            "status": OrderStatus(new_status).value,
+        })
+
     # Atualizar apenas os campos fornecidos
     update_data = order.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_order, key, value)
 
+    invalidate_on_commit(db, [scope("order", order_id)])
     db.commit()
-    db.refresh(db_order)
-    return db_order
+    return get_order(db, order_id)
 
 
-def delete_order(db: Session, order_id: int) -> None:
+def cancel_orders(db: Session, order_ids: List[int]) -> dict:
+    """
+    Cancela vários pedidos de uma vez, devolvendo o estoque.
+
+    O status é alterado em um único UPDATE (pedidos já cancelados são
+    ignorados) e o estoque de todos os pedidos cancelados é devolvido em
+    outro, independentemente do tamanho do lote.
+    """
+    rows = db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status != OrderStatus.CANCELLED)
+        .values(status=OrderStatus.CANCELLED)
+        .returning(Order.id, Order.client_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    cancelled = [order_id for order_id, _ in rows]
+    products = restore_stock(db, cancelled)
+    report_service.record_sales(db, cancelled, sign=-1)
+    outbox_service.add_events(db, outbox_service.ORDER_STATUS_CHANGED, [
+        (order_id, {"order_id": order_id, "client_id": client_id,
+                    "status": OrderStatus.CANCELLED.value})
+        for order_id, client_id in rows
+    ])
+    invalidate_on_commit(db, (scope("order", order_id) for order_id in cancelled))
+    db.commit()
+    return {"cancelled": sorted(cancelled), "products": products}
+
+
+def delete_order(db: Session, order_id: int) -> dict:
+    """
+    Exclui o pedido e devolve ao estoque os itens de pedidos não cancelados.
+
+    Retorna o mesmo resultado de `cancel_orders`: o pedido em `cancelled`
+    (vazio se já estava cancelado) e o estoque dos produtos devolvidos.
+    """
     db_order = get_order(db, order_id)
 
-    # Restaurar o estoque dos produtos
-    order_items = db.query(order_products).filter(
-        order_products.c.order_id == order_id).all()
-    for item in order_items:
-        product = db.query(Product).filter(
-            Product.id == item.product_id).first()
-        if product:
-            product.stock += item.quantity
+    # Pedidos cancelados já tiveram o estoque devolvido e saíram dos agregados
+    cancelled, products = [], []
+    if db_order.status != OrderStatus.CANCELLED:
+        cancelled = [order_id]
+        products = restore_stock(db, [order_id])
+        report_service.record_sales(db, [order_id], sign=-1)
 
-    # Excluir o pedido
-    db.delete(db_order)
+    outbox_service.add_event(db, outbox_service.ORDER_DELETED, order_id, {
+        "order_id": order_id, "client_id": db_order.client_id,
+    })
+    db.execute(delete(OrderItem).where(OrderItem.order_id == order_id))
+    db.execute(delete(Order).where(Order.id == order_id))
+    invalidate_on_commit(db, [scope("order", order_id)])
     db.commit()
+    return {"cancelled": cancelled, "products": products}
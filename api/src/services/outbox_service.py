@@ -0,0 +1,111 @@
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from src.models.outbox import OutboxEvent
+
+# Tipos de evento gravados pelo order_service
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+ORDER_DELETED = "order.deleted"
+
+
+def add_event(db: Session, event_type: str, aggregate_id: int, payload: dict) -> None:
+    """Grava um evento na transação corrente, sem commit."""
+    add_events(db, event_type, [(aggregate_id, payload)])
+
+
+def add_events(db: Session, event_type: str, events: Iterable[tuple[int, dict]]) -> None:
+    """Grava vários eventos do mesmo tipo com um único executemany, sem commit."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "event_type": event_type,
+            "aggregate_id": aggregate_id,
+            "payload": json.dumps(payload),
+            "attempts": 0,
+            "available_at": now,
+        }
+        for aggregate_id, payload in events
+    ]
+    if rows:
+        db.execute(insert(OutboxEvent), rows)
+
+
+def claim_events(db: Session, limit: int, max_attempts: int, lease_seconds: float) -> List:
+    """
+    Reserva até `limit` eventos pendentes, mais antigos primeiro.
+
+    Um único UPDATE ... RETURNING incrementa as tentativas e adia
+    `available_at` pelo prazo da reserva: se o worker parar antes de
+    concluir, o evento volta a ser entregue depois desse prazo. No
+    PostgreSQL, FOR UPDATE SKIP LOCKED permite vários workers em paralelo
+    sem que disputem os mesmos eventos.
+    """
+    now = datetime.utcnow()
+    pending = (
+        select(OutboxEvent.id)
+        .where(
+            OutboxEvent.processed_at.is_(None),
+            OutboxEvent.available_at <= now,
+            OutboxEvent.attempts < max_attempts,
+        )
+        .order_by(OutboxEvent.available_at, OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(pending))
+        .values(
+            attempts=OutboxEvent.attempts + 1,
+            available_at=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(
+            OutboxEvent.id,
+            OutboxEvent.event_type,
+            OutboxEvent.aggregate_id,
+            OutboxEvent.payload,
+            OutboxEvent.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+
+def mark_processed(db: Session, event_id: int) -> None:
+    """Conclui o evento, junto com o que os handlers gravaram na sessão."""
+    db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id == event_id)
+        .values(processed_at=datetime.utcnow(), last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def mark_failed(db: Session, event_id: int, error: str, retry_at: datetime) -> None:
+    """Registra a falha e agenda a próxima tentativa."""
+    db.rollback()
+    db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id == event_id)
+        .values(available_at=retry_at, last_error=error)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def purge_processed(db: Session, older_than: datetime) -> int:
+    """Remove os eventos concluídos antes de `older_than`."""
+    result = db.execute(
+        delete(OutboxEvent)
+        .where(OutboxEvent.processed_at < older_than)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,340 @@
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, selectinload
+
+from src.models.order import Order, OrderItem, OrderStatus
+
+# Particionamento mensal de `order` (PostgreSQL): cada partição
+# `order_yAAAAmMM` guarda os pedidos com `created_at` no mês e
+# `order_default` o que estiver fora das partições existentes. Os itens
+# continuam em `order_item`, sem chave estrangeira para `order` (que,
+# particionada, não pode ter unicidade só em `id`), e são arquivados e
+# restaurados junto com os pedidos.
+
+# Meses futuros com partição já criada (além do atual)
+ORDER_PARTITION_MONTHS_AHEAD = int(os.environ.get("ORDER_PARTITION_MONTHS_AHEAD", 3))
+# Diretório local dos arquivos das partições arquivadas
+ORDER_ARCHIVE_DIR = os.environ.get("ORDER_ARCHIVE_DIR", "archive/orders")
+
+DEFAULT_PARTITION = "order_default"
+ARCHIVE_SUFFIX = ".ndjson.gz"
+_PARTITION_NAME = re.compile(r"^order_y(\d{4})m(\d{2})$")
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"order_y{month.year}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Mês de uma partição mensal pelo nome (None para as demais)."""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def archive_path(directory, month: date) -> Path:
+    return Path(directory) / f"{partition_name(month)}{ARCHIVE_SUFFIX}"
+
+
+def _bounds(month: date) -> str:
+    # Literais gerados a partir de datas: DDL não aceita parâmetros
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+def is_partitioned(db) -> bool:
+    """Indica se `order` já é uma tabela particionada."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('\"order\"'))"
+    )).scalar()
+
+
+def list_partitions(db) -> List[dict]:
+    """Partições de `order` com o mês e o número estimado de linhas."""
+    rows = db.execute(text(
+        "SELECT c.relname, greatest(c.reltuples, 0)::bigint "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('\"order\"') ORDER BY c.relname"
+    )).all()
+    return [{"name": name, "month": partition_month(name), "rows": estimate}
+            for name, estimate in rows]
+
+
+def create_partition(db, month: date) -> int:
+    """
+    Cria a partição do mês, sem commit.
+
+    Pedidos do mês que tenham caído em `order_default` são movidos para
+    ela antes de anexá-la. Retorna quantos foram movidos.
+    """
+    name = partition_name(month)
+    db.execute(text(f'CREATE TABLE "{name}" (LIKE "order" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    moved = db.execute(text(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+        f"WHERE created_at >= :lower AND created_at < :upper RETURNING *) "
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ), {"lower": month, "upper": add_months(month, 1)}).rowcount
+    db.execute(text(f'ALTER TABLE "order" ATTACH PARTITION "{name}" {_bounds(month)}'))
+    return moved
+
+
+def ensure_partitions(db, months_ahead: int = ORDER_PARTITION_MONTHS_AHEAD,
+                      today: Optional[date] = None) -> List[str]:
+    """Cria as partições do mês atual e dos próximos `months_ahead` meses."""
+    existing = {partition["month"] for partition in list_partitions(db)}
+    current = month_start(today or datetime.utcnow())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_partition(db, month)
+            created.append(partition_name(month))
+    db.commit()
+    return created
+
+
+def _index_definitions(conn: Connection, table: str) -> List[str]:
+    """CREATE INDEX dos índices da tabela, exceto os de constraints (PK)."""
+    return list(conn.execute(text(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = :table "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:quoted))"
+    ), {"table": table, "quoted": f'"{table}"'}).scalars())
+
+
+def _recreate_indexes(conn: Connection, definitions: List[str]) -> None:
+    for definition in definitions:
+        conn.execute(text(re.sub(r" ON \S+ ", ' ON "order" ', definition, count=1)))
+
+
+def partition_order_table(conn: Connection, months_ahead: int = ORDER_PARTITION_MONTHS_AHEAD) -> None:
+    """
+    Converte `order` em tabela particionada por mês de `created_at`.
+
+    Copia os pedidos para a nova tabela (com uma partição por mês desde o
+    pedido mais antigo até `months_ahead` meses à frente, além da
+    `order_default`) e recria os índices existentes na tabela pai, de onde
+    são propagados às partições. A chave primária passa a ser
+    (id, created_at) e a chave estrangeira de `order_item` é removida.
+    """
+    index_definitions = _index_definitions(conn, "order")
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('\"order\"', 'id')")).scalar()
+    first = conn.execute(text('SELECT min(created_at) FROM "order"')).scalar()
+
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    conn.execute(text('ALTER TABLE "order" RENAME TO order_unpartitioned'))
+    conn.execute(text(
+        'CREATE TABLE "order" (LIKE order_unpartitioned INCLUDING DEFAULTS) '
+        "PARTITION BY RANGE (created_at)"
+    ))
+    conn.execute(text(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "order" DEFAULT'))
+    month = month_start(first or datetime.utcnow())
+    last = add_months(month_start(datetime.utcnow()), months_ahead)
+    while month <= last:
+        conn.execute(text(f'CREATE TABLE "{partition_name(month)}" PARTITION OF "order" FOR VALUES {_bounds(month)}'))
+        month = add_months(month, 1)
+
+    conn.execute(text('INSERT INTO "order" SELECT * FROM order_unpartitioned'))
+    # Remove também a chave estrangeira order_item.order_id
+    conn.execute(text("DROP TABLE order_unpartitioned CASCADE"))
+
+    conn.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY "order".id'))
+    conn.execute(text('ALTER TABLE "order" ADD CONSTRAINT order_pkey PRIMARY KEY (id, created_at)'))
+    conn.execute(text(
+        'ALTER TABLE "order" ADD CONSTRAINT order_client_id_fkey '
+        "FOREIGN KEY (client_id) REFERENCES client (id)"
+    ))
+    _recreate_indexes(conn, index_definitions)
+
+
+def unpartition_order_table(conn: Connection) -> None:
+    """Volta `order` a uma tabela comum com os pedidos de todas as partições anexadas."""
+    index_definitions = _index_definitions(conn, "order")
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('\"order\"', 'id')")).scalar()
+
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    conn.execute(text('ALTER TABLE "order" RENAME TO order_partitioned'))
+    conn.execute(text('CREATE TABLE "order" (LIKE order_partitioned INCLUDING DEFAULTS)'))
+    conn.execute(text('INSERT INTO "order" SELECT * FROM order_partitioned'))
+    conn.execute(text("DROP TABLE order_partitioned CASCADE"))
+
+    conn.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY "order".id'))
+    conn.execute(text('ALTER TABLE "order" ADD CONSTRAINT order_pkey PRIMARY KEY (id)'))
+    conn.execute(text(
+        'ALTER TABLE "order" ADD CONSTRAINT order_client_id_fkey '
+        "FOREIGN KEY (client_id) REFERENCES client (id)"
+    ))
+    conn.execute(text(
+        "ALTER TABLE order_item ADD CONSTRAINT order_item_order_id_fkey "
+        'FOREIGN KEY (order_id) REFERENCES "order" (id)'
+    ))
+    _recreate_indexes(conn, index_definitions)
+
+
+def _archive_row(order: Order) -> dict:
+    return {
+        "id": order.id,
+        "client_id": order.client_id,
+        "status": order.status.value,
+        "total_amount": order.total_amount,
+        "sections": list(order.sections or []),
+        "created_at": order.created_at.isoformat(),
+        "updated_at": order.updated_at.isoformat(),
+        "items": [
+            {"id": item.id, "product_id": item.product_id,
+             "quantity": item.quantity, "unit_price": item.unit_price}
+            for item in order.items
+        ],
+    }
+
+
+def write_archive(db: Session, month: date, directory, batch_size: int = 1000) -> tuple[Path, int]:
+    """
+    Grava os pedidos do mês, com seus itens, em `order_yAAAAmMM.ndjson.gz`.
+
+    Apenas leitura: o arquivo é escrito em um temporário, sincronizado com
+    o disco e renomeado, antes de qualquer alteração no banco. Retorna o
+    caminho e quantos pedidos foram gravados.
+    """
+    path = archive_path(directory, month)
+    if path.exists():
+        raise FileExistsError(f"Arquivo já existe: {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+
+    orders = (
+        db.query(Order)
+        .filter(Order.created_at >= month, Order.created_at < add_months(month, 1))
+        .options(selectinload(Order.items))
+        .order_by(Order.id)
+        .yield_per(batch_size)
+    )
+    count = 0
+    with open(temporary, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            for order in orders:
+                archive.write((json.dumps(_archive_row(order), ensure_ascii=False) + "\n").encode())
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(temporary, path)
+    return path, count
+
+
+def drop_partition(db: Session, month: date, expected_orders: int) -> int:
+    """
+    Desanexa e remove a partição do mês e os itens dos seus pedidos.
+
+    Em uma única transação curta; se a partição não tiver exatamente os
+    `expected_orders` pedidos arquivados, nada é removido. Retorna quantos
+    itens foram removidos.
+    """
+    name = partition_name(month)
+    db.execute(text(f'ALTER TABLE "order" DETACH PARTITION "{name}"'))
+    count = db.execute(text(f'SELECT count(*) FROM "{name}"')).scalar()
+    if count != expected_orders:
+        db.rollback()
+        raise RuntimeError(
+            f"A partição {name} tem {count} pedidos, mas {expected_orders} foram arquivados"
+        )
+    items = db.execute(text(
+        f'DELETE FROM order_item WHERE order_id IN (SELECT id FROM "{name}")'
+    )).rowcount
+    db.execute(text(f'DROP TABLE "{name}"'))
+    db.commit()
+    return items
+
+
+def archive_partitions(db: Session, before: date, directory=ORDER_ARCHIVE_DIR,
+                       today: Optional[date] = None) -> List[dict]:
+    """Arquiva e remove as partições mensais anteriores ao mês `before`."""
+    if not is_partitioned(db):
+        raise ValueError("A tabela order não está particionada")
+    before = month_start(before)
+    if before > month_start(today or datetime.utcnow()):
+        raise ValueError("Apenas meses já encerrados podem ser arquivados")
+
+    archived = []
+    for partition in list_partitions(db):
+        month = partition["month"]
+        if month is None or month >= before:
+            continue
+        path, orders = write_archive(db, month, directory)
+        db.commit()
+        items = drop_partition(db, month, orders)
+        archived.append({"partition": partition["name"], "path": str(path),
+                         "orders": orders, "items": items})
+    return archived
+
+
+def read_archive(path) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            yield json.loads(line)
+
+
+def load_archive(db: Session, path, batch_size: int = 1000) -> tuple[int, int]:
+    """Insere os pedidos e itens de um arquivo, sem commit."""
+    orders = items = 0
+    order_rows, item_rows = [], []
+
+    def flush():
+        if order_rows:
+            db.execute(insert(Order), order_rows)
+        if item_rows:
+            db.execute(insert(OrderItem), item_rows)
+        order_rows.clear()
+        item_rows.clear()
+
+    for row in read_archive(path):
+        order_rows.append({
+            "id": row["id"],
+            "client_id": row["client_id"],
+            "status": OrderStatus(row["status"]),
+            "total_amount": row["total_amount"],
+            "sections": row["sections"],
+            "created_at": datetime.fromisoformat(row["created_at"]),
+            "updated_at": datetime.fromisoformat(row["updated_at"]),
+        })
+        item_rows.extend({**item, "order_id": row["id"]} for item in row["items"])
+        orders += 1
+        items += len(row["items"])
+        if len(order_rows) >= batch_size:
+            flush()
+    flush()
+    return orders, items
+
+
+def restore_partition(db: Session, path) -> dict:
+    """Recria a partição de um arquivo gerado por `archive_partitions` e recarrega os pedidos."""
+    path = Path(path)
+    month = partition_month(path.name[:-len(ARCHIVE_SUFFIX)]) if path.name.endswith(ARCHIVE_SUFFIX) else None
+    if month is None:
+        raise ValueError(f"Nome de arquivo inesperado: {path.name}")
+    if not is_partitioned(db):
+        raise ValueError("A tabela order não está particionada")
+    if any(partition["month"] == month for partition in list_partitions(db)):
+        raise ValueError(f"A partição {partition_name(month)} já existe")
+
+    create_partition(db, month)
+    orders, items = load_archive(db, path)
+    db.commit()
+    return {"partition": partition_name(month), "orders": orders, "items": items}
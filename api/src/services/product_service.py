@@ -1,21 +1,29 @@
-import json
+from sqlalchemy import Float, and_, cast, func, literal, literal_column, or_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 
+from src.models.order import OrderItem
 from src.models.product import Product
 from src.schemas.product import ProductCreate, ProductUpdate
+from src.services import order_service, report_service
+from src.utils.cache import invalidate_on_commit, product_scopes
+from src.utils.pagination import (TotalMode, decode_cursor, encode_cursor,
+                                  fetch_page)
 
 
-def get_products(
+# Ordenação estável usada na paginação (offset ou cursor)
+PRODUCT_CURSOR_KEYS = (Product.id,)
+
+
+def _products_query(
     db: Session,
-    skip: int = 0,
-    limit: int = 100,
     category: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     in_stock: Optional[bool] = None
-) -> tuple[List[Product], int]:
+):
     query = db.query(Product)
 
     # Aplicar filtros se fornecidos
@@ -27,20 +35,132 @@ def get_products(
         query = query.filter(Product.price <= max_price)
     if in_stock is not None and in_stock:
         query = query.filter(Product.stock > 0)
+    return query
 
-    total = query.count()
-    products = query.offset(skip).limit(limit).all()
 
-    # Converter image_urls de JSON string para lista
-    for product in products:
-        if product.image_urls:
-            product.image_urls = json.loads(product.image_urls)
-        else:
-            product.image_urls = []
+def get_products(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    total_mode: Optional[TotalMode] = TotalMode.EXACT
+) -> tuple[List[Product], Optional[int]]:
+    query = _products_query(db, category, min_price, max_price, in_stock)
+
+    products, total = fetch_page(
+        query, PRODUCT_CURSOR_KEYS, skip, limit, cursor, total_mode,
+        filtered=bool(category or min_price is not None or max_price is not None or in_stock)
+    )
 
     return products, total
 
 
+PRODUCT_EXPORT_COLUMNS = (
+    "id", "description", "price", "barcode", "section", "stock", "expiry_date",
+    "image_urls", "created_at", "updated_at",
+)
+
+
+def export_products(
+    db: Session,
+    batch_size: int = 1000,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None
+) -> Iterator[dict]:
+    """Percorre os produtos filtrados em lotes de `batch_size` (yield_per)."""
+    query = _products_query(
+        db, category, min_price, max_price, in_stock
+    ).order_by(*PRODUCT_CURSOR_KEYS).yield_per(batch_size)
+    for product in query:
+        yield {column: getattr(product, column) for column in PRODUCT_EXPORT_COLUMNS}
+
+
+# Colunas do snapshot do catálogo (src/utils/catalog_snapshot.py)
+CATALOG_COLUMNS = (
+    Product.id, Product.description, Product.price, Product.section, Product.stock, Product.barcode,
+)
+
+
+def catalog_signature(db: Session) -> tuple[Optional[datetime], int]:
+    """Última atualização e número de produtos: mudam a cada escrita no catálogo."""
+    max_updated_at, count = db.query(func.max(Product.updated_at), func.count(Product.id)).one()
+    return max_updated_at, count
+
+
+def catalog_rows(db: Session, batch_size: int = 5000) -> Iterator[tuple]:
+    """Produtos em ordem de ID com as colunas do catálogo e `updated_at`, em lotes."""
+    return iter(
+        db.query(*CATALOG_COLUMNS, Product.updated_at)
+        .order_by(Product.id)
+        .yield_per(batch_size)
+    )
+
+
+def get_catalog_item(db: Session, product_id: Optional[int] = None, barcode: Optional[str] = None):
+    """Item do catálogo por ID ou código de barras, lido do banco."""
+    query = db.query(*CATALOG_COLUMNS)
+    if product_id is not None:
+        row = query.filter(Product.id == product_id).first()
+        detail = f"Produto com ID {product_id} não encontrado"
+    else:
+        row = query.filter(Product.barcode == barcode).first()
+        detail = f"Produto com código de barras {barcode} não encontrado"
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return row
+
+
+def search_products(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> tuple[List[Product], Optional[str]]:
+    """
+    Busca textual em descrição e seção, com os resultados mais relevantes
+    primeiro. Retorna os produtos e o cursor da próxima página.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Coluna tsvector gerada e indexada (GIN) pela migração; não é
+        # mapeada no modelo para manter o SQLite dos testes compatível
+        vector = literal_column("product.search_vector")
+        ts_query = func.websearch_to_tsquery("portuguese", q)
+        # ts_rank_cd devolve real (float4): convertido para double precision,
+        # o valor no cursor (float do Python) volta idêntico na comparação
+        rank = cast(func.ts_rank_cd(vector, ts_query), Float(53))
+        conditions = [vector.op("@@")(ts_query)]
+    else:
+        # Fallback (SQLite): todos os termos em descrição ou seção, sem ranking
+        rank = literal(0.0)
+        conditions = [
+            or_(Product.description.ilike(f"%{term}%"), Product.section.ilike(f"%{term}%"))
+            for term in q.split()
+        ]
+
+    query = db.query(Product, rank.label("rank")).filter(*conditions)
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, (rank, Product.id))
+        query = query.filter(or_(
+            rank < last_rank,
+            and_(rank == last_rank, Product.id > last_id),
+        ))
+    rows = query.order_by(rank.desc(), Product.id).limit(limit).all()
+
+    products = [product for product, _ in rows]
+    next_page = None
+    if len(rows) == limit:
+        last_product, last_rank = rows[-1]
+        next_page = encode_cursor([float(last_rank), last_product.id])
+
+    return products, next_page
+
+
 def get_product(db: Session, product_id: int) -> Product:
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
@@ -49,12 +169,6 @@ def get_product(db: Session, product_id: int) -> Product:
             detail=f"Produto com ID {product_id} não encontrado"
         )
 
-    # Converter image_urls de JSON string para lista
-    if product.image_urls:
-        product.image_urls = json.loads(product.image_urls)
-    else:
-        product.image_urls = []
-
     return product
 
 
@@ -69,23 +183,16 @@ def create_product(db: Session, product: ProductCreate) -> Product:
                 detail="Código de barras já cadastrado"
             )
 
-    # Converter lista de URLs de imagens para JSON string
     product_data = product.dict()
-    if product_data.get('image_urls'):
-        product_data['image_urls'] = json.dumps(product_data['image_urls'])
+    product_data['image_urls'] = product_data.get('image_urls') or []
 
     # Criar novo produto
     db_product = Product(**product_data)
     db.add(db_product)
+    db.flush()
+    invalidate_on_commit(db, product_scopes(db_product.id, db_product.section))
     db.commit()
     db.refresh(db_product)
-
-    # Converter image_urls de JSON string para lista para a resposta
-    if db_product.image_urls:
-        db_product.image_urls = json.loads(db_product.image_urls)
-    else:
-        db_product.image_urls = []
-
     return db_product
 
 
@@ -105,26 +212,34 @@ def update_product(db: Session, product_id: int, product: ProductUpdate) -> Prod
     # Atualizar apenas os campos fornecidos
     update_data = product.dict(exclude_unset=True)
 
-    # Converter lista de URLs de imagens para JSON string
-    if 'image_urls' in update_data and update_data['image_urls'] is not None:
-        update_data['image_urls'] = json.dumps(update_data['image_urls'])
+    # image_urls nulo remove as imagens
+    if 'image_urls' in update_data and update_data['image_urls'] is None:
+        update_data['image_urls'] = []
 
+    section_changed = 'section' in update_data and update_data['section'] != db_product.section
+    previous_section = db_product.section
     for key, value in update_data.items():
         setattr(db_product, key, value)
+    invalidate_on_commit(db, product_scopes(product_id, previous_section, db_product.section))
+
+    # Mantém a lista desnormalizada de seções dos pedidos com o produto e
+    # os agregados de vendas por seção
+    if section_changed:
+        db.flush()
+        report_service.move_section_sales(db, product_id, previous_section, db_product.section)
+        order_ids = [
+            order_id for (order_id,) in
+            db.query(OrderItem.order_id).filter(OrderItem.product_id == product_id).distinct()
+        ]
+        order_service.refresh_sections(db, order_ids)
 
     db.commit()
     db.refresh(db_product)
-
-    # Converter image_urls de JSON string para lista para a resposta
-    if db_product.image_urls:
-        db_product.image_urls = json.loads(db_product.image_urls)
-    else:
-        db_product.image_urls = []
-
     return db_product
 
 
 def delete_product(db: Session, product_id: int) -> None:
     db_product = get_product(db, product_id)
+    invalidate_on_commit(db, product_scopes(product_id, db_product.section))
     db.delete(db_product)
     db.commit()
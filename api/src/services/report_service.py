@@ -0,0 +1,193 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.order import Order, OrderItem, OrderStatus
+from src.models.product import Product
+from src.models.report import SalesDaily, SalesDailyClient, SalesDailySection
+
+
+def _upsert_add(db: Session, model, keys: List[str], rows: List[dict]) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE somando os valores às linhas existentes."""
+    if not rows:
+        return
+    table = model.__table__
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            column: table.c[column] + stmt.excluded[column]
+            for column in rows[0] if column not in keys
+        }
+    )
+    # Ordem fixa das chaves: transações concorrentes bloqueiam as linhas na
+    # mesma sequência
+    db.execute(stmt, sorted(rows, key=lambda row: tuple(row[k] for k in keys)))
+
+
+def record_sales(db: Session, order_ids: List[int], sign: int = 1) -> None:
+    """
+    Soma (sign=1) ou subtrai (sign=-1) os pedidos dos agregados diários.
+
+    Roda na transação do chamador, antes do commit; são duas consultas e um
+    upsert por tabela de agregado, qualquer que seja o número de pedidos.
+    """
+    if not order_ids:
+        return
+    db.flush()
+
+    daily, by_client, by_section = {}, {}, {}
+    order_days = {}
+    orders = db.query(
+        Order.id, Order.client_id, Order.created_at, Order.total_amount
+    ).filter(Order.id.in_(order_ids)).all()
+    for order_id, client_id, created_at, total_amount in orders:
+        day = created_at.date()
+        order_days[order_id] = day
+        row = daily.setdefault(day, {"day": day, "orders": 0, "revenue": 0.0})
+        row["orders"] += sign
+        row["revenue"] += sign * total_amount
+        row = by_client.setdefault((day, client_id), {
+            "day": day, "client_id": client_id, "orders": 0, "revenue": 0.0})
+        row["orders"] += sign
+        row["revenue"] += sign * total_amount
+
+    items = db.query(
+        OrderItem.order_id,
+        Product.section,
+        func.sum(OrderItem.quantity),
+        func.sum(OrderItem.quantity * OrderItem.unit_price)
+    ).join(Product, Product.id == OrderItem.product_id).filter(
+        OrderItem.order_id.in_(order_ids)
+    ).group_by(OrderItem.order_id, Product.section).all()
+    for order_id, section, quantity, revenue in items:
+        day = order_days[order_id]
+        row = by_section.setdefault((day, section), {
+            "day": day, "section": section, "quantity": 0, "revenue": 0.0})
+        row["quantity"] += sign * quantity
+        row["revenue"] += sign * revenue
+
+    _upsert_add(db, SalesDaily, ["day"], list(daily.values()))
+    _upsert_add(db, SalesDailyClient, ["day", "client_id"], list(by_client.values()))
+    _upsert_add(db, SalesDailySection, ["day", "section"], list(by_section.values()))
+
+
+def move_section_sales(db: Session, product_id: int, old_section: str, new_section: str) -> None:
+    """
+    Transfere as vendas do produto entre seções em `sales_daily_section`,
+    sem commit.
+
+    Os agregados usam a seção atual do produto; sem a transferência, um
+    cancelamento posterior à troca de seção subtrairia da seção nova vendas
+    somadas à antiga.
+    """
+    if old_section == new_section:
+        return
+    items = db.query(
+        Order.created_at,
+        func.sum(OrderItem.quantity),
+        func.sum(OrderItem.quantity * OrderItem.unit_price)
+    ).join(Order, Order.id == OrderItem.order_id).filter(
+        OrderItem.product_id == product_id, Order.status != OrderStatus.CANCELLED
+    ).group_by(Order.id, Order.created_at).all()
+
+    moved = {}
+    for created_at, quantity, revenue in items:
+        row = moved.setdefault(created_at.date(), [0, 0.0])
+        row[0] += quantity
+        row[1] += revenue
+    rows = []
+    for day, (quantity, revenue) in moved.items():
+        rows.append({"day": day, "section": old_section, "quantity": -quantity, "revenue": -revenue})
+        rows.append({"day": day, "section": new_section, "quantity": quantity, "revenue": revenue})
+    _upsert_add(db, SalesDailySection, ["day", "section"], rows)
+
+
+def forget_client(db: Session, client_id: int) -> None:
+    """
+    Remove as linhas do cliente em `sales_daily_client`, sem commit.
+
+    Os agregados não apagam linhas que chegam a zero, e a chave estrangeira
+    para `client` impediria a exclusão de um cliente que já teve pedidos.
+    """
+    db.query(SalesDailyClient).filter(
+        SalesDailyClient.client_id == client_id
+    ).delete(synchronize_session=False)
+
+
+def rebuild_sales(db: Session, batch_size: int = 1000) -> int:
+    """Recalcula todos os agregados a partir dos pedidos, sem commit."""
+    for model in (SalesDaily, SalesDailyClient, SalesDailySection):
+        db.query(model).delete(synchronize_session=False)
+
+    counted = 0
+    last_id = 0
+    while True:
+        order_ids = [
+            order_id for (order_id,) in
+            db.query(Order.id)
+            .filter(Order.id > last_id, Order.status != OrderStatus.CANCELLED)
+            .order_by(Order.id)
+            .limit(batch_size)
+        ]
+        if not order_ids:
+            break
+        record_sales(db, order_ids)
+        counted += len(order_ids)
+        last_id = order_ids[-1]
+    return counted
+
+
+def _date_range(query, column, start_date: Optional[date], end_date: Optional[date]):
+    if start_date:
+        query = query.filter(column >= start_date)
+    if end_date:
+        query = query.filter(column <= end_date)
+    return query
+
+
+def get_daily_sales(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[dict]:
+    query = db.query(SalesDaily).filter(SalesDaily.orders != 0)
+    query = _date_range(query, SalesDaily.day, start_date, end_date)
+    return [
+        {"day": row.day, "orders": row.orders, "revenue": round(row.revenue, 2)}
+        for row in query.order_by(SalesDaily.day)
+    ]
+
+
+def get_sales_by_section(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[dict]:
+    quantity = func.sum(SalesDailySection.quantity)
+    revenue = func.sum(SalesDailySection.revenue)
+    query = db.query(SalesDailySection.section, quantity, revenue)
+    query = _date_range(query, SalesDailySection.day, start_date, end_date)
+    rows = query.group_by(SalesDailySection.section).having(quantity != 0).order_by(revenue.desc())
+    return [
+        {"section": section, "quantity": qty, "revenue": round(total, 2)}
+        for section, qty, total in rows
+    ]
+
+
+def get_sales_by_client(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 10
+) -> List[dict]:
+    orders = func.sum(SalesDailyClient.orders)
+    revenue = func.sum(SalesDailyClient.revenue)
+    query = db.query(SalesDailyClient.client_id, orders, revenue)
+    query = _date_range(query, SalesDailyClient.day, start_date, end_date)
+    rows = (
+        query.group_by(SalesDailyClient.client_id)
+        .having(orders != 0)
+        .order_by(revenue.desc(), SalesDailyClient.client_id)
+        .limit(limit)
+    )
+    return [
+        {"client_id": client_id, "orders": count, "revenue": round(total, 2)}
+        for client_id, count, total in rows
+    ]
@@ -0,0 +1,464 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional
+from urllib.parse import unquote, urlparse
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config.database import primary_session
+
+logger = logging.getLogger(__name__)
+
+# Cache de respostas das rotas de leitura: memory (por processo), redis
+# (compartilhado entre processos e hosts) ou none (desativado)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory").lower()
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Tempo máximo por operação no Redis; acima disso a requisição segue sem cache
+CACHE_REDIS_TIMEOUT_SECONDS = float(os.environ.get("CACHE_REDIS_TIMEOUT_SECONDS", 0.1))
+CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "lu-estilo")
+# Entradas do backend em memória (respostas e contadores de versão, cada um)
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 1024))
+# Também limita por quanto tempo uma escrita não invalidada (ex.: falha no
+# Redis) pode ser servida
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", 30))
+# Páginas de /products guardadas (por combinação de filtros); cursores não
+CACHE_MAX_PAGE = int(os.environ.get("CACHE_MAX_PAGE", 3))
+
+
+class LRUCache:
+    """
+    Cache LRU com validade, seguro entre threads.
+
+    Conta acertos, faltas, expirações e remoções por capacidade (evictions).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("hits", "misses", "expirations", "evictions"), 0)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, value, ttl_seconds: Optional[float] = None) -> None:
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+class CacheBackend:
+    """
+    Armazenamento do cache: valores em bytes com validade e contadores de
+    versão (sem validade), lidos em lote e incrementados por escopo.
+
+    Backends com `blocking = True` fazem E/S e são chamados fora do event loop.
+    """
+    blocking = False
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def versions(self, keys: list[str]) -> list[int]:
+        raise NotImplementedError
+
+    def bump(self, keys: list[str]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Libera o que o backend guarda localmente (as respostas já foram invalidadas)."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Backend em memória do processo (LRU com validade).
+
+    Os contadores de versão também são limitados: ao descartar um contador,
+    o piso dos contadores ausentes passa a ser maior que o valor descartado,
+    de modo que respostas gravadas com ele nunca voltam a ser encontradas.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self._entries = LRUCache(max_entries, CACHE_TTL_SECONDS)
+        self._versions: OrderedDict = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._entries.put(key, value, ttl_seconds)
+
+    def versions(self, keys: list[str]) -> list[int]:
+        with self._lock:
+            return [self._versions.get(key, self._floor) for key in keys]
+
+    def bump(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, self._floor) + 1
+                self._versions.move_to_end(key)
+            while len(self._versions) > self._entries.max_entries:
+                _, version = self._versions.popitem(last=False)
+                self._floor = max(self._floor, version + 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._versions:
+                self._floor = max(self._floor, *self._versions.values()) + 1
+            self._versions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            versions = len(self._versions)
+        return {"backend": "memory", **self._entries.stats(), "versions": versions}
+
+
+class RedisError(Exception):
+    """Erro devolvido pelo servidor (resposta `-ERR ...`)."""
+
+
+class _RedisConnection:
+    def __init__(self, address: tuple[str, int], timeout_seconds: float):
+        self._sock = socket.create_connection(address, timeout=timeout_seconds)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def execute(self, *commands: tuple) -> list:
+        """Envia os comandos de uma vez (pipeline) e lê as respostas, na ordem."""
+        payload = bytearray()
+        for command in commands:
+            payload += b"*%d\r\n" % len(command)
+            for arg in command:
+                data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+                payload += b"$%d\r\n%s\r\n" % (len(data), data)
+        self._sock.sendall(payload)
+        replies = [self._read() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def _read(self):
+        line = self._file.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Conexão com o Redis encerrada")
+        kind, data = line[:1], line[1:-2]
+        if kind == b"+":
+            return data.decode()
+        if kind == b"-":
+            return RedisError(data.decode())
+        if kind == b":":
+            return int(data)
+        if kind == b"$":
+            length = int(data)
+            return None if length < 0 else self._file.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(data)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"Resposta inválida do Redis: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend em qualquer servidor que fale o protocolo do Redis (RESP),
+    com um pool de conexões reaproveitadas entre threads.
+
+    Os contadores de versão não têm validade; configure o servidor com uma
+    política `volatile-*` (ex.: `maxmemory-policy volatile-lru`) para que
+    apenas respostas, e nunca contadores, sejam descartadas por memória.
+    """
+    blocking = True
+
+    def __init__(self, url: str = CACHE_REDIS_URL, timeout_seconds: float = CACHE_REDIS_TIMEOUT_SECONDS):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"URL do Redis inválida: {url}")
+        self._address = (parsed.hostname or "localhost", parsed.port or 6379)
+        self._password = unquote(parsed.password) if parsed.password else None
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._timeout_seconds = timeout_seconds
+        self._pool: queue.LifoQueue = queue.LifoQueue()
+
+    def _connect(self) -> _RedisConnection:
+        connection = _RedisConnection(self._address, self._timeout_seconds)
+        try:
+            if self._password:
+                connection.execute(("AUTH", self._password))
+            if self._db:
+                connection.execute(("SELECT", self._db))
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def execute(self, *commands: tuple) -> list:
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            replies = connection.execute(*commands)
+        except RedisError:
+            self._pool.put(connection)
+            raise
+        except BaseException:
+            # Conexão em estado desconhecido (timeout no meio da resposta)
+            connection.close()
+            raise
+        self._pool.put(connection)
+        return replies
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute(("GET", key))[0]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.execute(("SET", key, value, "PX", max(int(ttl_seconds * 1000), 1)))
+
+    def versions(self, keys: list[str]) -> list[int]:
+        return [int(value) if value is not None else 0 for value in self.execute(("MGET", *keys))[0]]
+
+    def bump(self, keys: list[str]) -> None:
+        self.execute(*(("INCR", key) for key in keys))
+
+    def stats(self) -> dict:
+        host, port = self._address
+        return {"backend": "redis", "server": f"{host}:{port}/{self._db}", "connections": self._pool.qsize()}
+
+
+def scope(entity: str, key=None) -> str:
+    """Escopo de versão: `scope("product", 1)`, `scope("products")`, `scope("products", "Roupas")`."""
+    return entity if key is None else f"{entity}:{key}"
+
+
+# Escopo presente em todas as chaves: incrementá-lo invalida todo o cache
+_EPOCH_SCOPE = "_epoch"
+
+
+def product_scopes(product_id: int, *sections: str) -> list[str]:
+    """Escopos afetados por uma escrita no produto: o detalhe e as listagens."""
+    return [scope("product", product_id), scope("products"), *(scope("products", section) for section in sections)]
+
+
+class ResponseCache:
+    """
+    Respostas JSON já serializadas, em chaves versionadas.
+
+    A chave de uma resposta inclui a versão atual de cada escopo do qual ela
+    depende (ex.: `product:1`) e os parâmetros da requisição. Invalidar é
+    incrementar a versão do escopo: O(1), sem varrer chaves; as respostas
+    antigas deixam de ser encontradas e expiram pelo TTL. Toda chave inclui
+    também uma época global, usada para invalidar tudo de uma vez (`clear`).
+
+    Falhas no backend não derrubam a requisição: a leitura segue como falta
+    e a escrita não é guardada.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl_seconds: float = CACHE_TTL_SECONDS,
+                 prefix: str = CACHE_KEY_PREFIX):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("hits", "misses", "bumps", "errors"), 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def _version_key(self, name: str) -> str:
+        return f"{self.prefix}:v:{name}"
+
+    async def lookup(self, namespace: str, scopes: list[str], params: dict) -> tuple[Optional[str], Optional[bytes]]:
+        """Retorna a chave da resposta e o corpo guardado (None se ausente)."""
+        try:
+            versions = await self._call(
+                self.backend.versions, [self._version_key(name) for name in (_EPOCH_SCOPE, *scopes)])
+            digest = hashlib.blake2b(
+                json.dumps(sorted(params.items()), default=str).encode(), digest_size=12
+            ).hexdigest()
+            key = f"{self.prefix}:{namespace}:{'.'.join(map(str, versions))}:{digest}"
+            body = await self._call(self.backend.get, key)
+        except (OSError, RedisError):
+            logger.warning("Falha ao consultar o cache de respostas", exc_info=True)
+            self._count("errors")
+            return None, None
+        self._count("hits" if body is not None else "misses")
+        return key, body
+
+    async def store(self, key: str, body: bytes) -> None:
+        try:
+            await self._call(self.backend.set, key, body, self.ttl_seconds)
+        except (OSError, RedisError):
+            logger.warning("Falha ao gravar no cache de respostas", exc_info=True)
+            self._count("errors")
+
+    def bump(self, scopes: Iterable[str]) -> None:
+        """Invalida os escopos (chamado após o commit, fora do event loop)."""
+        keys = [self._version_key(name) for name in sorted(set(scopes))]
+        if not self.enabled or not keys:
+            return
+        try:
+            self.backend.bump(keys)
+        except (OSError, RedisError):
+            # As respostas antigas seguem válidas até expirar
+            logger.warning("Falha ao invalidar o cache de respostas: %s", keys, exc_info=True)
+            self._count("errors")
+            return
+        self._count("bumps", len(keys))
+
+    def clear(self) -> None:
+        """Invalida todas as respostas, em qualquer backend, incrementando a época."""
+        if self.enabled:
+            self.backend.bump([self._version_key(_EPOCH_SCOPE)])
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            **counters,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else None,
+            "ttl_seconds": self.ttl_seconds,
+            **(self.backend.stats() if self.enabled else {}),
+        }
+
+
+def _create_backend(name: str) -> Optional[CacheBackend]:
+    if name == "memory":
+        return MemoryBackend()
+    if name == "redis":
+        return RedisBackend()
+    if name == "none":
+        return None
+    raise ValueError(f"CACHE_BACKEND inválido: {name} (use memory, redis ou none)")
+
+
+response_cache = ResponseCache(_create_backend(CACHE_BACKEND))
+
+# Tipos dos parâmetros que compõem a chave (a sessão e o usuário ficam de fora)
+_KEY_TYPES = (str, int, float, bool, type(None))
+
+
+def cached_response(
+    namespace: str,
+    response_model: type[BaseModel],
+    scopes: Callable[..., Iterable[str]],
+    when: Optional[Callable[..., bool]] = None,
+):
+    """
+    Guarda a resposta de uma rota de leitura no cache de respostas.
+
+    Aplicado abaixo de `@router.get`: a rota continua declarando seus
+    parâmetros e dependências (autenticação inclusive), e o decorador
+    recebe os valores já resolvidos. `scopes` e `when` recebem esses mesmos
+    parâmetros: o primeiro define as versões das quais a resposta depende,
+    o segundo se a requisição pode usar o cache. Erros (HTTPException) não
+    são guardados. A rota deve receber a sessão como `db` (de `get_read_db`):
+    faltas no cache são lidas do primário, e acertos não usam o banco.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            if not response_cache.enabled or (when is not None and not when(**kwargs)):
+                return await endpoint(**kwargs)
+
+            params = {name: value for name, value in kwargs.items() if isinstance(value, _KEY_TYPES)}
+            key, body = await response_cache.lookup(namespace, list(scopes(**kwargs)), params)
+            if body is None:
+                # A falta é lida do primário: as versões da chave já incluem
+                # as escritas confirmadas, que uma réplica atrasada ainda não
+                # teria, e o valor antigo ficaria guardado sob a versão nova
+                async with primary_session(kwargs["db"]) as db:
+                    result = await endpoint(**{**kwargs, "db": db})
+                    body = response_model.model_validate(result, from_attributes=True).model_dump_json().encode()
+                if key is not None:
+                    await response_cache.store(key, body)
+            return Response(content=body, media_type="application/json")
+        return wrapper
+    return decorator
+
+
+_PENDING_KEY = "response_cache_scopes"
+
+
+def invalidate_on_commit(db: Session, scopes: Iterable[str]) -> None:
+    """
+    Registra escopos a invalidar quando a transação de `db` for confirmada;
+    um rollback os descarta. Invalidar só após o commit impede que uma
+    leitura concorrente grave o valor antigo sob a versão nova.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(scopes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    scopes = session.info.pop(_PENDING_KEY, None)
+    if scopes:
+        response_cache.bump(scopes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,341 @@
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from src.services import product_service
+
+logger = logging.getLogger(__name__)
+
+# Snapshot do catálogo compartilhado pelos workers do host (arquivo mapeado
+# em memória). Prefira um tmpfs, como /dev/shm, para o arquivo.
+CATALOG_SNAPSHOT_ENABLED = os.environ.get("CATALOG_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+CATALOG_SNAPSHOT_PATH = os.environ.get(
+    "CATALOG_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "lu_estilo_catalog.snapshot")
+)
+# Intervalo entre verificações de `product.updated_at` (só no processo líder)
+CATALOG_SNAPSHOT_REFRESH_SECONDS = float(os.environ.get("CATALOG_SNAPSHOT_REFRESH_SECONDS", 2))
+# Reconstrói mesmo sem mudança aparente: cobre transações confirmadas com
+# `updated_at` anterior ao da última reconstrução
+CATALOG_SNAPSHOT_MAX_AGE_SECONDS = float(os.environ.get("CATALOG_SNAPSHOT_MAX_AGE_SECONDS", 300))
+# Intervalo mínimo entre verificações de troca do arquivo pelos leitores
+_RELOAD_CHECK_SECONDS = 1.0
+
+# Formato (little-endian):
+#   cabeçalho: magic, produtos, produtos com código de barras,
+#              max(updated_at) e data da construção (µs desde 1970)
+#   registros de tamanho fixo, em ordem de ID: id, preço, estoque e
+#              (deslocamento, tamanho) de descrição, seção e código de barras
+#   índice de códigos de barras: número do registro, em ordem de código
+#   textos em UTF-8
+_MAGIC = b"LUCAT001"
+_HEADER = struct.Struct("<8sIIqq")
+_RECORD = struct.Struct("<qdqIIIIIi")
+_INDEX = struct.Struct("<I")
+_ID = struct.Struct("<q")
+_NO_TIMESTAMP = -1
+_EPOCH = datetime(1970, 1, 1)
+
+
+class CatalogItem(NamedTuple):
+    id: int
+    description: str
+    price: float
+    section: str
+    stock: int
+    barcode: Optional[str]
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    if value is None:
+        return _NO_TIMESTAMP
+    return (value.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> Optional[datetime]:
+    return None if value == _NO_TIMESTAMP else _EPOCH + timedelta(microseconds=value)
+
+
+def write_snapshot(path: str, rows: Iterable[tuple]) -> int:
+    """
+    Grava o snapshot a partir de `rows` (colunas do catálogo e `updated_at`,
+    em ordem de ID) e retorna o número de produtos.
+
+    O arquivo é escrito ao lado do destino e então renomeado: leitores com
+    o arquivo anterior mapeado continuam lendo-o até trocarem de mapeamento.
+    """
+    records = []
+    barcodes = []
+    strings = bytearray()
+    max_updated_at = None
+
+    def add_string(value: str) -> tuple[int, int]:
+        data = value.encode("utf-8")
+        strings.extend(data)
+        return len(strings) - len(data), len(data)
+
+    for product_id, description, price, section, stock, barcode, updated_at in rows:
+        if updated_at is not None and (max_updated_at is None or updated_at > max_updated_at):
+            max_updated_at = updated_at
+        if barcode is None:
+            barcode_offset, barcode_length = 0, -1
+        else:
+            barcode_offset, barcode_length = add_string(barcode)
+            barcodes.append((barcode.encode("utf-8"), len(records)))
+        records.append((
+            product_id, price, stock, *add_string(description), *add_string(section),
+            barcode_offset, barcode_length,
+        ))
+    barcodes.sort()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".catalog-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as snapshot:
+            snapshot.write(_HEADER.pack(
+                _MAGIC, len(records), len(barcodes),
+                _to_micros(max_updated_at), _to_micros(datetime.utcnow()),
+            ))
+            for record in records:
+                snapshot.write(_RECORD.pack(*record))
+            for _, index in barcodes:
+                snapshot.write(_INDEX.pack(index))
+            snapshot.write(strings)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(records)
+
+
+class CatalogSnapshot:
+    """
+    Snapshot mapeado em memória (somente leitura).
+
+    As buscas por ID e por código de barras são binárias sobre o arquivo
+    mapeado; as páginas ficam no cache do sistema operacional, compartilhadas
+    por todos os processos do host.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as snapshot:
+            self._map = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"Snapshot do catálogo inválido: {path}")
+        magic, self.count, self._barcodes, max_updated_at, built_at = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            raise ValueError(f"Snapshot do catálogo inválido: {path}")
+        self.max_updated_at = _from_micros(max_updated_at)
+        self.built_at = _from_micros(built_at)
+        self._index_offset = _HEADER.size + self.count * _RECORD.size
+        self._strings_offset = self._index_offset + self._barcodes * _INDEX.size
+
+    @property
+    def signature(self) -> tuple[Optional[datetime], int]:
+        """Mesma forma de `product_service.catalog_signature`."""
+        return self.max_updated_at, self.count
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _record(self, index: int) -> tuple:
+        return _RECORD.unpack_from(self._map, _HEADER.size + index * _RECORD.size)
+
+    def _item(self, index: int) -> CatalogItem:
+        (product_id, price, stock, description_offset, description_length,
+         section_offset, section_length, barcode_offset, barcode_length) = self._record(index)
+        return CatalogItem(
+            product_id,
+            self._string(description_offset, description_length),
+            price,
+            self._string(section_offset, section_length),
+            stock,
+            None if barcode_length < 0 else self._string(barcode_offset, barcode_length),
+        )
+
+    def get(self, product_id: int) -> Optional[CatalogItem]:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            (current,) = _ID.unpack_from(self._map, _HEADER.size + middle * _RECORD.size)
+            if current < product_id:
+                low = middle + 1
+            elif current > product_id:
+                high = middle
+            else:
+                return self._item(middle)
+        return None
+
+    def get_by_barcode(self, barcode: str) -> Optional[CatalogItem]:
+        wanted = barcode.encode("utf-8")
+        low, high = 0, self._barcodes
+        while low < high:
+            middle = (low + high) // 2
+            (index,) = _INDEX.unpack_from(self._map, self._index_offset + middle * _INDEX.size)
+            record = self._record(index)
+            start = self._strings_offset + record[7]
+            current = self._map[start:start + record[8]]
+            if current < wanted:
+                low = middle + 1
+            elif current > wanted:
+                high = middle
+            else:
+                return self._item(index)
+        return None
+
+
+class SnapshotReader:
+    """
+    Mantém o snapshot de `path` mapeado e passa a usar o novo arquivo quando
+    ele é substituído (verificado no máximo a cada `check_seconds`).
+
+    O mapeamento anterior não é fechado explicitamente: é liberado quando
+    nenhuma busca em andamento o referencia mais.
+    """
+
+    def __init__(self, path: str, check_seconds: float = _RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._identity = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_seconds:
+            self.reload()
+        return self._snapshot
+
+    def reload(self) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                info = os.stat(self.path)
+            except FileNotFoundError:
+                self._snapshot = self._identity = None
+                return
+            identity = (info.st_ino, info.st_mtime_ns, info.st_size)
+            if identity == self._identity:
+                return
+            try:
+                self._snapshot = CatalogSnapshot(self.path)
+                self._identity = identity
+            except (OSError, ValueError):
+                logger.exception("Falha ao abrir o snapshot do catálogo %s", self.path)
+                self._snapshot = self._identity = None
+
+
+catalog = SnapshotReader(CATALOG_SNAPSHOT_PATH)
+
+
+def find(product_id: Optional[int] = None, barcode: Optional[str] = None) -> Optional[CatalogItem]:
+    """Busca no snapshot; None se desativado, ainda não construído ou ausente nele."""
+    if not CATALOG_SNAPSHOT_ENABLED:
+        return None
+    snapshot = catalog.current()
+    if snapshot is None:
+        return None
+    return snapshot.get(product_id) if product_id is not None else snapshot.get_by_barcode(barcode)
+
+
+def refresh_snapshot(
+    session_factory: Callable[[], Session],
+    reader: SnapshotReader,
+    max_age_seconds: float = CATALOG_SNAPSHOT_MAX_AGE_SECONDS,
+) -> bool:
+    """
+    Reconstrói o snapshot de `reader` se o catálogo mudou (último
+    `updated_at` ou número de produtos) ou se ele passou da idade máxima.
+    Retorna se reconstruiu.
+    """
+    reader.reload()
+    current = reader.current()
+    with session_factory() as db:
+        if current is not None:
+            age = (datetime.utcnow() - current.built_at).total_seconds()
+            if age < max_age_seconds and product_service.catalog_signature(db) == current.signature:
+                return False
+        count = write_snapshot(reader.path, product_service.catalog_rows(db))
+    reader.reload()
+    logger.info("Snapshot do catálogo reconstruído: %s produtos", count)
+    return True
+
+
+def try_lead(path: str) -> Optional[int]:
+    """
+    Tenta se tornar o processo que reconstrói o snapshot (flock exclusivo
+    em `path.lock`). Retorna o descritor do lock, mantido enquanto o
+    processo viver, ou None se outro processo já o detém.
+    """
+    fd = os.open(f"{path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+async def run_refresher(
+    session_factory: Callable[[], Session],
+    stop: asyncio.Event,
+    reader: SnapshotReader,
+    refresh_seconds: float = CATALOG_SNAPSHOT_REFRESH_SECONDS,
+) -> None:
+    """
+    Mantém o snapshot atualizado até `stop` ser sinalizado.
+
+    Todos os workers executam o laço, mas só o que obtém o lock reconstrói;
+    se ele terminar, outro assume na verificação seguinte.
+    """
+    lock_fd = None
+    try:
+        while not stop.is_set():
+            if lock_fd is None:
+                lock_fd = try_lead(reader.path)
+            if lock_fd is not None:
+                try:
+                    await asyncio.to_thread(refresh_snapshot, session_factory, reader)
+                except Exception:
+                    logger.exception("Falha ao reconstruir o snapshot do catálogo")
+            try:
+                await asyncio.wait_for(stop.wait(), refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if lock_fd is not None:
+            os.close(lock_fd)
+
+
+_refresher_task: Optional[asyncio.Task] = None
+_refresher_stop: Optional[asyncio.Event] = None
+
+
+def start_refresher(session_factory: Callable[[], Session]) -> None:
+    """Inicia a atualização do snapshot no event loop corrente (startup da API)."""
+    global _refresher_task, _refresher_stop
+    _refresher_stop = asyncio.Event()
+    _refresher_task = asyncio.create_task(run_refresher(session_factory, _refresher_stop, catalog))
+
+
+async def stop_refresher() -> None:
+    global _refresher_task, _refresher_stop
+    if _refresher_task is None:
+        return
+    _refresher_stop.set()
+    await _refresher_task
+    _refresher_task = _refresher_stop = None
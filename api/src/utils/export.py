@@ -0,0 +1,100 @@
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+
+# Linhas lidas do banco por lote e tamanho aproximado de cada bloco enviado
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+def encode_csv(rows: Iterable[dict], columns: Sequence[str]) -> Iterator[str]:
+    """Cabeçalho e uma linha CSV por registro; listas viram JSON."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_ndjson(rows: Iterable[dict], columns: Sequence[str] = ()) -> Iterator[str]:
+    """Um objeto JSON por linha."""
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, default=_json_default) + "\n"
+
+
+def stream_export(
+    session_factory: Callable,
+    export_fn: Callable,
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    filename: str,
+    **filters
+) -> StreamingResponse:
+    """
+    Resposta em streaming com os registros gerados por `export_fn`.
+
+    A sessão é aberta e fechada pelo próprio gerador, pois a resposta é
+    enviada depois que as dependências da rota já foram encerradas. Os
+    registros são agrupados em blocos de ~64 KB; a memória usada depende
+    apenas do lote do cursor, não do tamanho da exportação.
+    """
+    encoder = encode_csv if export_format == ExportFormat.CSV else encode_ndjson
+
+    def body() -> Iterator[bytes]:
+        db = session_factory()
+        try:
+            rows = export_fn(db, batch_size=EXPORT_BATCH_SIZE, **filters)
+            chunk, size = [], 0
+            for line in encoder(rows, columns):
+                chunk.append(line)
+                size += len(line)
+                if size >= EXPORT_CHUNK_BYTES:
+                    yield "".join(chunk).encode()
+                    chunk, size = [], 0
+            if chunk:
+                yield "".join(chunk).encode()
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
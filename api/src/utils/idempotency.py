@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from sqlalchemy.orm import Session
+
+from src.config.database import run_service
+from src.services import idempotency_service
+
+# Por quanto tempo uma resposta pode ser repetida para a mesma chave
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 86400))
+# Tempo máximo de espera por uma requisição duplicada ainda em andamento
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get("IDEMPOTENCY_WAIT_SECONDS", 30))
+# Validade da reserva de uma chave sem resposta registrada; depois disso a
+# requisição original é dada como perdida e a chave pode ser reservada de novo
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", 60))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 1024))
+_POLL_INTERVAL_SECONDS = 0.05
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: str
+    expires_at: float
+
+
+class _ResponseCache:
+    """Cache LRU com validade das respostas já registradas."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[StoredResponse]:
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is None:
+                return None
+            if stored.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return stored
+
+    def put(self, key, stored: StoredResponse) -> None:
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _ResponseCache(IDEMPOTENCY_CACHE_SIZE)
+# Requisições em andamento neste processo, por (usuário, chave)
+_inflight: dict = {}
+
+
+def request_hash(payload) -> str:
+    """Hash canônico do corpo da requisição."""
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _check_hash(stored_hash: str, payload_hash: str) -> None:
+    if stored_hash != payload_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key já utilizada com outro conteúdo de requisição"
+        )
+
+
+def _still_processing() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Uma requisição com esta Idempotency-Key ainda está em processamento"
+    )
+
+
+async def run_idempotent(
+    db,
+    user_id: int,
+    key: str,
+    payload_hash: str,
+    handler: Callable[[Callable[[Session, int, object], None]], Awaitable[tuple[int, object]]],
+) -> tuple[int, object, bool]:
+    """
+    Executa `handler` no máximo uma vez por (usuário, chave).
+
+    Retorna `(status_code, body, replayed)`. Repetições recebem a resposta
+    registrada (do cache em memória ou da tabela `idempotency_key`) sem
+    executar o handler. Duplicatas simultâneas aguardam a primeira
+    requisição: no mesmo processo por um evento, entre processos
+    consultando a tabela até a resposta ser registrada.
+
+    `handler` recebe `record(session, status_code, body)`, que grava a
+    resposta na transação do próprio handler, antes do commit: assim a
+    resposta nunca se perde depois de o efeito ter sido confirmado. Se o
+    handler não chamar `record`, a resposta é registrada em seguida, numa
+    transação separada.
+    """
+    cache_key = (user_id, key)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + IDEMPOTENCY_WAIT_SECONDS
+
+    while True:
+        stored = _cache.get(cache_key)
+        if stored:
+            _check_hash(stored.request_hash, payload_hash)
+            return stored.status_code, json.loads(stored.body), True
+        event = _inflight.get(cache_key)
+        if event is None:
+            break
+        try:
+            await asyncio.wait_for(event.wait(), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            raise _still_processing()
+
+    event = asyncio.Event()
+    _inflight[cache_key] = event
+    try:
+        while True:
+            existing = await run_service(
+                idempotency_service.claim_key,
+                db,
+                user_id=user_id,
+                key=key,
+                request_hash=payload_hash,
+                lease_seconds=IDEMPOTENCY_LEASE_SECONDS
+            )
+            if existing is None:
+                break
+            status_code, body = existing
+            if status_code is not None:
+                _cache.put(cache_key, StoredResponse(
+                    payload_hash, status_code, body, time.monotonic() + IDEMPOTENCY_TTL_SECONDS
+                ))
+                return status_code, json.loads(body), True
+            # Em andamento em outro processo
+            if loop.time() >= deadline:
+                raise _still_processing()
+            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+
+        recorded = []
+
+        def record(session: Session, status_code: int, body) -> None:
+            encoded = json.dumps(jsonable_encoder(body))
+            idempotency_service.store_response(
+                session, user_id, key, status_code, encoded, IDEMPOTENCY_TTL_SECONDS
+            )
+            recorded.append((status_code, encoded))
+
+        try:
+            status_code, body = await handler(record)
+        except BaseException:
+            # run_service só propaga o cancelamento depois que a thread do
+            # handler termina, então a sessão já está livre para a liberação
+            await run_service(idempotency_service.release_key, db, user_id=user_id, key=key)
+            raise
+
+        if recorded:
+            status_code, encoded = recorded[-1]
+        else:
+            encoded = json.dumps(jsonable_encoder(body))
+            await run_service(
+                idempotency_service.complete_key,
+                db,
+                user_id=user_id,
+                key=key,
+                status_code=status_code,
+                response_body=encoded,
+                ttl_seconds=IDEMPOTENCY_TTL_SECONDS
+            )
+        _cache.put(cache_key, StoredResponse(
+            payload_hash, status_code, encoded, time.monotonic() + IDEMPOTENCY_TTL_SECONDS
+        ))
+        return status_code, json.loads(encoded), False
+    finally:
+        _inflight.pop(cache_key, None)
+        event.set()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from src.services import outbox_service
+
+logger = logging.getLogger(__name__)
+
+# Worker dentro do processo da API; desative ao usar
+# `python -m src.commands.outbox_worker` em um processo separado
+OUTBOX_WORKER_ENABLED = os.environ.get("OUTBOX_WORKER_ENABLED", "true").lower() in ("1", "true", "yes")
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+# Intervalo entre consultas quando não há eventos pendentes
+OUTBOX_POLL_SECONDS = float(os.environ.get("OUTBOX_POLL_SECONDS", 1))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10))
+# Espera antes da primeira nova tentativa, dobrada a cada falha
+OUTBOX_RETRY_SECONDS = float(os.environ.get("OUTBOX_RETRY_SECONDS", 5))
+# Prazo da reserva: um evento não concluído nesse tempo é entregue de novo
+OUTBOX_LEASE_SECONDS = float(os.environ.get("OUTBOX_LEASE_SECONDS", 300))
+# Eventos concluídos há mais de N dias são removidos pelo worker (0 desativa)
+OUTBOX_RETENTION_DAYS = int(os.environ.get("OUTBOX_RETENTION_DAYS", 7))
+# Intervalo entre as remoções de eventos concluídos
+OUTBOX_PURGE_SECONDS = float(os.environ.get("OUTBOX_PURGE_SECONDS", 3600))
+_MAX_RETRY_SECONDS = 3600
+
+
+class OutboxMessage(NamedTuple):
+    id: int
+    event_type: str
+    aggregate_id: int
+    payload: dict
+    attempts: int
+
+
+Handler = Callable[[Session, OutboxMessage], None]
+_handlers: dict[str, list[Handler]] = {}
+
+
+def register(*event_types: str):
+    """
+    Registra um handler para os tipos de evento informados.
+
+    Os handlers recebem a sessão do worker e o evento; o que gravarem é
+    confirmado junto com a conclusão do evento. A entrega é "ao menos uma
+    vez": um evento pode ser repetido após uma falha, então os handlers
+    devem ser idempotentes.
+    """
+    def decorator(handler: Handler) -> Handler:
+        for event_type in event_types:
+            _handlers.setdefault(event_type, []).append(handler)
+        return handler
+    return decorator
+
+
+def retry_delay(attempts: int) -> float:
+    """Espera (s) antes da próxima tentativa, com recuo exponencial."""
+    return min(OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1), _MAX_RETRY_SECONDS)
+
+
+def process_batch(session_factory: Callable[[], Session], batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Processa um lote de eventos pendentes; retorna quantos foram reservados."""
+    with session_factory() as db:
+        events = outbox_service.claim_events(
+            db, batch_size, OUTBOX_MAX_ATTEMPTS, OUTBOX_LEASE_SECONDS
+        )
+        for row in events:
+            message = OutboxMessage(
+                row.id, row.event_type, row.aggregate_id, json.loads(row.payload), row.attempts
+            )
+            try:
+                for handler in _handlers.get(message.event_type, ()):
+                    handler(db, message)
+                outbox_service.mark_processed(db, message.id)
+            except Exception as exc:
+                logger.warning(
+                    "Falha no evento %s (%s), tentativa %s: %r",
+                    message.id, message.event_type, message.attempts, exc
+                )
+                retry_at = datetime.utcnow() + timedelta(seconds=retry_delay(message.attempts))
+                outbox_service.mark_failed(db, message.id, repr(exc), retry_at)
+    return len(events)
+
+
+def purge_processed(session_factory: Callable[[], Session], retention_days: int) -> int:
+    """Remove os eventos concluídos há mais de `retention_days` dias; retorna quantos."""
+    with session_factory() as db:
+        return outbox_service.purge_processed(db, datetime.utcnow() - timedelta(days=retention_days))
+
+
+async def run_worker(
+    session_factory: Callable[[], Session],
+    stop: asyncio.Event,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    poll_seconds: float = OUTBOX_POLL_SECONDS,
+    retention_days: int = OUTBOX_RETENTION_DAYS,
+    purge_seconds: float = OUTBOX_PURGE_SECONDS,
+) -> None:
+    """
+    Consome o outbox até `stop` ser sinalizado.
+
+    Lotes cheios são seguidos imediatamente pelo próximo; sem eventos
+    pendentes, aguarda `poll_seconds`. A cada `purge_seconds` remove os
+    eventos concluídos há mais de `retention_days` dias, para que a tabela
+    não cresça indefinidamente. O acesso ao banco roda em uma thread, fora
+    do event loop.
+    """
+    loop = asyncio.get_running_loop()
+    next_purge = loop.time()
+    while not stop.is_set():
+        if retention_days > 0 and loop.time() >= next_purge:
+            next_purge = loop.time() + purge_seconds
+            try:
+                removed = await asyncio.to_thread(purge_processed, session_factory, retention_days)
+                if removed:
+                    logger.info("%s eventos concluídos removidos do outbox", removed)
+            except Exception:
+                logger.exception("Falha ao remover eventos concluídos do outbox")
+        try:
+            claimed = await asyncio.to_thread(process_batch, session_factory, batch_size)
+        except Exception:
+            logger.exception("Falha ao consultar o outbox")
+            claimed = 0
+        if claimed < batch_size:
+            try:
+                await asyncio.wait_for(stop.wait(), poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+_worker_task: Optional[asyncio.Task] = None
+_worker_stop: Optional[asyncio.Event] = None
+
+
+def start_worker(session_factory: Callable[[], Session]) -> None:
+    """Inicia o worker no event loop corrente (startup da API)."""
+    global _worker_task, _worker_stop
+    _worker_stop = asyncio.Event()
+    _worker_task = asyncio.create_task(run_worker(session_factory, _worker_stop))
+
+
+async def stop_worker() -> None:
+    """Sinaliza o worker e aguarda o lote em andamento terminar."""
+    global _worker_task, _worker_stop
+    if _worker_task is None:
+        return
+    _worker_stop.set()
+    await _worker_task
+    _worker_task = _worker_stop = None
+
+
+@register(
+    outbox_service.ORDER_CREATED,
+    outbox_service.ORDER_STATUS_CHANGED,
+    outbox_service.ORDER_DELETED,
+)
+def log_order_event(db: Session, message: OutboxMessage) -> None:
+    # Ponto de extensão para notificações: por ora apenas registra o evento
+    logger.info("Pedido %s: %s %s", message.aggregate_id, message.event_type, message.payload)
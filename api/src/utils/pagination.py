@@ -0,0 +1,192 @@
+import base64
+import binascii
+import enum
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, func, literal, text, tuple_
+
+# Validade das contagens em cache usadas pelo modo de total estimado
+COUNT_CACHE_TTL_SECONDS = float(os.environ.get("COUNT_CACHE_TTL_SECONDS", 30))
+COUNT_CACHE_MAX_ENTRIES = 256
+
+
+class TotalMode(str, enum.Enum):
+    EXACT = "exact"        # COUNT(*) em uma consulta separada
+    WINDOW = "window"      # count(*) OVER () na mesma consulta da página
+    ESTIMATE = "estimate"  # estatística do planejador ou contagem em cache
+
+
+class TotalKind(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+def total_kind(total_mode: Optional[TotalMode]) -> TotalKind:
+    """Tipo do total retornado para o modo solicitado (None = sem total)."""
+    if total_mode is None:
+        return TotalKind.NONE
+    if total_mode == TotalMode.ESTIMATE:
+        return TotalKind.ESTIMATE
+    return TotalKind.EXACT
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Codifica os valores da chave de ordenação em um cursor opaco."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _cursor_value(key, value):
+    """Valor do cursor convertido para o tipo Python da coluna; ValueError se não couber."""
+    if isinstance(key.type, DateTime):
+        return datetime.fromisoformat(value)
+    try:
+        expected = key.type.python_type
+    except NotImplementedError:
+        return value
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    # bool é subclasse de int, mas nunca é um valor válido para as chaves numéricas
+    if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    """
+    Decodifica um cursor gerado por `encode_cursor` para as colunas `keys`.
+
+    Cada valor é conferido contra o tipo da sua coluna: um cursor adulterado
+    resulta em 400, nunca em uma comparação inválida no banco.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [_cursor_value(key, value) for key, value in zip(keys, values)]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+
+
+def apply_keyset(query, keys: Sequence, skip: int, limit: int, cursor: Optional[str] = None):
+    """
+    Ordena a consulta pelas colunas `keys` e pagina por cursor ou offset.
+
+    Com cursor, a página começa logo após a última linha da página anterior,
+    usando o índice das colunas da chave: o custo não depende da profundidade.
+    """
+    query = query.order_by(*keys)
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        if len(keys) == 1:
+            return query.filter(keys[0] > values[0]).limit(limit)
+        # Os valores levam o tipo da coluna para usar o mesmo formato de bind
+        bounds = [literal(value, key.type) for key, value in zip(keys, values)]
+        # O limite simples na primeira coluna (redundante com a comparação de
+        # tuplas) permite ao PostgreSQL descartar partições por created_at
+        return query.filter(keys[0] >= bounds[0], tuple_(*keys) > tuple_(*bounds)).limit(limit)
+    return query.offset(skip).limit(limit)
+
+
+def next_cursor(items: Sequence, limit: int, keys: Sequence) -> Optional[str]:
+    """Cursor da próxima página, ou None quando a página veio incompleta."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, key.key) for key in keys])
+
+
+_count_cache: dict = {}
+_count_cache_lock = threading.Lock()
+
+
+def _cached_count(query) -> int:
+    """Contagem exata reaproveitada por até COUNT_CACHE_TTL_SECONDS."""
+    compiled = query.statement.compile(dialect=query.session.get_bind().dialect)
+    key = (str(compiled), tuple(sorted(compiled.params.items(), key=lambda kv: kv[0])))
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = query.count()
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+        _count_cache[key] = (now + COUNT_CACHE_TTL_SECONDS, total)
+    return total
+
+
+def estimate_count(query, filtered: bool) -> int:
+    """
+    Total aproximado da consulta.
+
+    Em listas sem filtro no PostgreSQL usa `pg_class.reltuples`, mantido pelo
+    ANALYZE/autovacuum (somado entre as partições, em tabelas particionadas);
+    nos demais casos usa uma contagem exata em cache.
+    """
+    db = query.session
+    if not filtered and db.get_bind().dialect.name == "postgresql":
+        table = query.column_descriptions[0]["entity"].__table__
+        reltuples = db.execute(
+            text(
+                "SELECT CASE WHEN c.relkind = 'p' THEN ("
+                "SELECT sum(greatest(p.reltuples, 0)) FROM pg_inherits i "
+                "JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid"
+                ") ELSE c.reltuples END FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relname = :table AND n.nspname = current_schema()"
+            ),
+            {"table": table.name},
+        ).scalar()
+        # reltuples < 0 indica tabela ainda não analisada
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+    return _cached_count(query)
+
+
+def fetch_page(
+    query,
+    keys: Sequence,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    total_mode: Optional[TotalMode] = TotalMode.EXACT,
+    filtered: bool = True,
+) -> tuple[list, Optional[int]]:
+    """
+    Busca uma página e, conforme `total_mode`, o total de registros.
+
+    No modo WINDOW o total vem na própria consulta da página. Em páginas por
+    cursor (em que o filtro da chave reduz as linhas) ou páginas vazias, o
+    total é obtido com COUNT(*) separado.
+    """
+    page_query = apply_keyset(query, keys, skip, limit, cursor)
+
+    if total_mode is None:
+        return page_query.all(), None
+
+    if total_mode == TotalMode.WINDOW and not cursor:
+        rows = page_query.add_columns(func.count().over()).all()
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        return [], query.count()
+
+    if total_mode == TotalMode.ESTIMATE:
+        total = estimate_count(query, filtered)
+    else:
+        total = query.count()
+    return page_query.all(), total
@@ -9,8 +9,10 @@ from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
-from src.models.user import User
+from src.config.database import (REPLICA_SESSION_KEY, get_db, get_read_db,
+                                 primary_session, run_service)
+from src.models.user import User, UserRole
+from src.services import user_service
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -47,7 +49,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def _authenticate(token: str, db: Session) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciais inválidas",
@@ -61,7 +63,42 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except jwt.exceptions.PyJWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await run_service(
+        user_service.get_user_by_username, db, username=username)
+    if user is None and db.info.get(REPLICA_SESSION_KEY):
+        # Usuário recém-cadastrado pode ainda não ter chegado à réplica
+        async with primary_session(db) as primary:
+            user = await run_service(
+                user_service.get_user_by_username, primary, username=username)
     if user is None:
         raise credentials_exception
     return user
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return await _authenticate(token, db)
+
+
+async def get_current_read_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    """
+    Usuário autenticado para as rotas somente leitura: consultado na mesma
+    sessão de `get_read_db` que a rota recebe, sem usar uma conexão do primário.
+    """
+    return await _authenticate(token, db)
+
+
+def _require_admin(current_user: User) -> User:
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem acessar este recurso"
+        )
+    return current_user
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    return _require_admin(current_user)
+
+
+async def get_current_read_admin(current_user: User = Depends(get_current_read_user)):
+    return _require_admin(current_user)
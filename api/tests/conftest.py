@@ -1,8 +1,12 @@
+import os
+
+# O worker do outbox iniciado pela API usaria o banco configurado, não o dos testes
+os.environ.setdefault("OUTBOX_WORKER_ENABLED", "false")
+
 from src.utils.security import create_access_token, get_password_hash
 from src.models import order, product, user
 from src.models import client  # Importamos os modelos para criar tabelas
 from src.main import app
-import os
 from datetime import timedelta
 
 import pytest
@@ -12,7 +16,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from src.config.database import Base, get_db
+from src.config.database import (Base, get_db, get_read_db,
+                                 get_read_session_factory)
+from src.utils.cache import response_cache
 
 # Inicializar o Faker
 fake = Faker('pt_BR')  # Configurando para português do Brasil
@@ -44,6 +50,9 @@ def db_session(engine):
     Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     session = Session()
 
+    # IDs se repetem entre testes: o cache de respostas começa vazio
+    response_cache.clear()
+
     try:
         yield session
     finally:
@@ -64,6 +73,9 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_read_session_factory] = lambda: sessionmaker(
+        autocommit=False, autoflush=False, bind=db_session.get_bind())
 
     with TestClient(app) as test_client:
         yield test_client
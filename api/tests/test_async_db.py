@@ -0,0 +1,116 @@
+import pytest
+from faker import Faker
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.config.database import Base, get_db, get_read_db, to_async_url
+from src.main import app
+
+fake = Faker('pt_BR')
+
+
+def test_to_async_url():
+    """Testa a conversão das URLs para os drivers assíncronos."""
+    assert to_async_url("postgresql://u:p@localhost/db") == "postgresql+asyncpg://u:p@localhost/db"
+    assert to_async_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql+asyncpg://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+
+@pytest.fixture
+def async_client(tmp_path, db_session):
+    """Cliente de teste com a API usando AsyncSession sobre aiosqlite."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+    AsyncSessionTest = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with AsyncSessionTest() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def async_headers(async_client):
+    """Registra um administrador no banco assíncrono e retorna o token."""
+    user_data = {
+        "username": "asyncadmin",
+        "email": fake.email(),
+        "password": "adminpassword",
+        "role": "admin"
+    }
+    response = async_client.post("/auth/register", json=user_data)
+    assert response.status_code == status.HTTP_201_CREATED
+    response = async_client.post(
+        "/auth/login",
+        data={"username": "asyncadmin", "password": "adminpassword"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_async_order_flow(async_client, async_headers):
+    """Testa criação e leitura de pedidos pelo caminho assíncrono."""
+    client_data = {
+        "name": fake.name(),
+        "email": fake.email(),
+        "cpf": fake.cpf().replace('.', '').replace('-', ''),
+    }
+    response = async_client.post("/clients", json=client_data, headers=async_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    client_id = response.json()["id"]
+
+    product_data = {
+        "description": fake.sentence(nb_words=3),
+        "price": 50.0,
+        "barcode": fake.ean13(),
+        "section": "Roupas",
+        "stock": 10,
+        "image_urls": ["https://exemplo.com/imagem1.jpg"]
+    }
+    response = async_client.post("/products", json=product_data, headers=async_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    product_id = response.json()["id"]
+
+    order_data = {"client_id": client_id, "items": [{"product_id": product_id, "quantity": 3}]}
+    response = async_client.post("/orders", json=order_data, headers=async_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    order_id = response.json()["id"]
+    assert response.json()["total_amount"] == 150.0
+
+    response = async_client.get(f"/orders/{order_id}", headers=async_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["client"]["id"] == client_id
+    assert len(response.json()["items"]) == 1
+
+    response = async_client.put(
+        f"/orders/{order_id}", json={"status": "shipped"}, headers=async_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "shipped"
+
+    response = async_client.get("/orders", headers=async_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 1
+
+    response = async_client.get(f"/products/{product_id}", headers=async_headers)
+    assert response.json()["stock"] == 7
+
+    response = async_client.delete(f"/orders/{order_id}", headers=async_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["products"] == [{"product_id": product_id, "stock": 10}]
+
+    response = async_client.get(f"/products/{product_id}", headers=async_headers)
+    assert response.json()["stock"] == 10
@@ -0,0 +1,375 @@
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config import database
+from src.config.database import REPLICA_SESSION_KEY, Base, get_read_db
+from src.main import app
+from src.models.product import Product
+from src.utils.cache import (LRUCache, MemoryBackend, RedisBackend, RedisError,
+                             ResponseCache, invalidate_on_commit,
+                             product_scopes, response_cache)
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Subconjunto do protocolo do Redis (RESP) usado pelo RedisBackend."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _bulk(self, value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        server = self.server
+        while (command := self._read_command()) is not None:
+            name, args = command[0].upper(), command[1:]
+            server.commands.append(name.decode())
+            with server.lock:
+                if name in (b"PING", b"SELECT"):
+                    reply = b"+OK\r\n"
+                elif name == b"GET":
+                    reply = self._bulk(server.value(args[0]))
+                elif name == b"MGET":
+                    reply = b"*%d\r\n" % len(args) + b"".join(self._bulk(server.value(key)) for key in args)
+                elif name == b"SET":
+                    expires_at = time.monotonic() + int(args[3]) / 1000 if len(args) > 3 else None
+                    server.data[args[0]] = (args[1], expires_at)
+                    reply = b"+OK\r\n"
+                elif name == b"INCR":
+                    current = server.value(args[0]) or b"0"
+                    if not current.isdigit():
+                        reply = b"-ERR value is not an integer or out of range\r\n"
+                    else:
+                        server.data[args[0]] = (str(int(current) + 1).encode(), None)
+                        reply = b":%d\r\n" % (int(current) + 1)
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+class _FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeRedisHandler)
+        self.data = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+    def value(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+
+@pytest.fixture
+def redis_server():
+    server = _FakeRedisServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def redis_url(redis_server):
+    host, port = redis_server.server_address
+    return f"redis://{host}:{port}/1"
+
+
+def _add_product(db_session, section, price, stock):
+    new_product = Product(description=f"{section} {price}", price=price, section=section, stock=stock)
+    db_session.add(new_product)
+    db_session.commit()
+    return new_product
+
+
+def _order(client, headers, client_id, product_id, quantity):
+    return client.post("/orders", json={
+        "client_id": client_id,
+        "items": [{"product_id": product_id, "quantity": quantity, "unit_price": 1.0}],
+        "payment_method": "cash",
+    }, headers=headers)
+
+
+def _entries():
+    return response_cache.stats()["entries"]
+
+
+def test_lru_eviction_expiry_and_counters():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" passa a ser o menos usado
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 2)
+
+    cache.put("d", 4, ttl_seconds=0)
+    assert cache.get("d") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_memory_backend_never_reuses_evicted_versions():
+    """Um contador descartado volta acima de qualquer versão já usada."""
+    backend = MemoryBackend(max_entries=2)
+    backend.bump(["a", "a", "a"])
+    assert backend.versions(["a", "b"]) == [3, 0]
+
+    backend.bump(["b", "c"])  # descarta "a"
+
+    assert backend.versions(["a"])[0] > 3
+    assert backend.versions(["b", "c"]) == [1, 1]
+
+
+def test_product_detail_is_cached_until_updated(client, db_session, test_product, admin_headers):
+    """Testa que o detalhe vem do cache e que a atualização pela API o invalida."""
+    url = f"/products/{test_product.id}"
+    description = test_product.description
+    assert client.get(url, headers=admin_headers).json()["description"] == description
+
+    # Alteração fora dos serviços: o cache continua servindo o valor guardado
+    hits = response_cache.stats()["hits"]
+    db_session.query(Product).filter(Product.id == test_product.id).update({"description": "Alterado"})
+    db_session.commit()
+    assert client.get(url, headers=admin_headers).json()["description"] == description
+    assert response_cache.stats()["hits"] == hits + 1
+
+    response = client.put(url, json={"description": "Nova descrição"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get(url, headers=admin_headers).json()["description"] == "Nova descrição"
+
+
+def test_not_found_is_not_cached(client, admin_headers):
+    assert client.get("/products/9999", headers=admin_headers).status_code == status.HTTP_404_NOT_FOUND
+    assert _entries() == 0
+
+
+def test_order_stock_changes_invalidate_product(client, test_client, test_product, admin_headers):
+    """Testa que criar e cancelar pedidos atualiza o estoque e o pedido servidos pelo cache."""
+    url = f"/products/{test_product.id}"
+    stock = client.get(url, headers=admin_headers).json()["stock"]
+
+    response = _order(client, admin_headers, test_client.id, test_product.id, 2)
+    assert response.status_code == status.HTTP_201_CREATED
+    order_url = f"/orders/{response.json()['id']}"
+    assert client.get(url, headers=admin_headers).json()["stock"] == stock - 2
+    assert client.get(order_url, headers=admin_headers).json()["status"] == "pending"
+
+    response = client.put(order_url, json={"status": "cancelled"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get(url, headers=admin_headers).json()["stock"] == stock
+    assert client.get(order_url, headers=admin_headers).json()["status"] == "cancelled"
+
+
+def test_failed_order_keeps_cache(client, test_client, test_product, admin_headers):
+    """Testa que um pedido recusado (rollback) não invalida o cache."""
+    client.get(f"/products/{test_product.id}", headers=admin_headers)
+    bumps = response_cache.stats()["bumps"]
+
+    response = _order(client, admin_headers, test_client.id, test_product.id, test_product.stock + 1)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response_cache.stats()["bumps"] == bumps
+
+
+def test_rollback_discards_pending_invalidation(db_session, test_product):
+    bumps = response_cache.stats()["bumps"]
+
+    invalidate_on_commit(db_session, product_scopes(test_product.id, test_product.section))
+    db_session.rollback()
+    db_session.commit()
+
+    assert response_cache.stats()["bumps"] == bumps
+
+
+def test_list_invalidation_is_limited_to_section(client, db_session, admin_headers):
+    """Testa que páginas filtradas por outra categoria continuam no cache após uma escrita."""
+    clothes = _add_product(db_session, "Roupas", 50.0, 5)
+    _add_product(db_session, "Calçados", 80.0, 5)
+    urls = ["/products?category=Roupas", "/products?category=Calçados", "/products"]
+    first = [client.get(url, headers=admin_headers).json() for url in urls]
+    assert [page["total"] for page in first] == [1, 1, 2]
+
+    response = client.put(f"/products/{clothes.id}", json={"price": 120.0}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    hits = response_cache.stats()["hits"]
+    assert client.get(urls[1], headers=admin_headers).json() == first[1]
+    assert response_cache.stats()["hits"] == hits + 1
+    assert client.get(urls[0], headers=admin_headers).json()["items"][0]["price"] == 120.0
+    assert client.get(urls[2], headers=admin_headers).json()["items"][0]["price"] == 120.0
+    assert response_cache.stats()["hits"] == hits + 1
+
+    # Trocar de seção invalida as duas categorias
+    client.put(f"/products/{clothes.id}", json={"section": "Calçados"}, headers=admin_headers)
+    assert client.get(urls[0], headers=admin_headers).json()["total"] == 0
+    assert client.get(urls[1], headers=admin_headers).json()["total"] == 2
+
+
+def test_list_in_stock_page_follows_order_stock(client, db_session, test_client, admin_headers):
+    """Testa que esgotar um produto em um pedido o remove da listagem em estoque."""
+    sold_out = _add_product(db_session, "Roupas", 50.0, 2)
+    assert client.get("/products?in_stock=true", headers=admin_headers).json()["total"] == 1
+
+    assert _order(client, admin_headers, test_client.id, sold_out.id, 2).status_code == status.HTTP_201_CREATED
+
+    assert client.get("/products?in_stock=true", headers=admin_headers).json()["total"] == 0
+
+
+def test_cursor_pages_are_not_cached(client, db_session, admin_headers):
+    _add_product(db_session, "Roupas", 50.0, 2)
+    _add_product(db_session, "Roupas", 60.0, 2)
+    cursor = client.get("/products?size=1", headers=admin_headers).json()["next_cursor"]
+
+    client.get(f"/products?size=1&cursor={cursor}", headers=admin_headers)
+
+    assert _entries() == 1
+
+
+def test_misses_are_read_from_primary(client, db_session, test_product, admin_headers, monkeypatch):
+    """Testa que uma réplica atrasada não grava o valor antigo sob a versão nova."""
+    replica_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=replica_engine)
+    Replica = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    with Replica() as replica:
+        replica.add(Product(id=test_product.id, description=test_product.description,
+                            price=test_product.price, section=test_product.section, stock=1))
+        replica.commit()
+
+    def replica_db():
+        db = Replica()
+        db.info[REPLICA_SESSION_KEY] = True
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = replica_db
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+    url = f"/products/{test_product.id}"
+
+    assert client.get(url, headers=admin_headers).json()["stock"] == test_product.stock
+    assert client.get(url, headers=admin_headers).json()["stock"] == test_product.stock
+    assert response_cache.stats()["hits"] >= 1
+    replica_engine.dispose()
+
+
+def test_client_update_invalidates_client_and_orders(client, test_order, admin_headers):
+    """Testa que o pedido em cache (que inclui o cliente) reflete a alteração do cliente."""
+    client_url = f"/clients/{test_order.client_id}"
+    order_url = f"/orders/{test_order.id}"
+    client.get(client_url, headers=admin_headers)
+    client.get(order_url, headers=admin_headers)
+
+    response = client.put(client_url, json={"name": "Maria Souza"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    assert client.get(client_url, headers=admin_headers).json()["name"] == "Maria Souza"
+    assert client.get(order_url, headers=admin_headers).json()["client"]["name"] == "Maria Souza"
+
+
+def test_cache_stats_endpoint(client, test_product, admin_headers, normal_headers):
+    before = response_cache.stats()
+    client.get(f"/products/{test_product.id}", headers=admin_headers)
+    client.get(f"/products/{test_product.id}", headers=admin_headers)
+
+    response = client.get("/admin/cache", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["backend"] == "memory"
+    assert response.json()["hits"] == before["hits"] + 1
+    assert response.json()["misses"] == before["misses"] + 1
+    assert response.json()["entries"] == 1
+
+    response = client.get("/admin/cache", headers=normal_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_redis_backend_commands(redis_server, redis_url):
+    backend = RedisBackend(redis_url)
+    backend.set("k", b"valor\r\ncom quebra", 60)
+    assert backend.get("k") == b"valor\r\ncom quebra"
+    assert backend.get("ausente") is None
+
+    assert backend.versions(["v:a", "v:b"]) == [0, 0]
+    backend.bump(["v:a", "v:b", "v:a"])
+    assert backend.versions(["v:a", "v:b"]) == [2, 1]
+
+    backend.set("curta", b"x", 0.001)
+    time.sleep(0.01)
+    assert backend.get("curta") is None
+
+    backend.set("texto", b"abc", 60)
+    with pytest.raises(RedisError):
+        backend.bump(["texto"])
+    # A conexão segue utilizável após um erro do servidor
+    assert backend.get("k") == b"valor\r\ncom quebra"
+    assert redis_server.commands.count("SELECT") == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_clear_invalidates_all_responses(redis_server, redis_url):
+    """Testa que clear() com o backend Redis invalida as respostas sem apagar chaves."""
+    cache = ResponseCache(RedisBackend(redis_url), prefix="teste")
+    key, body = await cache.lookup("product", ["product:1"], {"product_id": 1})
+    assert body is None
+    await cache.store(key, b"{}")
+    assert (await cache.lookup("product", ["product:1"], {"product_id": 1}))[1] == b"{}"
+
+    cache.clear()
+
+    assert (await cache.lookup("product", ["product:1"], {"product_id": 1})) == (
+        key.replace(":0.0:", ":1.0:"), None)
+    assert "DEL" not in redis_server.commands
+
+
+def test_api_with_redis_backend(client, test_product, admin_headers, redis_server, redis_url, monkeypatch):
+    """Testa o cache das rotas e a invalidação por versão com o backend Redis."""
+    monkeypatch.setattr(response_cache, "backend", RedisBackend(redis_url))
+    url = f"/products/{test_product.id}"
+
+    client.get(url, headers=admin_headers)
+    stock = client.get(url, headers=admin_headers).json()["stock"]
+    assert response_cache.stats()["backend"] == "redis"
+    assert response_cache.stats()["hits"] >= 1
+
+    client.put(url, json={"stock": stock + 5}, headers=admin_headers)
+    assert "INCR" in redis_server.commands
+    assert client.get(url, headers=admin_headers).json()["stock"] == stock + 5
+
+
+def test_unavailable_backend_does_not_fail_requests(client, test_product, admin_headers, monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    cache = ResponseCache(RedisBackend(f"redis://127.0.0.1:{port}/0", timeout_seconds=0.05))
+    monkeypatch.setattr("src.utils.cache.response_cache", cache)
+
+    response = client.get(f"/products/{test_product.id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    response = client.put(f"/products/{test_product.id}", json={"stock": 1}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    assert cache.stats()["errors"] == 2
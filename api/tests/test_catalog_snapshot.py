@@ -0,0 +1,155 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+from src.models.product import Product
+from src.utils import catalog_snapshot
+from src.utils.catalog_snapshot import CatalogItem, SnapshotReader
+
+
+def _rows(*items, updated_at=datetime(2024, 5, 1, 12, 0, 0, 123456)):
+    return [(*item, updated_at) for item in items]
+
+
+@pytest.fixture
+def session_factory(db_session):
+    return sessionmaker(bind=db_session.get_bind())
+
+
+@pytest.fixture
+def reader(tmp_path):
+    return SnapshotReader(str(tmp_path / "catalog.snapshot"), check_seconds=0)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    items = [
+        CatalogItem(3, "Vestido Floral Verão", 89.9, "Roupas Femininas", 15, "7891234567890"),
+        CatalogItem(7, "Sandália", 59.5, "Calçados", 0, None),
+        CatalogItem(12, "Colar de Pérolas", 120.0, "Acessórios", 4, "0000000000001"),
+    ]
+    assert catalog_snapshot.write_snapshot(path, _rows(*items)) == 3
+
+    snapshot = catalog_snapshot.CatalogSnapshot(path)
+    assert snapshot.signature == (datetime(2024, 5, 1, 12, 0, 0, 123456), 3)
+    assert [snapshot.get(item.id) for item in items] == items
+    assert snapshot.get(5) is None
+    assert snapshot.get(100) is None
+    assert snapshot.get_by_barcode("7891234567890") == items[0]
+    assert snapshot.get_by_barcode("0000000000001") == items[2]
+    assert snapshot.get_by_barcode("123") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_empty_catalog_and_invalid_file(tmp_path):
+    path = str(tmp_path / "catalog.snapshot")
+    catalog_snapshot.write_snapshot(path, [])
+    snapshot = catalog_snapshot.CatalogSnapshot(path)
+    assert snapshot.signature == (None, 0)
+    assert snapshot.get(1) is None
+
+    invalid = tmp_path / "invalid.snapshot"
+    invalid.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        catalog_snapshot.CatalogSnapshot(str(invalid))
+
+
+def test_reader_switches_to_replaced_file(reader):
+    catalog_snapshot.write_snapshot(reader.path, _rows((1, "Vestido", 10.0, "Roupas", 5, None)))
+    old = reader.current()
+
+    catalog_snapshot.write_snapshot(reader.path, _rows((1, "Vestido", 12.0, "Roupas", 4, None)))
+
+    # O mapeamento anterior continua legível até ser descartado
+    assert old.get(1).price == 10.0
+    assert reader.current().get(1).price == 12.0
+
+
+def test_refresh_only_when_catalog_changes(db_session, session_factory, reader, test_product):
+    assert catalog_snapshot.refresh_snapshot(session_factory, reader) is True
+    assert reader.current().get(test_product.id).stock == test_product.stock
+    assert catalog_snapshot.refresh_snapshot(session_factory, reader) is False
+
+    test_product.stock = 1
+    test_product.updated_at = datetime.utcnow() + timedelta(minutes=1)
+    db_session.commit()
+    assert catalog_snapshot.refresh_snapshot(session_factory, reader) is True
+    assert reader.current().get(test_product.id).stock == 1
+
+    db_session.delete(test_product)
+    db_session.commit()
+    assert catalog_snapshot.refresh_snapshot(session_factory, reader) is True
+    assert reader.current().count == 0
+
+    # Idade máxima atingida: reconstrói mesmo sem mudança
+    assert catalog_snapshot.refresh_snapshot(session_factory, reader, max_age_seconds=0) is True
+
+
+def test_single_leader_per_path(reader):
+    leader = catalog_snapshot.try_lead(reader.path)
+    try:
+        assert leader is not None
+        assert catalog_snapshot.try_lead(reader.path) is None
+    finally:
+        os.close(leader)
+    follower = catalog_snapshot.try_lead(reader.path)
+    assert follower is not None
+    os.close(follower)
+
+
+@pytest.mark.asyncio
+async def test_refresher_builds_snapshot(session_factory, reader, test_product):
+    stop = asyncio.Event()
+    task = asyncio.create_task(
+        catalog_snapshot.run_refresher(session_factory, stop, reader, refresh_seconds=0.01)
+    )
+    for _ in range(200):
+        if reader.current() is not None:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await task
+
+    assert reader.current().get(test_product.id).description == test_product.description
+
+
+def test_catalog_endpoints_use_snapshot(client, db_session, session_factory, reader, test_product,
+                                        admin_headers, monkeypatch):
+    """Testa que as consultas vêm do snapshot e recorrem ao banco só na ausência do produto."""
+    monkeypatch.setattr(catalog_snapshot, "CATALOG_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(catalog_snapshot, "catalog", reader)
+    catalog_snapshot.refresh_snapshot(session_factory, reader)
+    expected = {
+        "id": test_product.id, "description": test_product.description, "price": test_product.price,
+        "section": test_product.section, "stock": test_product.stock, "barcode": test_product.barcode,
+    }
+
+    # Removido do banco, mas ainda no snapshot: a resposta não consulta o banco
+    db_session.delete(test_product)
+    db_session.commit()
+    response = client.get(f"/products/catalog/{expected['id']}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == expected
+    response = client.get(f"/products/catalog/barcode/{expected['barcode']}", headers=admin_headers)
+    assert response.json() == expected
+
+    # Criado depois do snapshot: vem do banco
+    created = Product(description="Bolsa", price=150.0, section="Acessórios", stock=3, barcode="999")
+    db_session.add(created)
+    db_session.commit()
+    response = client.get("/products/catalog/barcode/999", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == created.id
+
+    response = client.get("/products/catalog/9999", headers=admin_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_catalog_endpoint_without_snapshot(client, test_product, admin_headers):
+    response = client.get(f"/products/catalog/{test_product.id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["stock"] == test_product.stock
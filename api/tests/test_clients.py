@@ -154,3 +154,57 @@ def test_filter_clients_by_email(client, test_client, admin_headers):
     assert response.status_code == status.HTTP_200_OK
     assert len(response.json()["items"]) >= 1
     assert email_part in response.json()["items"][0]["email"]
+
+
+def test_search_clients_ranked(client, db_session, admin_headers):
+    """Testa a busca aproximada de clientes, com os melhores resultados primeiro."""
+    from src.models.client import Client
+
+    db_session.add_all([
+        Client(name="Ana Mariana Souza", email="ana.souza@exemplo.com", cpf="11111111111"),
+        Client(name="Mariana Lima", email="mlima@exemplo.com", cpf="22222222222"),
+        Client(name="Pedro Alves", email="pedro@mariana.com", cpf="33333333333"),
+        Client(name="Carlos Dias", email="carlos@exemplo.com", cpf="44444444444"),
+    ])
+    db_session.commit()
+
+    response = client.get("/clients?search=mariana", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    names = [c["name"] for c in response.json()["items"]]
+    assert response.json()["total"] == 3
+    assert names[0] == "Mariana Lima"
+    assert "Carlos Dias" not in names
+    assert response.json()["next_cursor"] is None
+
+
+
+def test_search_clients_with_filters(client, db_session, admin_headers):
+    """Testa que name e email restringem os resultados da busca aproximada."""
+    from src.models.client import Client
+
+    db_session.add_all([
+        Client(name="Mariana Lima", email="mlima@exemplo.com", cpf="22222222222"),
+        Client(name="Pedro Alves", email="pedro@mariana.com", cpf="33333333333"),
+        Client(name="Mariana Costa", email="mcosta@loja.com", cpf="55555555555"),
+    ])
+    db_session.commit()
+
+    response = client.get("/clients?search=mariana&email=exemplo", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [c["name"] for c in response.json()["items"]] == ["Mariana Lima"]
+    assert response.json()["total"] == 1
+
+    response = client.get("/clients?search=mariana&name=pedro", headers=admin_headers)
+    assert [c["name"] for c in response.json()["items"]] == ["Pedro Alves"]
+
+def test_search_clients_postgres_criteria():
+    """Testa que, no PostgreSQL, a busca usa os operadores do pg_trgm."""
+    from sqlalchemy.dialects import postgresql
+
+    from src.services.client_service import _search_criteria
+
+    condition, ranking = _search_criteria("postgresql", "maria")
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert "client.name %" in sql
+    sql = str(ranking[0].compile(dialect=postgresql.dialect()))
+    assert "similarity(client.name" in sql
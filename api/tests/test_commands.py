@@ -0,0 +1,133 @@
+import pytest
+from sqlalchemy import (Column, Float, Integer, MetaData, Table,
+                        create_engine, func, insert, select)
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import Base
+from src.models.client import Client
+from src.models.order import Order, OrderItem, OrderStatus
+from src.models.product import Product
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """Banco SQLite em arquivo, como o usado pelos comandos fora da API."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'commands.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _seed_orders(engine, count):
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        buyer = Client(name="Maria", email="maria@email.com", cpf="12345678901")
+        products = [
+            Product(description="Vestido", price=100.0, section="Roupas", stock=10),
+            Product(description="Sandália", price=80.0, section="Calçados", stock=10),
+        ]
+        session.add_all([buyer, *products])
+        session.flush()
+        orders = [
+            Order(client_id=buyer.id, status=OrderStatus.PENDING, total_amount=180.0)
+            for _ in range(count)
+        ]
+        session.add_all(orders)
+        session.commit()
+        return [o.id for o in orders], [p.id for p in products]
+
+
+def test_backfill_order_items(file_engine):
+    """Testa a cópia em lotes das linhas legadas de order_products."""
+    from src.commands.backfill_order_items import backfill_order_items
+
+    legacy = Table(
+        "order_products", MetaData(),
+        Column("order_id", Integer, primary_key=True),
+        Column("product_id", Integer, primary_key=True),
+        Column("quantity", Integer, nullable=False),
+        Column("unit_price", Float, nullable=False),
+    )
+    legacy.create(file_engine)
+
+    order_ids, product_ids = _seed_orders(file_engine, 5)
+    with file_engine.begin() as conn:
+        conn.execute(insert(legacy), [
+            {"order_id": order_id, "product_id": product_id, "quantity": 1, "unit_price": 10.0}
+            for order_id in order_ids for product_id in product_ids
+        ])
+        # O primeiro pedido já tem um dos itens em order_item
+        conn.execute(insert(OrderItem.__table__).values(
+            order_id=order_ids[0], product_id=product_ids[0], quantity=1, unit_price=10.0))
+
+    assert backfill_order_items(file_engine, batch_size=2) == 9
+    assert backfill_order_items(file_engine, batch_size=2) == 0
+    with file_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(OrderItem.__table__)).scalar() == 10
+
+
+def test_backfill_without_legacy_table(file_engine):
+    """Testa que o comando não faz nada depois que a tabela legada foi removida."""
+    from src.commands.backfill_order_items import backfill_order_items
+
+    assert backfill_order_items(file_engine) == 0
+
+
+def test_benchmark_section_filter(file_engine):
+    """Testa o benchmark do filtro por seção em uma base pequena."""
+    import random
+
+    from src.commands.benchmark_section_filter import run_benchmark, seed
+
+    seed(file_engine, orders=300, items_per_order=4, rng=random.Random(7))
+    results = run_benchmark(file_engine, repeat=1)
+
+    # O EXISTS conta cada pedido uma vez; o JOIN repete pedidos com vários itens
+    assert results["exists"]["total"] == results["distinct_orders"]
+    assert results["join"]["total"] > results["distinct_orders"]
+    assert results["exists"]["page_rows"] == 100
+
+
+def test_rebuild_order_sections(file_engine):
+    """Testa a conferência e o recálculo em lotes de order.sections."""
+    from src.commands.rebuild_order_sections import rebuild_order_sections
+
+    order_ids, product_ids = _seed_orders(file_engine, 5)
+    with file_engine.begin() as conn:
+        conn.execute(insert(OrderItem.__table__), [
+            {"order_id": order_id, "product_id": product_id, "quantity": 1, "unit_price": 10.0}
+            for order_id in order_ids for product_id in product_ids
+        ])
+
+    assert rebuild_order_sections(file_engine, batch_size=2, check_only=True) == (5, 5)
+    assert rebuild_order_sections(file_engine, batch_size=2) == (5, 5)
+    assert rebuild_order_sections(file_engine, batch_size=2, check_only=True) == (5, 0)
+
+    with file_engine.connect() as conn:
+        sections = conn.execute(select(Order.sections)).scalars().all()
+    assert sections == [["Calçados", "Roupas"]] * 5
+
+
+def test_backfill_sales_rollups(file_engine):
+    """Testa o recálculo dos agregados de vendas a partir dos pedidos."""
+    from src.commands.backfill_sales_rollups import backfill_sales_rollups
+    from src.models.report import SalesDaily, SalesDailySection
+
+    order_ids, product_ids = _seed_orders(file_engine, 4)
+    with file_engine.begin() as conn:
+        conn.execute(insert(OrderItem.__table__), [
+            {"order_id": order_id, "product_id": product_ids[0], "quantity": 1, "unit_price": 180.0}
+            for order_id in order_ids
+        ])
+        conn.execute(Order.__table__.update().where(Order.id == order_ids[0]).values(
+            status=OrderStatus.CANCELLED))
+
+    assert backfill_sales_rollups(file_engine, batch_size=2) == 3
+    # Rodar de novo não duplica os valores
+    assert backfill_sales_rollups(file_engine, batch_size=2) == 3
+
+    with file_engine.connect() as conn:
+        daily = conn.execute(select(SalesDaily.orders, SalesDaily.revenue)).all()
+        sections = conn.execute(select(SalesDailySection.section, SalesDailySection.quantity)).all()
+    assert daily == [(3, 540.0)]
+    assert sections == [("Roupas", 3)]
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException, status
+
+from src.config.executor import DBExecutor
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_function():
+    """Testa a execução de uma função no executor."""
+    executor = DBExecutor(max_workers=2, queue_depth=4)
+    result = await executor.run(lambda a, b=0: a + b, 1, b=2)
+    assert result == 3
+
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["active_workers"] == 0
+    assert stats["queued"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_queue_is_full():
+    """Testa o 503 com Retry-After quando a fila do executor está cheia."""
+    executor = DBExecutor(max_workers=1, queue_depth=1, retry_after=3)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    running = asyncio.ensure_future(executor.run(blocking))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0)
+
+    assert executor.stats()["active_workers"] == 1
+    assert executor.stats()["queued"] == 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        await executor.run(lambda: "rejected")
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.headers["Retry-After"] == "3"
+
+    release.set()
+    assert await running == "ok"
+    assert await queued == "queued"
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["queue_wait_max_ms"] > 0
+    executor.shutdown()
+
+
+
+@pytest.mark.asyncio
+async def test_executor_cancel_waits_for_worker():
+    """Testa que o cancelamento só se propaga depois que a thread termina de usar a sessão."""
+    executor = DBExecutor(max_workers=1, queue_depth=4)
+    release = threading.Event()
+    started = threading.Event()
+    finished = []
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        finished.append(True)
+
+    running = asyncio.ensure_future(executor.run(blocking))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+    queued = asyncio.ensure_future(executor.run(lambda: finished.append("queued")))
+    await asyncio.sleep(0)
+
+    running.cancel()
+    queued.cancel()
+    await asyncio.sleep(0.05)
+    assert not running.done()
+
+    release.set()
+    with pytest.raises(asyncio.CancelledError):
+        await running
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert finished == [True]
+
+    stats = executor.stats()
+    assert stats["active_workers"] == 0
+    assert stats["queued"] == 0
+    executor.shutdown()
+
+def test_executor_stats_endpoint(client, admin_headers, normal_headers):
+    """Testa o endpoint administrativo de estatísticas do executor."""
+    response = client.get("/admin/db/executor", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert "active_workers" in response.json()
+    assert "queue_wait_avg_ms" in response.json()
+
+    response = client.get("/admin/db/executor", headers=normal_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_get_db_closes_session_off_loop(monkeypatch):
+    """Testa que a sessão síncrona é fechada (ROLLBACK no pool) fora do event loop."""
+    from src.config import database
+
+    closed_in = []
+
+    class FakeSession:
+        info = {}
+
+        def close(self):
+            closed_in.append(threading.current_thread())
+
+    monkeypatch.setattr(database, "DATABASE_ASYNC", False)
+    monkeypatch.setattr(database, "SessionLocal", FakeSession)
+
+    dependency = database.get_db()
+    assert isinstance(await dependency.__anext__(), FakeSession)
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+
+    assert closed_in and closed_in[0] is not threading.current_thread()
@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+
+from fastapi import status
+from sqlalchemy import event, insert
+
+from src.models.client import Client
+from src.models.order import Order, OrderItem, OrderStatus
+from src.models.product import Product
+from src.services import order_service
+
+def _csv_rows(response):
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def _ndjson_rows(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_export_orders_csv(client, test_order, admin_headers):
+    """Testa a exportação de pedidos em CSV, com os itens em JSON."""
+    response = client.get("/orders/export", headers=admin_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="pedidos.csv"'
+    rows = _csv_rows(response)
+    assert list(rows[0]) == list(order_service.ORDER_EXPORT_COLUMNS)
+    assert [int(row["id"]) for row in rows] == [test_order.id]
+    assert rows[0]["status"] == "pending"
+    items = json.loads(rows[0]["items"])
+    assert items[0]["product_id"] == test_order.items[0].product_id
+    assert items[0]["quantity"] == 2
+
+
+def test_export_orders_ndjson_with_filters(client, db_session, test_order, test_client, admin_headers):
+    """Testa a exportação em NDJSON respeitando os filtros da listagem."""
+    db_session.add(Order(client_id=test_client.id, status=OrderStatus.CANCELLED, total_amount=0))
+    db_session.commit()
+
+    response = client.get("/orders/export?format=ndjson&status=pending", headers=admin_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = _ndjson_rows(response)
+    assert [row["id"] for row in rows] == [test_order.id]
+    assert rows[0]["items"][0]["quantity"] == 2
+
+
+def test_export_clients_filtered(client, db_session, admin_headers):
+    """Testa a exportação de clientes filtrada por nome."""
+    db_session.add_all([
+        Client(name="Ana Exportada", email="ana@exemplo.com", cpf="11111111111"),
+        Client(name="Bruno", email="bruno@exemplo.com", cpf="22222222222"),
+    ])
+    db_session.commit()
+
+    response = client.get("/clients/export?format=ndjson&name=Exportada", headers=admin_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [row["email"] for row in _ndjson_rows(response)] == ["ana@exemplo.com"]
+
+
+def test_export_products_in_stock(client, db_session, admin_headers):
+    """Testa a exportação de produtos com o filtro de estoque."""
+    db_session.add_all([
+        Product(description="Com estoque", price=10, section="Roupas", stock=3,
+                image_urls=["https://img/1.jpg"]),
+        Product(description="Sem estoque", price=10, section="Roupas", stock=0),
+    ])
+    db_session.commit()
+
+    response = client.get("/products/export?in_stock=true", headers=admin_headers)
+
+    rows = _csv_rows(response)
+    assert [row["description"] for row in rows] == ["Com estoque"]
+    assert json.loads(rows[0]["image_urls"]) == ["https://img/1.jpg"]
+
+
+def test_export_requires_authentication(client):
+    """Testa que a exportação exige autenticação."""
+    assert client.get("/orders/export").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_large_export_reads_in_batches(client, db_session, test_client, test_product, admin_headers, monkeypatch):
+    """Testa que a exportação percorre os pedidos e seus itens lote a lote."""
+    from src.utils import export
+
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 1000)
+    total = 2500
+    db_session.execute(insert(Order), [
+        {"client_id": test_client.id, "status": OrderStatus.PENDING, "total_amount": 1.0}
+        for _ in range(total)
+    ])
+    order_ids = [order_id for (order_id,) in db_session.query(Order.id).order_by(Order.id)]
+    db_session.execute(insert(OrderItem), [
+        {"order_id": order_id, "product_id": test_product.id, "quantity": 1, "unit_price": 1.0}
+        for order_id in order_ids
+    ])
+    db_session.commit()
+
+    statements = []
+    engine = db_session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/orders/export?format=ndjson", headers=admin_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    rows = _ndjson_rows(response)
+    assert [row["id"] for row in rows] == order_ids
+    assert all(len(row["items"]) == 1 for row in rows)
+    # Itens buscados por lote (o selectinload divide o IN em blocos de 500),
+    # e não um SELECT por pedido
+    item_selects = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM order_item" in s]
+    assert len(item_selects) == 5
@@ -0,0 +1,232 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.config.database import Base
+from src.models.idempotency import IdempotencyKey
+from src.models.product import Product
+from src.models.user import User
+from src.services import idempotency_service
+from src.utils import idempotency
+
+
+@pytest.fixture(autouse=True)
+def clear_idempotency_cache():
+    idempotency._cache.clear()
+    yield
+    idempotency._cache.clear()
+
+
+@pytest.fixture
+def file_sessions(tmp_path):
+    """Sessões independentes sobre um SQLite em arquivo (uma por requisição)."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'idempotency.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        poolclass=NullPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as session:
+        session.add(User(username="pdv", email="pdv@loja.com", hashed_password="x"))
+        session.commit()
+    yield Session
+    engine.dispose()
+
+
+def _order_payload(client_id, product_id, quantity=2):
+    return {"client_id": client_id, "items": [{"product_id": product_id, "quantity": quantity}]}
+
+
+def test_retry_replays_response(client, db_session, test_client, test_product, admin_headers):
+    """Testa que a repetição com a mesma chave devolve o pedido original."""
+    headers = {**admin_headers, "Idempotency-Key": "pdv-42-venda-1"}
+    payload = _order_payload(test_client.id, test_product.id)
+    initial_stock = test_product.stock
+
+    first = client.post("/orders", json=payload, headers=headers)
+    second = client.post("/orders", json=payload, headers=headers)
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert second.status_code == status.HTTP_201_CREATED
+    assert first.headers["Idempotency-Replayed"] == "false"
+    assert second.headers["Idempotency-Replayed"] == "true"
+    assert second.json() == first.json()
+
+    assert client.get("/orders", headers=admin_headers).json()["total"] == 1
+    product = client.get(f"/products/{test_product.id}", headers=admin_headers).json()
+    assert product["stock"] == initial_stock - 2
+
+
+def test_replay_from_table_without_touching_products(client, db_session, test_client, test_product, admin_headers):
+    """Testa a repetição a partir da tabela, sem consultar a tabela de produtos."""
+    from sqlalchemy import event
+
+    headers = {**admin_headers, "Idempotency-Key": "pdv-42-venda-2"}
+    payload = _order_payload(test_client.id, test_product.id)
+    first = client.post("/orders", json=payload, headers=headers)
+
+    # Simula outro processo (cache em memória vazio)
+    idempotency._cache.clear()
+    statements = []
+    engine = db_session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        second = client.post("/orders", json=payload, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert second.headers["Idempotency-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert not [s for s in statements if "product" in s]
+
+
+def test_same_key_different_payload(client, test_client, test_product, admin_headers):
+    """Testa que reutilizar a chave com outro corpo é rejeitado."""
+    headers = {**admin_headers, "Idempotency-Key": "pdv-42-venda-3"}
+    client.post("/orders", json=_order_payload(test_client.id, test_product.id), headers=headers)
+
+    response = client.post("/orders", json=_order_payload(test_client.id, test_product.id, 5), headers=headers)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_failed_request_releases_key(client, db_session, test_client, test_product, admin_headers):
+    """Testa que uma falha libera a chave para uma nova tentativa."""
+    headers = {**admin_headers, "Idempotency-Key": "pdv-42-venda-4"}
+    payload = _order_payload(test_client.id, test_product.id, 100)
+
+    response = client.post("/orders", json=payload, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert db_session.query(IdempotencyKey).count() == 0
+
+    db_session.query(Product).update({"stock": 100})
+    db_session.commit()
+    response = client.post("/orders", json=payload, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.headers["Idempotency-Replayed"] == "false"
+
+
+def test_expired_key_is_reclaimed(db_session, test_admin_user):
+    """Testa que uma chave expirada pode ser reservada novamente."""
+    db_session.add(IdempotencyKey(
+        user_id=test_admin_user.id,
+        key="antiga",
+        request_hash="a" * 64,
+        status_code=201,
+        response_body="{}",
+        expires_at=datetime.utcnow() - timedelta(seconds=1)
+    ))
+    db_session.commit()
+
+    claimed = idempotency_service.claim_key(
+        db_session, user_id=test_admin_user.id, key="antiga", request_hash="b" * 64, lease_seconds=60
+    )
+
+    assert claimed is None
+    assert db_session.query(IdempotencyKey).one().request_hash == "b" * 64
+
+
+def test_response_recorded_with_order(client, db_session, test_client, test_product, admin_headers,
+                                      monkeypatch):
+    """Testa que a resposta é gravada na transação do pedido, sem depender de outro commit."""
+    def fail(*args, **kwargs):
+        raise AssertionError("a resposta não deve ser registrada em outra transação")
+
+    monkeypatch.setattr(idempotency_service, "complete_key", fail)
+    headers = {**admin_headers, "Idempotency-Key": "pdv-42-venda-5"}
+    payload = _order_payload(test_client.id, test_product.id)
+
+    first = client.post("/orders", json=payload, headers=headers)
+    assert first.status_code == status.HTTP_201_CREATED
+    assert first.json()["items"][0]["product_id"] == test_product.id
+    stored = db_session.query(IdempotencyKey).one()
+    assert stored.status_code == status.HTTP_201_CREATED
+    assert stored.expires_at > datetime.utcnow() + timedelta(hours=1)
+
+    idempotency._cache.clear()
+    second = client.post("/orders", json=payload, headers=headers)
+    assert second.headers["Idempotency-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert client.get("/orders", headers=admin_headers).json()["total"] == 1
+
+
+def test_abandoned_claim_is_reclaimed_after_lease(db_session, test_admin_user):
+    """Testa que uma reserva sem resposta só bloqueia a chave durante o prazo da reserva."""
+    assert idempotency_service.claim_key(
+        db_session, user_id=test_admin_user.id, key="perdida", request_hash="a" * 64, lease_seconds=60
+    ) is None
+    assert idempotency_service.claim_key(
+        db_session, user_id=test_admin_user.id, key="perdida", request_hash="a" * 64, lease_seconds=60
+    ) == (None, None)
+
+    # Processo encerrado antes de responder: a reserva vence
+    db_session.query(IdempotencyKey).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db_session.commit()
+    assert idempotency_service.claim_key(
+        db_session, user_id=test_admin_user.id, key="perdida", request_hash="a" * 64, lease_seconds=60
+    ) is None
+    assert db_session.query(IdempotencyKey).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_first(file_sessions):
+    """Testa que duplicatas simultâneas aguardam a primeira requisição."""
+    calls = 0
+
+    async def handler(record):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return status.HTTP_201_CREATED, {"id": calls}
+
+    sessions = [file_sessions() for _ in range(5)]
+    try:
+        results = await asyncio.gather(*[
+            idempotency.run_idempotent(session, 1, "duplicada", "h" * 64, handler)
+            for session in sessions
+        ])
+    finally:
+        for session in sessions:
+            session.close()
+
+    assert calls == 1
+    assert [body for _, body, _ in results] == [{"id": 1}] * 5
+    assert sorted(replayed for _, _, replayed in results) == [False, True, True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_waits_for_request_in_other_process(file_sessions):
+    """Testa a espera por uma chave reservada por outro processo."""
+    with file_sessions() as session:
+        assert idempotency_service.claim_key(
+            session, user_id=1, key="outro-processo", request_hash="h" * 64, lease_seconds=60
+        ) is None
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.2)
+        with file_sessions() as session:
+            idempotency_service.complete_key(
+                session, user_id=1, key="outro-processo", status_code=201, response_body='{"id": 7}',
+                ttl_seconds=60
+            )
+
+    async def handler(record):
+        raise AssertionError("o handler não deve ser executado")
+
+    with file_sessions() as session:
+        result, _ = await asyncio.gather(
+            idempotency.run_idempotent(session, 1, "outro-processo", "h" * 64, handler),
+            finish_elsewhere(),
+        )
+
+    assert result == (201, {"id": 7}, True)
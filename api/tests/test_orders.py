@@ -216,3 +216,441 @@ def test_order_status_filter(client, test_order, admin_headers):
     assert len(response.json()["items"]) >= 1
     for item in response.json()["items"]:
         assert item["status"] == test_order.status
+
+
+def test_concurrent_orders_never_oversell(tmp_path):
+    """Testa pedidos simultâneos para o mesmo produto: o estoque nunca fica negativo."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fastapi import HTTPException
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import NullPool
+
+    from src.config.database import Base
+    from src.models.client import Client
+    from src.models.product import Product
+    from src.schemas.order import OrderCreate
+    from src.services import order_service
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        poolclass=NullPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as session:
+        buyer = Client(name=fake.name(), email=fake.email(), cpf="12345678901")
+        product = Product(description="Bolsa de Couro", price=150.0, section="Acessórios", stock=10)
+        session.add_all([buyer, product])
+        session.commit()
+        client_id, product_id = buyer.id, product.id
+
+    def place_order(_):
+        with Session() as session:
+            try:
+                order_service.create_order(session, OrderCreate(
+                    client_id=client_id,
+                    items=[{"product_id": product_id, "quantity": 3}],
+                ))
+                return True
+            except HTTPException as exc:
+                assert exc.status_code == status.HTTP_400_BAD_REQUEST
+                return False
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(place_order, range(20)))
+
+    with Session() as session:
+        stock = session.get(Product, product_id).stock
+        orders = session.query(Order).count()
+
+    assert stock >= 0
+    assert results.count(True) == 3
+    assert orders == 3
+    assert stock == 10 - 3 * 3
+    engine.dispose()
+
+
+def test_create_order_batches_product_lookup(client, db_session, test_client, admin_headers):
+    """Testa que os produtos do pedido são carregados em uma única consulta."""
+    from sqlalchemy import event
+
+    from src.models.product import Product
+
+    products = [
+        Product(description=f"Produto {i}", price=10.0, section="Roupas", stock=5)
+        for i in range(5)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    product_ids = [p.id for p in products]
+
+    statements = []
+    engine = db_session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.post("/orders", json={
+            "client_id": test_client.id,
+            "items": [{"product_id": product_id, "quantity": 2} for product_id in product_ids],
+        }, headers=admin_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    product_selects = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM product" in s]
+    assert len(product_selects) == 1
+    assert all(p["stock"] == 3 for p in client.get("/products", headers=admin_headers).json()["items"])
+
+
+@pytest.fixture
+def bulk_products(db_session):
+    from src.models.product import Product
+
+    products = [
+        Product(description="Camiseta Básica", price=50.0, section="Roupas", stock=5),
+        Product(description="Calça Jeans", price=120.0, section="Roupas", stock=2),
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return [p.id for p in products]
+
+
+def test_bulk_create_orders(client, db_session, test_client, bulk_products, admin_headers):
+    """Testa a criação de pedidos em lote."""
+    shirt, jeans = bulk_products
+    response = client.post("/orders/bulk", json={
+        "orders": [
+            {"client_id": test_client.id, "items": [{"product_id": shirt, "quantity": 2}]},
+            {"client_id": test_client.id, "items": [
+                {"product_id": shirt, "quantity": 1},
+                {"product_id": jeans, "quantity": 2},
+            ]},
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["mode"] == "all_or_nothing"
+    assert data["created"] == 2
+    assert data["failed"] == 0
+    assert [r["total_amount"] for r in data["results"]] == [100.0, 290.0]
+
+    order = client.get(f"/orders/{data['results'][1]['order_id']}", headers=admin_headers).json()
+    assert len(order["items"]) == 2
+    stocks = {p["id"]: p["stock"] for p in client.get("/products", headers=admin_headers).json()["items"]}
+    assert stocks[shirt] == 2
+    assert stocks[jeans] == 0
+
+
+def test_bulk_create_orders_all_or_nothing(client, test_client, bulk_products, admin_headers):
+    """Testa que um pedido inválido cancela todo o lote no modo all_or_nothing."""
+    shirt, jeans = bulk_products
+    response = client.post("/orders/bulk", json={
+        "mode": "all_or_nothing",
+        "orders": [
+            {"client_id": test_client.id, "items": [{"product_id": shirt, "quantity": 1}]},
+            {"client_id": test_client.id, "items": [{"product_id": jeans, "quantity": 3}]},
+            {"client_id": 9999, "items": [{"product_id": shirt, "quantity": 1}]},
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    data = response.json()
+    assert data["created"] == 0
+    assert [r["success"] for r in data["results"]] == [False, False, False]
+    assert "Estoque insuficiente" in data["results"][1]["error"]
+    assert "Cliente com ID 9999" in data["results"][2]["error"]
+
+    assert client.get("/orders", headers=admin_headers).json()["total"] == 0
+    stocks = {p["id"]: p["stock"] for p in client.get("/products", headers=admin_headers).json()["items"]}
+    assert stocks == {shirt: 5, jeans: 2}
+
+
+def test_bulk_create_orders_best_effort(client, test_client, bulk_products, admin_headers):
+    """Testa que o modo best_effort grava apenas os pedidos válidos."""
+    shirt, jeans = bulk_products
+    response = client.post("/orders/bulk", json={
+        "mode": "best_effort",
+        "orders": [
+            {"client_id": test_client.id, "items": [{"product_id": jeans, "quantity": 2}]},
+            {"client_id": test_client.id, "items": [{"product_id": jeans, "quantity": 1}]},
+            {"client_id": test_client.id, "items": [{"product_id": 9999, "quantity": 1}]},
+            {"client_id": test_client.id, "items": [{"product_id": shirt, "quantity": 5}]},
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [r["success"] for r in data["results"]] == [True, False, False, True]
+    assert "Produto com ID 9999" in data["results"][2]["error"]
+
+    assert client.get("/orders", headers=admin_headers).json()["total"] == 2
+    stocks = {p["id"]: p["stock"] for p in client.get("/products", headers=admin_headers).json()["items"]}
+    assert stocks == {shirt: 0, jeans: 0}
+
+
+
+@pytest.mark.parametrize("mode", ["all_or_nothing", "best_effort"])
+def test_bulk_create_orders_null_status(client, test_client, bulk_products, admin_headers, mode):
+    """Testa que status nulo no lote equivale ao padrão (pending)."""
+    shirt, _ = bulk_products
+    response = client.post("/orders/bulk", json={"mode": mode, "orders": [
+        {"client_id": test_client.id, "status": None, "items": [{"product_id": shirt, "quantity": 1}]},
+    ]}, headers=admin_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    order_id = response.json()["results"][0]["order_id"]
+    assert client.get(f"/orders/{order_id}", headers=admin_headers).json()["status"] == "pending"
+    assert _stock(client, admin_headers, shirt) == 4
+
+def test_cancel_orders_in_bulk(client, db_session, test_client, bulk_products, admin_headers):
+    """Testa o cancelamento em lote com devolução de estoque em uma única instrução."""
+    from sqlalchemy import event
+
+    shirt, jeans = bulk_products
+    created = client.post("/orders/bulk", json={
+        "orders": [
+            {"client_id": test_client.id, "items": [{"product_id": shirt, "quantity": 1}]},
+            {"client_id": test_client.id, "items": [
+                {"product_id": shirt, "quantity": 2},
+                {"product_id": jeans, "quantity": 2},
+            ]},
+            {"client_id": test_client.id, "items": [{"product_id": shirt, "quantity": 1}]},
+        ]
+    }, headers=admin_headers).json()
+    order_ids = [r["order_id"] for r in created["results"]]
+
+    statements = []
+    engine = db_session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.post("/orders/cancel", json={"order_ids": order_ids[:2]}, headers=admin_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["cancelled"] == order_ids[:2]
+    assert data["products"] == [
+        {"product_id": shirt, "stock": 4},
+        {"product_id": jeans, "stock": 2},
+    ]
+    assert len([s for s in statements if s.lstrip().startswith("UPDATE product")]) == 1
+
+    # Pedidos já cancelados são ignorados
+    again = client.post("/orders/cancel", json={"order_ids": order_ids}, headers=admin_headers).json()
+    assert again["cancelled"] == order_ids[2:]
+    assert again["products"] == [{"product_id": shirt, "stock": 5}]
+
+
+def test_cancel_orders_requires_admin(client, normal_headers):
+    """Testa que o cancelamento em lote é restrito a administradores."""
+    response = client.post("/orders/cancel", json={"order_ids": [1]}, headers=normal_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_delete_order(client, test_order, test_product, admin_headers):
+    """Testa a exclusão de um pedido com devolução do estoque."""
+    initial_stock = test_product.stock
+    response = client.delete(f"/orders/{test_order.id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "cancelled": [test_order.id],
+        "products": [{"product_id": test_product.id, "stock": initial_stock + 2}],
+    }
+
+    assert client.get(f"/orders/{test_order.id}", headers=admin_headers).status_code == status.HTTP_404_NOT_FOUND
+    product = client.get(f"/products/{test_product.id}", headers=admin_headers).json()
+    assert product["stock"] == initial_stock + 2
+
+
+
+def test_delete_cancelled_order_keeps_stock(client, test_order, test_product, admin_headers):
+    """Testa que excluir um pedido já cancelado não devolve o estoque de novo."""
+    client.post("/orders/cancel", json={"order_ids": [test_order.id]}, headers=admin_headers)
+    stock = client.get(f"/products/{test_product.id}", headers=admin_headers).json()["stock"]
+
+    response = client.delete(f"/orders/{test_order.id}", headers=admin_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"cancelled": [], "products": []}
+    assert client.get(f"/products/{test_product.id}", headers=admin_headers).json()["stock"] == stock
+
+
+def _stock(client, headers, product_id):
+    return client.get(f"/products/{product_id}", headers=headers).json()["stock"]
+
+
+def test_create_cancelled_order_then_delete(client, test_client, test_product, admin_headers):
+    """Testa que um pedido criado já cancelado não reserva estoque, nem o devolve ao ser excluído."""
+    initial_stock = test_product.stock
+    response = client.post("/orders", json={
+        "client_id": test_client.id, "status": "cancelled",
+        "items": [{"product_id": test_product.id, "quantity": 4}],
+    }, headers=admin_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert _stock(client, admin_headers, test_product.id) == initial_stock
+
+    response = client.delete(f"/orders/{response.json()['id']}", headers=admin_headers)
+    assert response.json() == {"cancelled": [], "products": []}
+    assert _stock(client, admin_headers, test_product.id) == initial_stock
+
+
+def test_create_cancelled_order_then_reopen(client, test_client, test_product, admin_headers):
+    """Testa que reabrir um pedido criado já cancelado reserva o estoque uma única vez."""
+    initial_stock = test_product.stock
+    order_id = client.post("/orders", json={
+        "client_id": test_client.id, "status": "cancelled",
+        "items": [{"product_id": test_product.id, "quantity": 4}],
+    }, headers=admin_headers).json()["id"]
+
+    response = client.put(f"/orders/{order_id}", json={"status": "pending"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert _stock(client, admin_headers, test_product.id) == initial_stock - 4
+
+    client.delete(f"/orders/{order_id}", headers=admin_headers)
+    assert _stock(client, admin_headers, test_product.id) == initial_stock
+
+
+def test_bulk_create_cancelled_orders(client, test_client, bulk_products, admin_headers):
+    """Testa que pedidos cancelados no lote não reservam nem consomem o estoque do lote."""
+    shirt, jeans = bulk_products
+    response = client.post("/orders/bulk", json={"orders": [
+        {"client_id": test_client.id, "status": "cancelled", "items": [{"product_id": jeans, "quantity": 9}]},
+        {"client_id": test_client.id, "items": [{"product_id": jeans, "quantity": 2}]},
+    ]}, headers=admin_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["created"] == 2
+    assert _stock(client, admin_headers, jeans) == 0
+    cancelled_id = response.json()["results"][0]["order_id"]
+    assert client.delete(f"/orders/{cancelled_id}", headers=admin_headers).json()["products"] == []
+    assert _stock(client, admin_headers, jeans) == 0
+
+def test_order_section_filter(client, db_session, test_client, admin_headers):
+    """Testa o filtro por seção sobre order_item, sem pedidos duplicados."""
+    from src.models.product import Product
+
+    products = [
+        Product(description="Vestido Floral", price=100.0, section="Roupas", stock=10),
+        Product(description="Blusa de Seda", price=80.0, section="Roupas", stock=10),
+        Product(description="Tênis Casual", price=200.0, section="Calçados", stock=10),
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    dress, blouse, sneaker = [p.id for p in products]
+
+    client.post("/orders/bulk", json={"orders": [
+        {"client_id": test_client.id, "items": [
+            {"product_id": dress, "quantity": 1},
+            {"product_id": blouse, "quantity": 1},
+        ]},
+        {"client_id": test_client.id, "items": [{"product_id": sneaker, "quantity": 1}]},
+    ]}, headers=admin_headers)
+
+    response = client.get("/orders?section=Roupas", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 1
+    assert len(response.json()["items"]) == 1
+    assert len(response.json()["items"][0]["items"]) == 2
+
+    response = client.get("/orders?section=Roupas&total_mode=window", headers=admin_headers)
+    assert response.json()["total"] == 1
+
+    response = client.get("/orders?section=Cosméticos", headers=admin_headers)
+    assert response.json()["total"] == 0
+
+
+def test_order_products_relationship(db_session, test_order, test_product):
+    """Testa que Order.products é lido de order_item."""
+    order = db_session.get(Order, test_order.id)
+    assert [p.id for p in order.products] == [test_product.id]
+
+
+def _seed_orders(db_session, client_id, product_id, count):
+    orders = [
+        Order(client_id=client_id, status=OrderStatus.PENDING, total_amount=20.0)
+        for _ in range(count)
+    ]
+    db_session.add_all(orders)
+    db_session.flush()
+    db_session.add_all([
+        OrderItem(order_id=o.id, product_id=product_id, quantity=1, unit_price=10.0)
+        for o in orders for _ in range(2)
+    ])
+    db_session.commit()
+
+
+@pytest.mark.parametrize("total_mode", ["exact", "window"])
+def test_list_orders_constant_statement_count(client, db_session, test_client, test_product, admin_headers, total_mode):
+    """Testa que /orders?size=100 executa um número fixo de consultas."""
+    from sqlalchemy import event
+
+    engine = db_session.get_bind()
+
+    def count_statements(size):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.get(f"/orders?size={size}&total_mode={total_mode}", headers=admin_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["items"]) == size
+        assert all(len(o["items"]) == 2 and o["client"] for o in response.json()["items"])
+        return len(statements)
+
+    client_id, product_id = test_client.id, test_product.id
+    _seed_orders(db_session, client_id, product_id, 5)
+    small_page = count_statements(5)
+
+    _seed_orders(db_session, client_id, product_id, 95)
+    full_page = count_statements(100)
+
+    assert full_page == small_page
+    # usuário + (contagem) + pedidos + clientes + itens
+    assert full_page <= 5
+
+
+def test_order_sections_maintained(client, db_session, test_client, admin_headers):
+    """Testa que as seções do pedido acompanham criação e troca de seção do produto."""
+    from src.models.product import Product
+
+    products = [
+        Product(description="Colar Dourado", price=90.0, section="Acessórios", stock=10),
+        Product(description="Saia Midi", price=110.0, section="Roupas", stock=10),
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    necklace, skirt = [p.id for p in products]
+
+    response = client.post("/orders", json={"client_id": test_client.id, "items": [
+        {"product_id": skirt, "quantity": 1},
+        {"product_id": necklace, "quantity": 1},
+    ]}, headers=admin_headers)
+    order_id = response.json()["id"]
+    assert response.json()["sections"] == ["Acessórios", "Roupas"]
+
+    client.put(f"/products/{necklace}", json={"section": "Joias", "image_urls": None}, headers=admin_headers)
+
+    order = client.get(f"/orders/{order_id}", headers=admin_headers).json()
+    assert order["sections"] == ["Joias", "Roupas"]
+    assert client.get("/orders?section=Joias", headers=admin_headers).json()["total"] == 1
+    assert client.get("/orders?section=Acessórios", headers=admin_headers).json()["total"] == 0
@@ -0,0 +1,213 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+from src.commands.outbox_worker import drain, purge
+from src.models.order import Order, OrderStatus
+from src.models.outbox import OutboxEvent
+from src.services import outbox_service
+from src.utils import outbox
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Registro de handlers isolado, com um handler que anota os eventos."""
+    monkeypatch.setattr(outbox, "_handlers", {})
+    received = []
+
+    @outbox.register(outbox_service.ORDER_CREATED, outbox_service.ORDER_STATUS_CHANGED)
+    def collect(db, message):
+        received.append(message)
+
+    return received
+
+
+@pytest.fixture
+def session_factory(db_session):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+
+
+def _payload(client_id, product_id, quantity=1):
+    return {"client_id": client_id, "items": [{"product_id": product_id, "quantity": quantity}]}
+
+
+def test_create_order_writes_event(client, db_session, test_client, test_product, admin_headers):
+    """Testa que o evento é gravado na mesma transação do pedido."""
+    response = client.post("/orders", json=_payload(test_client.id, test_product.id), headers=admin_headers)
+    order_id = response.json()["id"]
+
+    event = db_session.query(OutboxEvent).one()
+    assert event.event_type == outbox_service.ORDER_CREATED
+    assert event.aggregate_id == order_id
+    assert event.processed_at is None
+    payload = json.loads(event.payload)
+    assert payload["status"] == "pending"
+    assert payload["sections"] == [test_product.section]
+
+
+def test_failed_order_writes_no_event(client, db_session, test_client, test_product, admin_headers):
+    """Testa que um pedido recusado não deixa evento no outbox."""
+    response = client.post("/orders", json=_payload(test_client.id, test_product.id, 10_000), headers=admin_headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert db_session.query(OutboxEvent).count() == 0
+
+
+def test_bulk_and_status_changes_write_events(client, db_session, test_client, test_product, admin_headers):
+    """Testa os eventos do lote, da troca de status e do cancelamento em lote."""
+    db_session.query(type(test_product)).update({"stock": 100})
+    db_session.commit()
+    bulk = client.post("/orders/bulk", json={"orders": [
+        _payload(test_client.id, test_product.id), _payload(test_client.id, test_product.id),
+    ]}, headers=admin_headers).json()
+    first, second = [result["order_id"] for result in bulk["results"]]
+
+    client.put(f"/orders/{first}", json={"status": "shipped"}, headers=admin_headers)
+    # Sem mudança de status: nenhum evento
+    client.put(f"/orders/{first}", json={"status": "shipped"}, headers=admin_headers)
+    client.post("/orders/cancel", json={"order_ids": [first, second]}, headers=admin_headers)
+
+    events = [
+        (event.event_type, event.aggregate_id, json.loads(event.payload)["status"])
+        for event in db_session.query(OutboxEvent).order_by(OutboxEvent.id)
+    ]
+    assert events == [
+        (outbox_service.ORDER_CREATED, first, "pending"),
+        (outbox_service.ORDER_CREATED, second, "pending"),
+        (outbox_service.ORDER_STATUS_CHANGED, first, "shipped"),
+        (outbox_service.ORDER_STATUS_CHANGED, first, "cancelled"),
+        (outbox_service.ORDER_STATUS_CHANGED, second, "cancelled"),
+    ]
+
+
+def test_process_batch_runs_handlers(db_session, session_factory, handlers):
+    """Testa que o worker entrega os eventos e os marca como processados."""
+    outbox_service.add_events(db_session, outbox_service.ORDER_CREATED, [
+        (order_id, {"order_id": order_id}) for order_id in (1, 2, 3)
+    ])
+    db_session.commit()
+
+    assert outbox.process_batch(session_factory, batch_size=2) == 2
+    assert outbox.process_batch(session_factory, batch_size=2) == 1
+    assert outbox.process_batch(session_factory, batch_size=2) == 0
+
+    assert [message.payload["order_id"] for message in handlers] == [1, 2, 3]
+    assert db_session.query(OutboxEvent).filter(OutboxEvent.processed_at.is_(None)).count() == 0
+
+
+def test_failed_handler_is_retried_with_backoff(db_session, session_factory, handlers, monkeypatch):
+    """Testa que uma falha agenda nova tentativa e que o limite é respeitado."""
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+
+    @outbox.register("teste.falha")
+    def fail(db, message):
+        raise RuntimeError("indisponível")
+
+    outbox_service.add_event(db_session, "teste.falha", 1, {})
+    db_session.commit()
+
+    assert outbox.process_batch(session_factory) == 1
+    event = db_session.query(OutboxEvent).one()
+    assert event.attempts == 1
+    assert event.processed_at is None
+    assert "indisponível" in event.last_error
+    assert event.available_at > datetime.utcnow() + timedelta(seconds=outbox.OUTBOX_RETRY_SECONDS - 1)
+
+    # Ainda no recuo: não é entregue de novo
+    assert outbox.process_batch(session_factory) == 0
+
+    db_session.query(OutboxEvent).update({"available_at": datetime.utcnow() - timedelta(seconds=1)})
+    db_session.commit()
+    assert outbox.process_batch(session_factory) == 1
+    db_session.query(OutboxEvent).update({"available_at": datetime.utcnow() - timedelta(seconds=1)})
+    db_session.commit()
+    # Limite de tentativas atingido
+    assert outbox.process_batch(session_factory) == 0
+    assert db_session.query(OutboxEvent).one().attempts == 2
+
+
+def test_retry_delay_doubles_up_to_limit():
+    assert outbox.retry_delay(1) == outbox.OUTBOX_RETRY_SECONDS
+    assert outbox.retry_delay(3) == outbox.OUTBOX_RETRY_SECONDS * 4
+    assert outbox.retry_delay(50) == 3600
+
+
+def test_handler_writes_commit_with_event(db_session, session_factory, handlers, test_order):
+    """Testa que o que o handler grava é confirmado junto com o evento."""
+    @outbox.register("teste.entrega")
+    def deliver(db, message):
+        db.query(Order).filter(Order.id == message.aggregate_id).update({"status": OrderStatus.DELIVERED})
+
+    outbox_service.add_event(db_session, "teste.entrega", test_order.id, {})
+    db_session.commit()
+
+    outbox.process_batch(session_factory)
+
+    db_session.expire_all()
+    assert db_session.get(Order, test_order.id).status == OrderStatus.DELIVERED
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_until_stopped(db_session, session_factory, handlers):
+    """Testa o worker assíncrono: consome os eventos e encerra ao ser sinalizado."""
+    outbox_service.add_events(db_session, outbox_service.ORDER_CREATED, [
+        (order_id, {"order_id": order_id}) for order_id in range(1, 6)
+    ])
+    db_session.commit()
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(outbox.run_worker(session_factory, stop, batch_size=2, poll_seconds=0.05))
+    for _ in range(100):
+        if len(handlers) == 5:
+            break
+        await asyncio.sleep(0.02)
+    stop.set()
+    await asyncio.wait_for(task, 1)
+
+    assert [message.aggregate_id for message in handlers] == [1, 2, 3, 4, 5]
+
+
+
+@pytest.mark.asyncio
+async def test_worker_purges_old_processed_events(db_session, session_factory, handlers):
+    """Testa que o worker remove os eventos concluídos além da retenção."""
+    outbox_service.add_events(db_session, outbox_service.ORDER_CREATED, [
+        (order_id, {"order_id": order_id}) for order_id in range(1, 4)
+    ])
+    db_session.commit()
+    db_session.query(OutboxEvent).filter(OutboxEvent.aggregate_id <= 2).update(
+        {"processed_at": datetime.utcnow() - timedelta(days=10)})
+    db_session.commit()
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(outbox.run_worker(
+        session_factory, stop, poll_seconds=0.05, retention_days=7, purge_seconds=60))
+    for _ in range(100):
+        if handlers:
+            break
+        await asyncio.sleep(0.02)
+    stop.set()
+    await asyncio.wait_for(task, 1)
+
+    db_session.expire_all()
+    assert [event.aggregate_id for event in db_session.query(OutboxEvent)] == [3]
+    assert [message.aggregate_id for message in handlers] == [3]
+
+def test_cli_drain_and_purge(db_session, session_factory, handlers):
+    """Testa o comando: processa os pendentes e remove os concluídos antigos."""
+    outbox_service.add_events(db_session, outbox_service.ORDER_CREATED, [
+        (order_id, {"order_id": order_id}) for order_id in range(1, 8)
+    ])
+    db_session.commit()
+
+    assert drain(session_factory, batch_size=3) == 7
+    db_session.query(OutboxEvent).filter(OutboxEvent.aggregate_id <= 4).update(
+        {"processed_at": datetime.utcnow() - timedelta(days=10)})
+    db_session.commit()
+
+    assert purge(session_factory, days=7) == 4
+    assert db_session.query(OutboxEvent).count() == 3
@@ -0,0 +1,159 @@
+from faker import Faker
+from fastapi import status
+
+from src.models.client import Client
+from src.models.order import Order, OrderStatus
+from src.models.product import Product
+from src.utils import pagination
+from src.utils.pagination import decode_cursor, encode_cursor
+
+fake = Faker('pt_BR')
+
+
+def _create_clients(db_session, count):
+    clients = [
+        Client(
+            name=fake.name(),
+            email=f"cliente{i}.{fake.user_name()}@{fake.domain_name()}",
+            cpf=str(10000000000 + i),
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(clients)
+    db_session.commit()
+    return clients
+
+
+def _walk(client, url, headers, size=10):
+    """Percorre todas as páginas seguindo `next_cursor`."""
+    ids = []
+    response = client.get(f"{url}?size={size}", headers=headers)
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        ids.extend(item["id"] for item in body["items"])
+        if not body["next_cursor"]:
+            return ids
+        response = client.get(f"{url}?size={size}&cursor={body['next_cursor']}", headers=headers)
+
+
+def test_cursor_roundtrip():
+    """Testa que o cursor é opaco e decodificável."""
+    cursor = encode_cursor([5])
+    assert decode_cursor(cursor, (Client.id,)) == [5]
+
+
+def test_clients_cursor_pagination(client, db_session, admin_headers):
+    """Testa a paginação por cursor de clientes."""
+    clients = _create_clients(db_session, 25)
+    ids = _walk(client, "/clients", admin_headers)
+    assert ids == sorted(c.id for c in clients)
+
+
+def test_cursor_pages_do_not_shift_on_insert(client, db_session, admin_headers):
+    """Testa que inserções não deslocam as páginas seguintes."""
+    _create_clients(db_session, 15)
+    first = client.get("/clients?size=10", headers=admin_headers).json()
+    last_seen = first["items"][-1]["id"]
+
+    db_session.add(Client(name="Novo", email="novo@exemplo.com", cpf="99999999999"))
+    db_session.commit()
+
+    second = client.get(f"/clients?size=10&cursor={first['next_cursor']}", headers=admin_headers).json()
+    assert all(item["id"] > last_seen for item in second["items"])
+    assert len(second["items"]) == 6
+
+
+def test_products_cursor_pagination(client, db_session, admin_headers):
+    """Testa a paginação por cursor de produtos."""
+    products = [
+        Product(description=f"Produto {i}", price=10.0 + i, section="Roupas", stock=i)
+        for i in range(23)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+
+    ids = _walk(client, "/products", admin_headers)
+    assert ids == sorted(p.id for p in products)
+
+
+def test_orders_cursor_pagination(client, db_session, test_client, admin_headers):
+    """Testa a paginação por cursor de pedidos em (created_at, id)."""
+    orders = [
+        Order(client_id=test_client.id, status=OrderStatus.PENDING, total_amount=10.0)
+        for _ in range(21)
+    ]
+    db_session.add_all(orders)
+    db_session.commit()
+
+    ids = _walk(client, "/orders", admin_headers, size=5)
+    assert ids == sorted(o.id for o in orders)
+
+
+def test_invalid_cursor(client, admin_headers):
+    """Testa a rejeição de um cursor inválido."""
+    response = client.get("/clients?cursor=invalido", headers=admin_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_tampered_cursor_types(client, admin_headers):
+    """Testa que valores de tipo errado no cursor resultam em 400, não em erro no banco."""
+    for url, params, values in [
+        ("/clients", {}, ["abc"]),
+        ("/clients", {}, [True]),
+        ("/products", {}, [1.5]),
+        ("/orders", {}, ["2024-01-01T00:00:00", "abc"]),
+        ("/orders", {}, [1, 2]),
+        ("/products/search", {"q": "vestido"}, ["alto", 1]),
+    ]:
+        response = client.get(url, params={**params, "cursor": encode_cursor(values)}, headers=admin_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, (url, values)
+
+    assert decode_cursor(encode_cursor([1]), (Product.price,)) == [1.0]
+
+
+def test_list_without_total(client, db_session, admin_headers):
+    """Testa a listagem sem o cálculo do total."""
+    _create_clients(db_session, 3)
+    body = client.get("/clients?include_total=false", headers=admin_headers).json()
+    assert body["total"] is None
+    assert body["total_kind"] == "none"
+    assert len(body["items"]) == 3
+
+
+def test_window_total(client, db_session, test_client, admin_headers):
+    """Testa o total calculado na mesma consulta da página."""
+    orders = [
+        Order(client_id=test_client.id, status=OrderStatus.PENDING, total_amount=10.0)
+        for _ in range(12)
+    ]
+    db_session.add_all(orders)
+    db_session.commit()
+
+    body = client.get("/orders?size=5&total_mode=window", headers=admin_headers).json()
+    assert body["total"] == 12
+    assert body["total_kind"] == "exact"
+    assert [o["id"] for o in body["items"]] == sorted(o.id for o in orders)[:5]
+
+    # Página além do fim: o total ainda é informado
+    body = client.get("/orders?size=5&page=4&total_mode=window", headers=admin_headers).json()
+    assert body["items"] == []
+    assert body["total"] == 12
+
+
+def test_estimated_total_is_cached(client, db_session, admin_headers):
+    """Testa o total estimado a partir de uma contagem em cache."""
+    pagination._count_cache.clear()
+    _create_clients(db_session, 4)
+    body = client.get("/clients?total_mode=estimate", headers=admin_headers).json()
+    assert body["total"] == 4
+    assert body["total_kind"] == "estimate"
+
+    db_session.add(Client(name="Novo", email="novo@exemplo.com", cpf="99999999999"))
+    db_session.commit()
+
+    # Dentro do TTL a contagem em cache é reaproveitada
+    body = client.get("/clients?total_mode=estimate", headers=admin_headers).json()
+    assert body["total"] == 4
+    body = client.get("/clients", headers=admin_headers).json()
+    assert body["total"] == 5
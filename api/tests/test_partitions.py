@@ -0,0 +1,90 @@
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert
+
+from src.models.order import Order, OrderItem, OrderStatus
+from src.services import partition_service
+
+
+def _seed_months(db_session, client_id, product_id):
+    """Dois pedidos em janeiro/2024 (um com dois itens) e um em fevereiro."""
+    orders = [
+        (datetime(2024, 1, 3, 10, 0), OrderStatus.DELIVERED, ["Roupas"]),
+        (datetime(2024, 1, 31, 23, 59, 59), OrderStatus.CANCELLED, []),
+        (datetime(2024, 2, 1, 0, 0), OrderStatus.PENDING, ["Roupas"]),
+    ]
+    ids = db_session.scalars(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [{"client_id": client_id, "status": status, "total_amount": 50.0, "sections": sections,
+          "created_at": created_at, "updated_at": created_at}
+         for created_at, status, sections in orders]
+    ).all()
+    db_session.execute(insert(OrderItem), [
+        {"order_id": ids[0], "product_id": product_id, "quantity": 2, "unit_price": 10.0},
+        {"order_id": ids[0], "product_id": product_id, "quantity": 3, "unit_price": 10.0},
+        {"order_id": ids[2], "product_id": product_id, "quantity": 5, "unit_price": 10.0},
+    ])
+    db_session.commit()
+    return ids
+
+
+def test_month_helpers():
+    assert partition_service.add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert partition_service.add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_service.partition_name(date(2024, 3, 1)) == "order_y2024m03"
+    assert partition_service.partition_month("order_y2024m03") == date(2024, 3, 1)
+    assert partition_service.partition_month(partition_service.DEFAULT_PARTITION) is None
+
+
+def test_archive_file_round_trip(db_session, test_client, test_product, tmp_path):
+    """Testa que o arquivo do mês guarda os pedidos e itens e os restaura iguais."""
+    ids = _seed_months(db_session, test_client.id, test_product.id)
+    january = date(2024, 1, 1)
+
+    path, count = partition_service.write_archive(db_session, january, tmp_path, batch_size=1)
+
+    assert path == tmp_path / "order_y2024m01.ndjson.gz"
+    assert count == 2
+    assert not list(tmp_path.glob("*.tmp"))
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["id"] for row in rows] == ids[:2]
+    assert rows[0]["status"] == "delivered"
+    assert [item["quantity"] for item in rows[0]["items"]] == [2, 3]
+
+    before = [
+        (order.id, order.status, order.created_at, sorted((i.id, i.quantity) for i in order.items))
+        for order in db_session.query(Order).order_by(Order.id)
+    ]
+    db_session.query(OrderItem).filter(OrderItem.order_id.in_(ids[:2])).delete(synchronize_session=False)
+    db_session.query(Order).filter(Order.id.in_(ids[:2])).delete(synchronize_session=False)
+    db_session.commit()
+
+    assert partition_service.load_archive(db_session, path) == (2, 2)
+    db_session.commit()
+    db_session.expire_all()
+    after = [
+        (order.id, order.status, order.created_at, sorted((i.id, i.quantity) for i in order.items))
+        for order in db_session.query(Order).order_by(Order.id)
+    ]
+    assert after == before
+
+
+def test_archive_does_not_overwrite(db_session, test_client, test_product, tmp_path):
+    _seed_months(db_session, test_client.id, test_product.id)
+    partition_service.write_archive(db_session, date(2024, 1, 1), tmp_path)
+
+    with pytest.raises(FileExistsError):
+        partition_service.write_archive(db_session, date(2024, 1, 1), tmp_path)
+
+
+def test_archive_requires_partitioned_table(db_session, tmp_path):
+    """No SQLite (sem particionamento) arquivar e restaurar são recusados."""
+    assert partition_service.is_partitioned(db_session) is False
+    with pytest.raises(ValueError):
+        partition_service.archive_partitions(db_session, date(2024, 1, 1), tmp_path)
+    with pytest.raises(ValueError):
+        partition_service.restore_partition(db_session, tmp_path / "order_y2024m01.ndjson.gz")
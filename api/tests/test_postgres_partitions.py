@@ -0,0 +1,125 @@
+"""
+Particionamento mensal de `order` em um PostgreSQL real.
+
+Executados apenas com TEST_POSTGRES_URL definida (ver test_postgres_plans).
+As tabelas são criadas em um schema próprio, removido ao final.
+"""
+import os
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.config.database import Base
+from src.models.order import Order, OrderItem
+from src.services import order_service, partition_service
+from tests.test_postgres_plans import _node_types, captured_statements, explain
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+SCHEMA = "partition_tests"
+
+pytestmark = pytest.mark.skipif(
+    not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL não definida"
+)
+
+
+@pytest.fixture
+def pg_engine():
+    admin = create_engine(TEST_POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(
+        TEST_POSTGRES_URL, connect_args={"options": f"-csearch_path={SCHEMA},public"}
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO client (name, email, cpf, created_at, updated_at) "
+            "VALUES ('Cliente', 'cliente@exemplo.com', '00000000001', now(), now())"
+        ))
+        conn.execute(text(
+            "INSERT INTO product (description, price, section, stock, image_urls, created_at, updated_at) "
+            "VALUES ('Vestido', 10, 'Roupas', 100, '{}', now(), now())"
+        ))
+        # Um pedido por dia, de jan/2024 a jun/2024, com um item cada
+        conn.execute(text("""
+            INSERT INTO "order" (client_id, status, total_amount, sections, created_at, updated_at)
+            SELECT 1, 'DELIVERED', 10, '{Roupas}', d, d
+            FROM generate_series(timestamp '2024-01-01 12:00', timestamp '2024-06-30 12:00', interval '1 day') d
+        """))
+        conn.execute(text("""
+            INSERT INTO order_item (order_id, product_id, quantity, unit_price)
+            SELECT id, 1, 1, 10 FROM "order"
+        """))
+        partition_service.partition_order_table(conn, months_ahead=1)
+        conn.execute(text('ANALYZE "order"'))
+
+    yield engine
+
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+def _scanned_partitions(plan) -> set:
+    return {relation for _, relation in _node_types(plan) if relation and relation.startswith("order_")}
+
+
+def test_conversion_keeps_rows_and_indexes(pg_engine):
+    with Session(pg_engine) as db:
+        assert partition_service.is_partitioned(db)
+        assert db.query(Order).count() == 182
+        names = {partition["name"] for partition in partition_service.list_partitions(db)}
+        assert {"order_y2024m01", "order_y2024m06", partition_service.DEFAULT_PARTITION} <= names
+        indexes = set(db.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'order'"
+        )).scalars())
+        assert {"ix_order_created_at_id", "ix_order_client_id_created_at_id", "ix_order_sections"} <= indexes
+
+
+def test_date_filter_prunes_partitions(pg_engine):
+    with Session(pg_engine) as db, captured_statements(pg_engine) as statements:
+        order_service.get_orders(
+            db, limit=20, start_date=datetime(2024, 3, 1), end_date=datetime(2024, 3, 31, 23, 59)
+        )
+    page = next(s for s in statements if "ORDER BY" in s[0] and "count(*)" not in s[0])
+    count = next(s for s in statements if "count(*)" in s[0])
+
+    assert _scanned_partitions(explain(pg_engine, *page)) == {"order_y2024m03"}
+    assert _scanned_partitions(explain(pg_engine, *count)) == {"order_y2024m03"}
+
+
+def test_archive_and_restore(pg_engine, tmp_path):
+    with Session(pg_engine) as db:
+        archived = partition_service.archive_partitions(
+            db, date(2024, 3, 1), tmp_path, today=date(2024, 7, 15)
+        )
+        assert [result["partition"] for result in archived] == ["order_y2024m01", "order_y2024m02"]
+        assert [result["orders"] for result in archived] == [31, 29]
+        assert [result["items"] for result in archived] == [31, 29]
+        assert db.query(Order).count() == 182 - 60
+        assert db.query(OrderItem).count() == 182 - 60
+
+        restored = partition_service.restore_partition(db, tmp_path / "order_y2024m02.ndjson.gz")
+        assert restored == {"partition": "order_y2024m02", "orders": 29, "items": 29}
+        assert db.query(Order).filter(
+            Order.created_at >= datetime(2024, 2, 1), Order.created_at < datetime(2024, 3, 1)
+        ).count() == 29
+
+
+def test_new_partition_takes_rows_from_default(pg_engine):
+    with Session(pg_engine) as db:
+        db.execute(text("""
+            INSERT INTO "order" (client_id, status, total_amount, sections, created_at, updated_at)
+            VALUES (1, 'PENDING', 10, '{}', '2030-05-10', '2030-05-10')
+        """))
+        db.commit()
+
+        assert partition_service.ensure_partitions(db, months_ahead=0, today=date(2030, 5, 1)) == ["order_y2030m05"]
+        assert db.execute(text('SELECT count(*) FROM "order_y2030m05"')).scalar() == 1
+        assert db.execute(text(f'SELECT count(*) FROM "{partition_service.DEFAULT_PARTITION}"')).scalar() == 0
@@ -0,0 +1,70 @@
+"""
+Busca textual de produtos (/products/search) em um PostgreSQL real.
+
+Executados apenas com TEST_POSTGRES_URL definida (ver test_postgres_plans).
+As tabelas são criadas em um schema próprio, removido ao final.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.config.database import Base
+from src.services import product_service
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+SCHEMA = "search_tests"
+
+pytestmark = pytest.mark.skipif(
+    not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL não definida"
+)
+
+
+@pytest.fixture
+def pg_engine():
+    admin = create_engine(TEST_POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(
+        TEST_POSTGRES_URL, connect_args={"options": f"-csearch_path={SCHEMA},public"}
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Mesma coluna gerada da migração c5e8a1d4f7b2
+        conn.execute(text("""
+            ALTER TABLE product ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('portuguese', coalesce(description, '')), 'A') ||
+                setweight(to_tsvector('portuguese', coalesce(section, '')), 'B')
+            ) STORED
+        """))
+        # Todos casam apenas pela seção: mesmo rank (real, sem representação exata)
+        conn.execute(text("""
+            INSERT INTO product (description, price, section, stock, image_urls, created_at, updated_at)
+            SELECT 'Peça ' || g, 10, 'Roupas', 1, '{}', now(), now()
+            FROM generate_series(1, 7) g
+        """))
+
+    yield engine
+
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+def test_cursor_pages_across_equal_ranks(pg_engine):
+    """Testa que produtos com o mesmo rank não se repetem nem somem entre páginas."""
+    seen, cursor = [], None
+    with Session(pg_engine) as db:
+        while True:
+            products, cursor = product_service.search_products(db, "roupas", limit=3, cursor=cursor)
+            seen.extend(product.id for product in products)
+            if cursor is None:
+                break
+
+    assert seen == sorted(seen)
+    assert len(seen) == 7
@@ -204,3 +204,77 @@ def test_product_stock_update_negative(client, test_product, admin_headers):
     else:
         # Caso seja uma string simples
         assert "greater than or equal to 0" in response.json()["detail"] or "negativo" in response.json()["detail"].lower()
+
+
+def test_search_products(client, db_session, admin_headers):
+    """Testa a busca textual de produtos com paginação por cursor."""
+    from src.models.product import Product
+
+    db_session.add_all([
+        Product(description="Vestido Floral Verão", price=89.9, section="Roupas", stock=5),
+        Product(description="Vestido Longo Festa", price=199.9, section="Roupas", stock=2),
+        Product(description="Sandália de Couro", price=120.0, section="Calçados", stock=8),
+        Product(description="Vestido Midi Floral", price=149.9, section="Roupas", stock=1),
+    ])
+    db_session.commit()
+
+    response = client.get("/products/search?q=vestido&size=2", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    first = response.json()
+    assert len(first["items"]) == 2
+    assert first["next_cursor"]
+
+    response = client.get(
+        f"/products/search?q=vestido&size=2&cursor={first['next_cursor']}", headers=admin_headers)
+    second = response.json()
+    descriptions = [p["description"] for p in first["items"] + second["items"]]
+    assert len(descriptions) == 3
+    assert all("Vestido" in d for d in descriptions)
+
+    response = client.get("/products/search?q=vestido floral", headers=admin_headers)
+    assert len(response.json()["items"]) == 2
+
+    response = client.get("/products/search?q=calçados", headers=admin_headers)
+    assert [p["description"] for p in response.json()["items"]] == ["Sandália de Couro"]
+
+
+def test_image_urls_round_trip(client, admin_headers):
+    """Testa que image_urls é gravado e devolvido como lista (vazia quando omitido)."""
+    urls = ["https://exemplo.com/a.jpg", "https://exemplo.com/b.jpg"]
+    with_images = client.post("/products", json={
+        "description": "Bolsa de Couro", "price": 150.0, "section": "Bolsas", "stock": 3, "image_urls": urls,
+    }, headers=admin_headers).json()
+    without_images = client.post("/products", json={
+        "description": "Carteira", "price": 50.0, "section": "Bolsas", "stock": 3,
+    }, headers=admin_headers).json()
+
+    assert with_images["image_urls"] == urls
+    assert without_images["image_urls"] == []
+    listed = client.get("/products?category=Bolsas", headers=admin_headers).json()["items"]
+    assert [p["image_urls"] for p in listed] == [urls, []]
+
+    response = client.put(f"/products/{with_images['id']}", json={"image_urls": urls[:1]}, headers=admin_headers)
+    assert response.json()["image_urls"] == urls[:1]
+    response = client.put(f"/products/{with_images['id']}", json={"image_urls": None}, headers=admin_headers)
+    assert response.json()["image_urls"] == []
+
+
+def test_reads_leave_products_clean(db_session, test_product):
+    """Testa que listar e obter produtos não marca objetos como alterados."""
+    from src.models.product import Product
+    from src.schemas.product import ProductUpdate
+    from src.services import product_service
+
+    db_session.add(Product(description="Lenço", price=20.0, section="Acessórios", stock=4,
+                           image_urls=["https://exemplo.com/lenco.jpg"]))
+    db_session.commit()
+
+    products, _ = product_service.get_products(db_session)
+    product_service.get_product(db_session, test_product.id)
+
+    assert all(isinstance(p.image_urls, list) for p in products)
+    assert not db_session.dirty
+
+    # Uma escrita depois das leituras não tenta regravar image_urls
+    product_service.update_product(db_session, test_product.id, ProductUpdate(stock=7))
+    assert product_service.get_product(db_session, test_product.id).stock == 7
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.config import database
+from src.config.replicas import ReplicaRouter
+
+
+def _sqlite_sessionmaker(path, label):
+    """Cria um banco SQLite identificado por `label` como substituto de um servidor."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE server (name TEXT)"))
+        connection.execute(text("INSERT INTO server VALUES (:name)"), {"name": label})
+    return sessionmaker(bind=engine)
+
+
+def _server_name(factory):
+    with factory() as session:
+        return session.execute(text("SELECT name FROM server")).scalar_one()
+
+
+@pytest.fixture
+def router(tmp_path):
+    primary = _sqlite_sessionmaker(tmp_path / "primary.db", "primary")
+    replicas = [
+        _sqlite_sessionmaker(tmp_path / "replica_a.db", "replica_a"),
+        _sqlite_sessionmaker(tmp_path / "replica_b.db", "replica_b"),
+    ]
+    return ReplicaRouter(primary, replicas, sticky_seconds=0.2)
+
+
+def test_reads_are_round_robin(router):
+    """Testa a distribuição das leituras entre as réplicas."""
+    names = [_server_name(router.for_read("user")) for _ in range(4)]
+    assert names == ["replica_a", "replica_b", "replica_a", "replica_b"]
+
+
+def test_read_your_writes_stickiness(router):
+    """Testa que as leituras voltam ao primário logo após uma escrita."""
+    router.mark_write("writer")
+    assert _server_name(router.for_read("writer")) == "primary"
+    # Outros usuários continuam nas réplicas
+    assert _server_name(router.for_read("reader")).startswith("replica")
+
+    time.sleep(0.25)
+    assert _server_name(router.for_read("writer")).startswith("replica")
+
+
+def test_without_replicas_uses_primary(tmp_path):
+    """Testa que, sem réplicas configuradas, tudo vai para o primário."""
+    primary = _sqlite_sessionmaker(tmp_path / "primary.db", "primary")
+    router = ReplicaRouter(primary, [])
+    router.mark_write("writer")
+    assert router.for_read("writer") is primary
+    assert router.for_read(None) is primary
+
+
+def test_successful_write_marks_user_sticky(client, test_client, admin_headers, monkeypatch):
+    """Testa que a API marca o autor de uma escrita para ler do primário."""
+    router = ReplicaRouter(object(), [object()], sticky_seconds=60)
+    monkeypatch.setattr(database, "read_router", router)
+    key = database.stickiness_key(type("Req", (), {"headers": admin_headers})())
+
+    response = client.get(f"/clients/{test_client.id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert not router.is_sticky(key)
+
+    response = client.put(
+        f"/clients/{test_client.id}", json={"phone": "(11) 91234-5678"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert router.is_sticky(key)
+
+
+def test_read_routes_authenticate_on_read_session(client, db_session, test_product, admin_headers):
+    """Testa que as rotas de leitura não abrem uma sessão do primário para autenticar."""
+    from src.main import app
+
+    def primary_unavailable():
+        raise AssertionError("rota de leitura não deve usar get_db")
+        yield
+
+    app.dependency_overrides[database.get_db] = primary_unavailable
+    response = client.get(f"/products/{test_product.id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get("/reports/sales/daily", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_user_missing_on_replica_is_read_from_primary(client, db_session, tmp_path, admin_headers,
+                                                      monkeypatch):
+    """Testa que um usuário que ainda não chegou à réplica é autenticado pelo primário."""
+    from src.main import app
+
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    database.Base.metadata.create_all(bind=replica_engine)
+    Replica = sessionmaker(bind=replica_engine)
+
+    def replica_db():
+        with Replica() as db:
+            db.info[database.REPLICA_SESSION_KEY] = True
+            yield db
+
+    app.dependency_overrides[database.get_read_db] = replica_db
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+
+    response = client.get("/clients", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 0
+    replica_engine.dispose()
@@ -0,0 +1,150 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi import status
+
+from src.models.product import Product
+from src.models.report import SalesDaily, SalesDailyClient, SalesDailySection
+from src.services import report_service
+
+
+@pytest.fixture
+def report_products(db_session):
+    products = [
+        Product(description="Vestido Longo", price=200.0, section="Roupas", stock=50),
+        Product(description="Bolsa de Mão", price=150.0, section="Acessórios", stock=50),
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return [p.id for p in products]
+
+
+def _rollup_rows(db_session):
+    db_session.expire_all()
+    return (
+        sorted((r.day, r.orders, round(r.revenue, 2)) for r in db_session.query(SalesDaily)),
+        sorted((r.day, r.section, r.quantity, round(r.revenue, 2)) for r in db_session.query(SalesDailySection)),
+        sorted((r.day, r.client_id, r.orders, round(r.revenue, 2)) for r in db_session.query(SalesDailyClient)),
+    )
+
+
+def test_sales_reports_follow_order_changes(client, db_session, test_client, report_products, admin_headers):
+    """Testa que os agregados acompanham criação, cancelamento, reabertura e exclusão."""
+    dress, bag = report_products
+
+    client.post("/orders", json={"client_id": test_client.id, "items": [
+        {"product_id": dress, "quantity": 2},
+        {"product_id": bag, "quantity": 1},
+    ]}, headers=admin_headers)
+    bulk = client.post("/orders/bulk", json={"orders": [
+        {"client_id": test_client.id, "items": [{"product_id": bag, "quantity": 2}]},
+        {"client_id": test_client.id, "items": [{"product_id": dress, "quantity": 1}]},
+    ]}, headers=admin_headers).json()
+    second, third = [r["order_id"] for r in bulk["results"]]
+
+    # Datas gravadas pelo banco (UTC)
+    today = datetime.utcnow().date().isoformat()
+    response = client.get("/reports/sales/daily", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["items"] == [{"day": today, "orders": 3, "revenue": 1050.0}]
+    assert response.json()["total_revenue"] == 1050.0
+
+    client.put(f"/orders/{second}", json={"status": "cancelled"}, headers=admin_headers)
+    client.delete(f"/orders/{third}", headers=admin_headers)
+
+    daily = client.get("/reports/sales/daily", headers=admin_headers).json()
+    assert daily["items"] == [{"day": today, "orders": 1, "revenue": 550.0}]
+
+    sections = client.get("/reports/sales/sections", headers=admin_headers).json()
+    assert sections["items"] == [
+        {"section": "Roupas", "quantity": 2, "revenue": 400.0},
+        {"section": "Acessórios", "quantity": 1, "revenue": 150.0},
+    ]
+
+    clients = client.get("/reports/sales/clients", headers=admin_headers).json()
+    assert clients["items"] == [{"client_id": test_client.id, "orders": 1, "revenue": 550.0}]
+
+    # Reabrir o pedido cancelado o devolve aos agregados
+    client.put(f"/orders/{second}", json={"status": "pending"}, headers=admin_headers)
+    daily = client.get("/reports/sales/daily", headers=admin_headers).json()
+    assert daily["items"] == [{"day": today, "orders": 2, "revenue": 850.0}]
+
+    # O incremental bate com o recálculo completo
+    incremental = _rollup_rows(db_session)
+    report_service.rebuild_sales(db_session)
+    db_session.commit()
+    assert _rollup_rows(db_session) == incremental
+
+
+def test_sales_reports_date_range(client, db_session, admin_headers):
+    """Testa o filtro por período sobre os agregados."""
+    db_session.add_all([
+        SalesDaily(day=date(2024, 1, 10), orders=2, revenue=300.0),
+        SalesDaily(day=date(2024, 1, 20), orders=1, revenue=100.0),
+        SalesDaily(day=date(2024, 2, 5), orders=4, revenue=800.0),
+    ])
+    db_session.commit()
+
+    response = client.get(
+        "/reports/sales/daily?start_date=2024-01-15&end_date=2024-02-28", headers=admin_headers)
+
+    data = response.json()
+    assert [item["day"] for item in data["items"]] == ["2024-01-20", "2024-02-05"]
+    assert data["total_orders"] == 5
+    assert data["total_revenue"] == 900.0
+
+
+def test_sales_reports_require_admin(client, normal_headers):
+    """Testa que os relatórios são restritos a administradores."""
+    for path in ("/reports/sales/daily", "/reports/sales/sections", "/reports/sales/clients"):
+        assert client.get(path, headers=normal_headers).status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.fixture
+def foreign_keys(engine):
+    """Ativa a verificação de chaves estrangeiras do SQLite (como no PostgreSQL)."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+    yield
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+
+def test_delete_client_with_past_orders(client, db_session, test_client, report_products,
+                                        admin_headers, foreign_keys):
+    """Testa que um cliente cujos pedidos foram excluídos pode ser excluído (linhas zeradas do agregado)."""
+    order_id = client.post("/orders", json={"client_id": test_client.id, "items": [
+        {"product_id": report_products[0], "quantity": 1},
+    ]}, headers=admin_headers).json()["id"]
+    client.delete(f"/orders/{order_id}", headers=admin_headers)
+    assert db_session.query(SalesDailyClient).filter_by(client_id=test_client.id).count() == 1
+
+    response = client.delete(f"/clients/{test_client.id}", headers=admin_headers)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert db_session.query(SalesDailyClient).count() == 0
+
+
+def test_section_change_moves_sales(client, db_session, test_client, report_products, admin_headers):
+    """Testa que trocar a seção do produto transfere as vendas e o cancelamento posterior não deixa saldo."""
+    dress, _ = report_products
+    first, second = [
+        client.post("/orders", json={"client_id": test_client.id, "items": [
+            {"product_id": dress, "quantity": 1},
+        ]}, headers=admin_headers).json()["id"]
+        for _ in range(2)
+    ]
+
+    client.put(f"/products/{dress}", json={"section": "Festa"}, headers=admin_headers)
+    sections = client.get("/reports/sales/sections", headers=admin_headers).json()["items"]
+    assert sections == [{"section": "Festa", "quantity": 2, "revenue": 400.0}]
+
+    client.put(f"/orders/{first}", json={"status": "cancelled"}, headers=admin_headers)
+    sections = client.get("/reports/sales/sections", headers=admin_headers).json()["items"]
+    assert sections == [{"section": "Festa", "quantity": 1, "revenue": 200.0}]
+
+    # Igual ao recálculo completo (que não mantém linhas zeradas)
+    incremental = [row for row in _rollup_rows(db_session)[1] if row[2] != 0]
+    report_service.rebuild_sales(db_session)
+    db_session.commit()
+    assert _rollup_rows(db_session)[1] == incremental
@@ -137,12 +137,51 @@ def test_order_service_cancel(db_session, test_order, test_product):
         db=db_session, order_id=test_order.id, order=order_update)
     assert cancelled_order.status == OrderStatus.CANCELLED
 
-    # Na implementação atual, ao atualizar o status para CANCELLED,
-    # o estoque não é automaticamente devolvido
-    # Portanto, vamos apenas verificar se o status foi atualizado
+    # Ao cancelar, os itens do pedido voltam ao estoque
+    from src.models.product import Product
+
+    def current_stock():
+        return db_session.query(Product.stock).filter(Product.id == test_product.id).scalar()
+
+    assert current_stock() == initial_stock + 2
+
+    # Cancelar de novo não devolve o estoque outra vez
+    order_service.update_order(
+        db=db_session, order_id=test_order.id, order=order_update)
+    assert current_stock() == initial_stock + 2
+
+
+def test_order_service_reopen_cancelled(db_session, test_order, test_product):
+    """Testa que reabrir um pedido cancelado reserva o estoque novamente."""
+    from src.schemas.order import OrderUpdate
+
+    initial_stock = test_product.stock
+    order_service.update_order(
+        db=db_session, order_id=test_order.id, order=OrderUpdate(status=OrderStatus.CANCELLED))
+    order_service.update_order(
+        db=db_session, order_id=test_order.id, order=OrderUpdate(status=OrderStatus.PENDING))
+
+    db_product = product_service.get_product(
+        db=db_session, product_id=test_product.id)
+    assert db_product.stock == initial_stock
+
+
+def test_order_service_delete_restores_stock(db_session, test_order, test_product):
+    """Testa que a exclusão devolve o estoque e remove os itens do pedido."""
+    from src.models.order import Order, OrderItem
+
+    initial_stock = test_product.stock
+    result = order_service.delete_order(db=db_session, order_id=test_order.id)
+
+    assert result == {
+        "cancelled": [test_order.id],
+        "products": [{"product_id": test_product.id, "stock": initial_stock + 2}],
+    }
+    assert db_session.query(Order).count() == 0
+    assert db_session.query(OrderItem).count() == 0
     db_product = product_service.get_product(
         db=db_session, product_id=test_product.id)
-    assert db_product.stock == initial_stock  # O estoque permanece o mesmo
+    assert db_product.stock == initial_stock + 2
 
 
 def test_get_clients_with_filters(db_session, test_client):